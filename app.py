@@ -31,43 +31,95 @@ redirect_uri  = "https://spaeonboardingtool.azurewebsites.net/"
 [mongo]
 uri = "mongodb+srv://<user>:<password>@cluster0.xxxxx.mongodb.net/?retryWrites=true&w=majority"
 db  = "spae_hub"
+max_pool_size         = 50           # optional — pool, timeouts, write concern, read preference
+wait_queue_timeout_ms = 2000         # (full list in services/storage.py)
+op_timeout_ms         = 3000         # deadline for each read / save on the request path
+
+[storage]                  # optional — SQLite for sites without MongoDB (see services/storage.py)
+backend = "sqlite"         # default "mongo", using [mongo] above
+path    = "data/spae.db"
+
+[content]                  # optional — hot reload of content/ without a restart
+watch           = true
+poll_interval_s = 5
+sources         = ["python"]        # and/or "files" (YAML / JSON / CSV in data_dir)
+data_dir        = "content/data"
+cache_dir       = ".cache/content"  # compiled-content cache; omit to disable
+
+[sessions]                 # optional — idle eviction, memory budget, resume tokens
+idle_timeout_min = 30
+memory_budget_mb = 512
+signing_key      = "long-random-string"   # same on every replica; enables ?s= resume
+token_ttl_h      = 4      # single-use, but a bearer token in the URL: keep it short and
+                          # the query string out of proxy logs (services/session_tokens.py)
+
+[events]                   # optional — completion event log (see services/events.py)
+flush_interval_s = 2
+ttl_days         = 365
+                           # peer pace stats: run `python -m tools.analytics --loop` (services/analytics.py)
+
+[nudges]                   # optional — daily overdue-task digests to managers/buddies
+enabled   = true           # (see services/nudges.py for SMTP settings)
+send_hour = 8
+sink      = "file"
+
+[schema]                   # optional — background upgrade of older user documents
+sweep            = true    # (see services/schema.py)
+sweep_batch      = 200
+sweep_interval_s = 30
+
+[live]                     # optional — other tabs / devices / mentor views see changes on their next rerun
+enabled         = true     # (see services/live.py)
+mode            = "auto"   # change stream on a replica set, else one poll per process
+poll_interval_s = 5
+
+[certificates]             # optional — PDF cache shared by replicas (see services/certificates.py)
+cache_dir = ".cache/certificates"
+workers   = 2
+
+[admin]                    # optional — who sees admin tools (HR progress export)
+emails = ["hr.lead@example.com"]
 
 INSTALL:
 ─────────
 pip install streamlit pymongo dnspython msal
+python -m tools.assets     # self-hosted fonts & hero images → static/ (see services/assets.py)
 """
 
+import copy
+import io
+import tempfile
+import time
+
 import streamlit as st
+import streamlit.components.v1 as components
 import pandas as pd
 import altair as alt
-from typing import List, Tuple, Dict, Optional
+from typing import List, Tuple, Dict, Mapping, Optional
 from datetime import date, datetime, timedelta
 
-# ── All editable content lives in content/ ────────────────────────────────────
-from content import (
-    get_checklist_data,
-    NAVIGATOR_COURSES,
-    FAROS_CATALOG,
-    TOOLKIT,
-    QUICK_LINKS,
-    IMPORTANT_LINKS,
-    THEME_IMAGES,
-    GLOSSARY,
-    FAQS,
-    ALL_BADGES,
-    ACRONYMS,
-)
-from content.courses import ROLE_KEY_MAP
-from content.systems import KEY_CONTACTS
+# ── All editable content lives in content/ — read via the live ContentBundle ──
+from services.content_bundle import BundleManager, ContentBundle, ContentSources
+from services import analytics
+from services import assets
+from services import certificates
+from services.badges import COURSE_CHANGE, TASK_CHANGE, BadgeFacts
+from services import export as progress_export
+from services import indexes
+from services import leaderboard
+from services import live
+from services import mentees
+from services import nudges
+from services import schema
+from services import storage
+from services import templates
+from services import theme
+from services.events import EventLog
+from services.sessions import SessionRegistry
+from services.session_tokens import DEFAULT_TTL_S as DEFAULT_TOKEN_TTL_S, issue_token, new_nonce, verify_token
+from streamlit.runtime.scriptrunner import get_script_run_ctx
 
 # ── Optional dependencies ─────────────────────────────────────────────────────
-try:
-    from pymongo import MongoClient
-    from pymongo.errors import ConnectionFailure, ServerSelectionTimeoutError
-    MONGO_AVAILABLE = True
-except ImportError:
-    MONGO_AVAILABLE = False
-
 try:
     import msal
     MSAL_AVAILABLE = True
@@ -89,6 +141,34 @@ st.set_page_config(
 )
 
 
+# =============================================================================
+# CONTENT BUNDLE — hot-reloaded from content/, one immutable snapshot per rerun
+# =============================================================================
+
+@st.cache_resource(show_spinner=False)
+def get_bundle_manager() -> BundleManager:
+    try:
+        cfg = st.secrets.get("content", {})
+    except FileNotFoundError:
+        cfg = {}
+    return BundleManager(
+        watch=bool(cfg.get("watch", True)),
+        poll_interval_s=float(cfg.get("poll_interval_s", 5)),
+        sources=ContentSources.from_config(cfg),
+    )
+
+
+# Bind once per rerun so the whole run sees one consistent version.
+# Role-specific content is read from bundle.role(...) — see services/roles.py
+bundle: ContentBundle = get_bundle_manager().current
+get_checklist_data = bundle.checklist
+ROLE_KEY_MAP       = bundle.role_key_map
+IMPORTANT_LINKS    = bundle.important_links
+KEY_CONTACTS       = bundle.key_contacts
+ALL_BADGES         = bundle.badges
+ACRONYMS           = bundle.acronyms
+
+
 # =============================================================================
 # MSAL AUTHENTICATION
 # =============================================================================
@@ -160,10 +240,127 @@ def get_user_claims(token_result: Dict) -> Dict:
     }
 
 
+def dev_auth_bypass_enabled() -> bool:
+    try:
+        return bool(st.secrets["dev"].get("auth_bypass", False))
+    except (KeyError, FileNotFoundError):
+        return False
+
+
+def get_token_settings() -> Tuple[str, float]:
+    """(signing_key, ttl seconds) for session resume tokens — empty key disables them."""
+    try:
+        cfg = st.secrets.get("sessions", {})
+    except FileNotFoundError:
+        cfg = {}
+    return cfg.get("signing_key", ""), float(cfg.get("token_ttl_h", DEFAULT_TOKEN_TTL_S / 3600)) * 3600
+
+
+def issue_session_token() -> None:
+    """
+    Put a single-use resume token in the URL so any replica can pick this
+    session up. Its nonce is recorded on the user document, and nonces that
+    have expired are cleared in the same write — so a new hire gets theirs
+    from save_user_to_db, once the wizard has created the document.
+    """
+    key, ttl = get_token_settings()
+    oid      = st.session_state.get("azure_oid", "")
+    col      = get_collection()
+    if not key or not oid or col is None:
+        return
+    nonce = new_nonce()
+    now   = time.time()
+    try:
+        doc = load_user_from_db(oid)
+        if doc is None:
+            return
+        expired = {f"resume.{n}": "" for n, exp in (doc.get("resume") or {}).items() if exp < now}
+        with db_deadline():
+            col.update_one(
+                {"_id": oid},
+                {"$set": {f"resume.{nonce}": int(now + ttl)}, **({"$unset": expired} if expired else {})},
+            )
+    except Exception:
+        return                                          # the next sign-in issues one
+    st.query_params.clear()
+    st.query_params["s"] = issue_token(oid, doc.get("auth_epoch", 0), key, nonce, ttl)
+
+
+def resume_from_token(token: str) -> bool:
+    """
+    Rebuild the signed-in identity from a resume token and the user document.
+    The token is consumed — the first session to present it wins — and a
+    fresh one replaces it in the URL.
+    """
+    key, _ = get_token_settings()
+    col    = get_collection()
+    if not key or col is None:
+        return False
+    verified = verify_token(token, key)
+    if verified is None:
+        return False
+    oid, epoch, nonce = verified
+    try:
+        doc = load_user_from_db(oid)
+        if doc is None or doc.get("auth_epoch", 0) != epoch:
+            return False
+        with db_deadline():
+            consumed = col.update_one(
+                {"_id": oid, f"resume.{nonce}": {"$exists": True}},
+                {"$unset": {f"resume.{nonce}": ""}},
+            ).modified_count
+    except Exception:
+        return False
+    if not consumed:
+        return False
+    name = doc.get("azure_name", "")
+    st.session_state.update({
+        "authenticated":    True,
+        "azure_oid":        oid,
+        "azure_name":       name,
+        "azure_email":      doc.get("azure_email", ""),
+        "azure_given_name": doc.get("profile", {}).get("name", name.split()[0] if name else ""),
+        "access_token":     "",
+    })
+    issue_session_token()
+    return True
+
+
+def revoke_session_tokens(oid: str) -> None:
+    col = get_collection()
+    if col is None or not oid:
+        return
+    try:
+        with db_deadline():
+            col.update_one({"_id": oid}, {"$inc": {"auth_epoch": 1}, "$unset": {"resume": ""}})
+    except Exception:
+        pass
+
+
 def handle_auth_callback() -> bool:
     params = st.query_params
     code   = params.get("code",  None)
     error  = params.get("error", None)
+
+    # Failover / reconnect to another replica: resume from the signed URL token
+    token = params.get("s", None)
+    if token and not st.session_state.get("authenticated") and resume_from_token(token):
+        return True
+
+    # Local load testing only (tools/loadtest.py) — never set [dev] in production secrets
+    dev_oid = params.get("dev_oid", None)
+    if dev_oid and not st.session_state.get("authenticated") and dev_auth_bypass_enabled():
+        st.session_state.update({
+            "authenticated":    True,
+            "azure_oid":        dev_oid,
+            "azure_name":       f"Load Test {dev_oid}",
+            "azure_email":      f"{dev_oid}@loadtest.local",
+            "azure_given_name": "Load",
+            "access_token":     "",
+        })
+        issue_session_token()
+        return True
+
     if error:
         st.error(f"Microsoft login failed: {params.get('error_description', error)}")
         st.query_params.clear()
@@ -177,155 +374,329 @@ def handle_auth_callback() -> bool:
                 "authenticated":    True,
                 "azure_oid":        claims["oid"],
                 "azure_name":       claims["name"],
-                "azure_email":      claims["email"],
+                "azure_email":      claims["email"].lower(),
                 "azure_given_name": claims["given_name"],
                 "access_token":     result.get("access_token", ""),
             })
             st.query_params.clear()
+            issue_session_token()
             return True
     return False
 
 
 def show_login_page():
-    inject_global_css()
     auth_url = build_auth_url()
-    st.markdown(f"""
-        <div style="display:flex;flex-direction:column;align-items:center;
-                    justify-content:center;min-height:80vh;text-align:center;">
-            <div style="font-size:4rem;margin-bottom:1rem;">⚙️</div>
-            <h1 style="font-size:2.4rem;font-weight:800;margin-bottom:0.5rem;">SPAE Onboarding Hub</h1>
-            <p style="opacity:0.65;font-size:1.1rem;max-width:420px;margin-bottom:2rem;">
-                Your personalised 90-day onboarding companion.<br>
-                Sign in with your company Microsoft account to continue.
-            </p>
-            <a href="{auth_url}" target="_self"
-               style="display:inline-flex;align-items:center;gap:10px;
-                      background:#0078d4;color:white;font-weight:700;
-                      padding:0.85rem 2rem;border-radius:0.6rem;
-                      text-decoration:none;font-size:1rem;
-                      box-shadow:0 4px 14px rgba(0,120,212,0.35);">
-                <svg width="20" height="20" viewBox="0 0 21 21" xmlns="http://www.w3.org/2000/svg">
-                  <rect x="1"  y="1"  width="9" height="9" fill="#f25022"/>
-                  <rect x="11" y="1"  width="9" height="9" fill="#7fba00"/>
-                  <rect x="1"  y="11" width="9" height="9" fill="#00a4ef"/>
-                  <rect x="11" y="11" width="9" height="9" fill="#ffb900"/>
-                </svg>
-                Sign in with Microsoft
-            </a>
-            <p style="margin-top:1.5rem;font-size:0.8rem;opacity:0.45;">
-                Secured by Azure Active Directory · Data stays within your organisation
-            </p>
-        </div>
-    """, unsafe_allow_html=True)
+    st.markdown(templates.render("login.html", auth_url=auth_url), unsafe_allow_html=True)
 
 
 # =============================================================================
-# MONGODB LAYER
+# STORAGE LAYER — MongoDB or SQLite, see services/storage.py
 # =============================================================================
 
 @st.cache_resource
-def get_mongo_client():
-    if not MONGO_AVAILABLE:
+def get_database():
+    """The configured backend's database, or None (the app then runs in Local mode)."""
+    try:
+        cfg   = dict(st.secrets.get("storage", {}))
+        mongo = dict(st.secrets.get("mongo", {}))
+    except FileNotFoundError:
+        return None
+    if not cfg and not mongo.get("uri"):
         return None
     try:
-        client = MongoClient(st.secrets["mongo"]["uri"], serverSelectionTimeoutMS=5000)
-        client.admin.command("ping")
-        return client
+        return storage.open_database(cfg, mongo, listeners=[get_pool_metrics()])
     except Exception:
         return None
 
 
-def get_collection():
-    client = get_mongo_client()
-    if client is None:
-        return None
+@st.cache_resource
+def get_pool_metrics() -> storage.PoolMetrics:
+    return storage.PoolMetrics()
+
+
+@st.cache_resource
+def get_op_timeout_s() -> float:
     try:
-        return client[st.secrets["mongo"].get("db", "spae_hub")]["users"]
-    except Exception:
-        return None
+        return storage.op_timeout_s(st.secrets.get("mongo", {}))
+    except FileNotFoundError:
+        return 0.0
+
+
+def db_deadline():
+    """Bound one request-path DB call by [mongo] op_timeout_ms: it fails (and is counted), the rerun goes on."""
+    return storage.deadline(get_op_timeout_s(), get_pool_metrics())
+
+
+def get_collection():
+    db = get_database()
+    return None if db is None else db["users"]
+
+
+@st.cache_resource
+def ensure_user_indexes():
+    """Once per process, off the request path: every index in services/indexes.py."""
+    return indexes.ensure_in_background(get_collection)
 
 
 def load_user_from_db(oid: str) -> Optional[Dict]:
+    """
+    None only when there is definitely no document (or no database). A read
+    that fails or times out raises — callers must not mistake it for a new
+    user, whose wizard would overwrite the saved progress.
+    """
     col = get_collection()
     if col is None:
         return None
-    try:
+    with db_deadline():
         return col.find_one({"_id": oid})
-    except Exception:
-        return None
 
 
-def save_user_to_db(oid: str, data: Dict) -> bool:
+def claim_provisioned_user(oid: str, email: str) -> Optional[Dict]:
+    """
+    First sign-in of someone HR provisioned by email only (tools/provision.py):
+    re-key their "hr:<email>" document to the Azure object ID. The copy is an
+    insert, so it can never overwrite a document the object ID already has —
+    if one turns up in between, that document wins and is returned instead.
+    Only call it once load_user_from_db has returned None; raises like it.
+    """
     col = get_collection()
-    if col is None:
-        return False
+    if col is None or not oid or not email:
+        return None
+    with db_deadline():
+        doc = col.find_one({"_id": f"hr:{email.lower()}"})
+        if doc is None:
+            return None
+        pending_id = doc["_id"]
+        doc.update({"_id": oid, "pending_claim": False})
+        try:
+            col.insert_one(doc)
+        except storage.DuplicateKeyError:
+            return col.find_one({"_id": oid})
+        col.delete_one({"_id": pending_id})
+    return doc
+
+
+def merge_set(pending: Mapping, fields: Mapping) -> Dict:
+    """
+    `fields` laid over an earlier $set that hasn't been written yet. A path
+    replaces the pending paths under it and lands inside a pending parent,
+    so the result never sets both "checklist" and "checklist.<id>".
+    """
+    merged = {k: copy.deepcopy(v) for k, v in pending.items()}
+    for path, value in fields.items():
+        for old in [k for k in merged if k == path or k.startswith(path + ".")]:
+            del merged[old]
+        parent = next((k for k in merged if path.startswith(k + ".") and isinstance(merged[k], dict)), None)
+        if parent is None:
+            merged[path] = value
+            continue
+        target       = merged[parent]
+        *inner, last = path[len(parent) + 1:].split(".")
+        for part in inner:
+            target = target.setdefault(part, {})
+        target[last] = value
+    return merged
+
+
+def write_fields(oid: str, fields: Dict, upsert: bool = False) -> bool:
+    """
+    $set `fields` plus whatever earlier failed saves left in `unsaved_fields`.
+    A failed write keeps them there — the next save retries them, and the
+    session sweeper won't evict the session until they are written.
+    """
+    fields = merge_set(st.session_state.get("unsaved_fields", {}), fields)
+    stamp  = write_stamp()
     try:
-        col.update_one(
-            {"_id": oid},
-            {"$set": {
-                **data,
-                "_id":          oid,
-                "azure_email":  st.session_state.get("azure_email", ""),
-                "azure_name":   st.session_state.get("azure_name", ""),
-                "last_updated": datetime.utcnow().isoformat(),
-            }},
-            upsert=True,
-        )
-        return True
+        with db_deadline():
+            col = get_collection()
+            col.update_one({"_id": oid}, {"$set": {**fields, **stamp}}, upsert=upsert)
     except Exception as e:
+        st.session_state["unsaved_fields"] = fields
         st.warning(f"DB write error: {e}")
         return False
+    st.session_state.pop("unsaved_fields", None)
+    st.session_state["last_write_at"] = stamp["last_updated"]
+    return True
+
+
+def save_user_to_db(oid: str, data: Dict) -> bool:
+    if get_collection() is None:
+        return False
+    saved = write_fields(oid, {
+        **data,
+        "azure_email": st.session_state.get("azure_email", "").lower(),
+        "azure_name":  st.session_state.get("azure_name", ""),
+    }, upsert=True)
+    if saved and "s" not in st.query_params:
+        issue_session_token()
+    return saved
+
+
+def current_session_id() -> str:
+    ctx = get_script_run_ctx()
+    return ctx.session_id if ctx is not None else ""
+
 
+def write_stamp(session_id: Optional[str] = None) -> Dict[str, str]:
+    """last_updated plus the writing session, so live updates don't echo a save back to the session that made it."""
+    return {
+        "last_updated":     datetime.utcnow().isoformat(),
+        live.SESSION_FIELD: current_session_id() if session_id is None else session_id,
+    }
 
-def build_db_payload() -> Dict:
-    curriculum    = st.session_state.get("curriculum", [])
-    checklist_map = {row["Task"]: bool(row["Status"]) for row in curriculum}
+
+def save_fields_to_db(oid: str, fields: Dict) -> bool:
+    """$set only the given (dotted) fields — used for single clicks and role switches."""
+    if get_collection() is None or not oid:
+        return False
+    return write_fields(oid, fields)
+
+
+def progress_field(store: str, key: str) -> Dict:
+    """
+    Update for one entry of a progress map. Mongo can't address keys containing
+    "." or starting with "$" by path, so those fall back to rewriting the map.
+    """
+    status = st.session_state[store]
+    db_map = {
+        "task_status":      "checklist",
+        "navigator_status": "navigator_status",
+        "completion_days":  "completion_days",
+    }[store]
+    if "." in key or key.startswith("$") or key not in status:
+        return {db_map: dict(status)}
+    return {f"{db_map}.{key}": status[key]}
+
+
+def build_db_payload(state: Optional[Mapping] = None) -> Dict:
+    state         = st.session_state if state is None else state
+    checklist_map = {k: bool(v) for k, v in state.get("task_status", {}).items()}
     return {
         "profile": {
-            "name":       st.session_state.get("user_name", ""),
-            "role":       st.session_state.get("user_role", ""),
-            "start_date": str(st.session_state.get("start_date", date.today())),
-            "buddy":      st.session_state.get("buddy_name", ""),
-            "manager":    st.session_state.get("manager_name", ""),
+            "name":          state.get("user_name", ""),
+            "role":          state.get("user_role", ""),
+            "start_date":    str(state.get("start_date", date.today())),
+            "buddy":         state.get("buddy_name", ""),
+            "manager":       state.get("manager_name", ""),
+            "buddy_email":   state.get("buddy_email", ""),
+            "manager_email": state.get("manager_email", ""),
         },
+        "wizard_pending":   not state.get("wizard_done", True),
         "checklist":        checklist_map,
-        "navigator_status": st.session_state.get("navigator_status", {}),
+        "navigator_status": state.get("navigator_status", {}),
+        "completion_days":  state.get("completion_days", {}),
         "quiz": {
-            "perfect_quiz": st.session_state.get("perfect_quiz", False),
-            "quiz_state":   st.session_state.get("quiz_state", {}),
+            "perfect_quiz": state.get("perfect_quiz", False),
+            "quiz_state":   state.get("quiz_state", {}),
         },
         "badges": {
-            "session_completions": st.session_state.get("session_completions", 0),
+            "session_completions": state.get("session_completions", 0),
+            "unlocked":            state.get("badges_unlocked", {}),
         },
+        "leaderboard_opt_in": bool(state.get("leaderboard_opt_in", False)),
+        "schema_version":     schema.SCHEMA_VERSION,
+        **derived_fields(state),
     }
 
 
 def restore_from_db(doc: Dict) -> None:
     profile = doc.get("profile", {})
     st.session_state["user_name"]    = profile.get("name", st.session_state.get("azure_given_name", ""))
-    st.session_state["user_role"]    = profile.get("role", list(ROLE_KEY_MAP.keys())[0])
+    # A role the content has since renamed or removed falls back to the first, like bundle.role()
+    role = profile.get("role")
+    st.session_state["user_role"]    = role if role in ROLE_KEY_MAP else list(ROLE_KEY_MAP.keys())[0]
     try:
         st.session_state["start_date"] = date.fromisoformat(
             profile.get("start_date", str(date.today()))
         )
     except ValueError:
         st.session_state["start_date"] = date.today()
-    st.session_state["buddy_name"]   = profile.get("buddy",   "Your Buddy")
-    st.session_state["manager_name"] = profile.get("manager", "Your Manager")
+    st.session_state["buddy_name"]    = profile.get("buddy",   "Your Buddy")
+    st.session_state["manager_name"]  = profile.get("manager", "Your Manager")
+    st.session_state["buddy_email"]   = profile.get("buddy_email", "")
+    st.session_state["manager_email"] = profile.get("manager_email", "")
 
-    raw_data      = get_checklist_data(st.session_state["user_role"])
-    checklist_map = doc.get("checklist", {})
-    st.session_state["curriculum"] = [
-        {**t, "Status": checklist_map.get(t["Task"], False)} for t in raw_data
-    ]
-    st.session_state["navigator_status"] = doc.get("navigator_status", {})
-    init_navigator_status()
+    # Fields HR already provided — the wizard doesn't ask for them again
+    st.session_state["provisioned_fields"] = list(doc.get("provisioned", {}).get("fields", []))
+
+    # What flush_unsaved checks the document against before retrying a failed save
+    st.session_state["last_write_at"] = doc.get("last_updated") or ""
+
+    st.session_state["task_status"]      = dict(doc.get("checklist", {}))
+    st.session_state["navigator_status"] = dict(doc.get("navigator_status", {}))
+    st.session_state["completion_days"]  = dict(doc.get("completion_days", {}))
+    # Progress saved under titles or renamed IDs: translate it, and store it that way
+    if renamed := remap_progress_keys():
+        save_fields_to_db(doc.get("_id", ""), renamed)
 
     quiz = doc.get("quiz", {})
     st.session_state["perfect_quiz"] = quiz.get("perfect_quiz", False)
     st.session_state["quiz_state"]   = quiz.get("quiz_state", {})
     st.session_state["session_completions"] = doc.get("badges", {}).get("session_completions", 0)
-    st.session_state["wizard_done"]  = True
+    st.session_state["badges_unlocked"]     = dict(doc.get("badges", {}).get("unlocked", {}))
+    st.session_state["wizard_done"]  = not doc.get("wizard_pending", False)
+    st.session_state["leaderboard_opt_in"] = bool(doc.get("leaderboard_opt_in", False))
+
+
+def link_as_mentor() -> None:
+    """Once per session: claim the hires who named this user as manager or buddy."""
+    col = get_collection()
+    if col is None or st.session_state.get("mentor_linked"):
+        return
+    try:
+        with db_deadline():
+            linked = mentees.link_mentor(col, st.session_state.get("azure_oid", ""), st.session_state.get("azure_email", ""))
+        if linked:
+            get_mentees.clear()
+        st.session_state["mentor_linked"] = True
+    except Exception:
+        pass
+
+
+@st.cache_data(ttl=60, show_spinner=False)
+def get_mentees(oid: str) -> List[Dict]:
+    col = get_collection()
+    if col is None or not oid:
+        return []
+    try:
+        with db_deadline():
+            return mentees.find_mentees(col, oid)
+    except Exception:
+        return []
+
+
+def is_admin() -> bool:
+    try:
+        admins = st.secrets.get("admin", {}).get("emails", [])
+    except FileNotFoundError:
+        return False
+    email = st.session_state.get("azure_email", "").lower()
+    return bool(email) and email in {a.lower() for a in admins}
+
+
+def build_progress_export(fmt: str) -> Optional[bytes]:
+    """
+    Stream every user into a spooled temp file (memory-bounded while building);
+    only the finished file — compressed Parquet or plain CSV — is handed to the
+    download button. It stays in session state until downloaded or the session
+    is evicted (services/sessions.py HEAVY_KEYS). For very large exports use
+    `python -m tools.export` instead.
+    """
+    col = get_collection()
+    if col is None:
+        return None
+    rows = progress_export.iter_rows(col, bundle)
+    cols = progress_export.columns(bundle)
+    with tempfile.SpooledTemporaryFile(max_size=8 * 1024 * 1024) as fh:
+        if fmt == "parquet":
+            progress_export.write_parquet(rows, fh, cols)
+        else:
+            text = io.TextIOWrapper(fh, encoding="utf-8", newline="")
+            progress_export.write_csv(rows, text, cols)
+            text.flush()
+            text.detach()
+        fh.seek(0)
+        return fh.read()
 
 
 def sync_to_db() -> None:
@@ -334,43 +705,349 @@ def sync_to_db() -> None:
         save_user_to_db(oid, build_db_payload())
 
 
+def flush_unsaved(state, session_id: str) -> bool:
+    """
+    Session sweeper thread, before evicting: True once nothing in `state`
+    exists only in memory. Every click is saved as it happens; what a failed
+    save left in `unsaved_fields` is retried here, only if the document is
+    still as this session last wrote or loaded it — a newer save from another
+    tab or device is never overwritten, the session is just kept for now.
+    """
+    col = get_collection()
+    if col is None:
+        return False                                    # "⚠️ Local" mode: this is the only copy
+    if "unsaved_fields" not in state:
+        return True
+    seen = (state["last_write_at"] if "last_write_at" in state else "") or None
+    try:
+        with db_deadline():
+            result = col.update_one(
+                {"_id": state["azure_oid"], "last_updated": seen},
+                {"$set": {**state["unsaved_fields"], **write_stamp(session_id)}},
+            )
+    except Exception:
+        return False
+    if not result.matched_count:
+        return False
+    del state["unsaved_fields"]
+    return True
+
+
 # =============================================================================
-# STATE HELPERS
+# SESSION REGISTRY
 # =============================================================================
 
-def get_role_key(full_role: str) -> str:
-    return ROLE_KEY_MAP.get(full_role, "SPE")
+@st.cache_resource
+def get_session_registry() -> SessionRegistry:
+    try:
+        cfg = st.secrets.get("sessions", {})
+    except FileNotFoundError:
+        cfg = {}
+    registry = SessionRegistry(
+        flush=flush_unsaved,
+        idle_timeout_s=float(cfg.get("idle_timeout_min", 30)) * 60,
+        memory_budget_bytes=int(float(cfg.get("memory_budget_mb", 512)) * 1024 * 1024),
+        sweep_interval_s=float(cfg.get("sweep_interval_s", 60)),
+    )
+    registry.start()
+    return registry
+
+
+@st.cache_resource
+def get_event_log() -> EventLog:
+    try:
+        cfg = st.secrets.get("events", {})
+    except FileNotFoundError:
+        cfg = {}
+    log = EventLog(
+        get_db=get_database,
+        collection=cfg.get("collection", "events"),
+        flush_interval_s=float(cfg.get("flush_interval_s", 2)),
+        batch_size=int(cfg.get("batch_size", 500)),
+        ttl_days=int(cfg.get("ttl_days", 365)),
+    )
+    log.start()
+    return log
+
+
+@st.cache_resource
+def get_live_updates() -> Optional[live.LiveUpdates]:
+    try:
+        cfg = st.secrets.get("live", {})
+    except FileNotFoundError:
+        cfg = {}
+    if not cfg.get("enabled", True):
+        return None
+    updates = live.LiveUpdates(
+        get_db=get_database,
+        mode=cfg.get("mode", "auto"),
+        poll_interval_s=float(cfg.get("poll_interval_s", live.POLL_INTERVAL_S)),
+    )
+    updates.start()
+    return updates
+
+
+# Maps in the user document → their session-state copies and checkbox key prefixes
+LIVE_MAPS = {
+    "checklist":        ("task_status",      "chk_"),
+    "navigator_status": ("navigator_status", "nav_"),
+    "completion_days":  ("completion_days",  None),
+    "badges.unlocked":  ("badges_unlocked",  None),
+}
+LIVE_SCALARS = {
+    "badges.session_completions": ("session_completions", None),
+    "leaderboard_opt_in":         ("leaderboard_opt_in",  "lb_opt_in"),
+}
+# Derived or bookkeeping fields: nothing in session state to update
+LIVE_IGNORED = {"_id", "last_updated", live.SESSION_FIELD, "next_due", "summary", "xp", "level", "cohort",
+                "mentors", "azure_email", "azure_name", "auth_epoch", "resume", schema.VERSION_FIELD}
+
+
+def live_target(path: str) -> Optional[Tuple[str, str]]:
+    """(session-state key, map key or "") a document path lands in, or None if it has no delta mapping."""
+    if path in LIVE_SCALARS:
+        return LIVE_SCALARS[path][0], ""
+    for prefix, (state_key, _) in LIVE_MAPS.items():
+        if path == prefix or path.startswith(prefix + "."):
+            return state_key, path[len(prefix) + 1:]
+    return None
+
+
+def sync_progress_widgets() -> None:
+    """Point existing checkbox states at session state (set before the widgets render, so no callbacks fire)."""
+    for state_key, prefix in LIVE_MAPS.values():
+        if prefix is None:
+            continue
+        for key, done in st.session_state.get(state_key, {}).items():
+            widget = f"{prefix}{key}"
+            if widget in st.session_state and st.session_state[widget] != done:
+                st.session_state[widget] = done
+    for state_key, widget in LIVE_SCALARS.values():
+        if widget is not None and widget in st.session_state and state_key in st.session_state:
+            st.session_state[widget] = st.session_state[state_key]
+
+
+def apply_progress_delta(change: live.Change) -> None:
+    """Apply another session's click to this session; changes without a mapping (profile, quiz…) re-read the document."""
+    paths = [p for p in (*change.removed, *change.updated) if p.split(".", 1)[0] not in LIVE_IGNORED]
+    if any(live_target(p) is None for p in paths):
+        st.session_state["db_loaded"] = False          # reloaded by the bootstrap below
+        return
+    for path in change.removed:
+        if (target := live_target(path)) is not None:
+            state_key, key = target
+            if key:
+                st.session_state.get(state_key, {}).pop(key, None)
+            else:
+                st.session_state.pop(state_key, None)
+    for path, value in change.updated.items():
+        if (target := live_target(path)) is not None:
+            state_key, key = target
+            if not key:
+                st.session_state[state_key] = dict(value or {}) if isinstance(value, dict) else value
+            else:
+                st.session_state.setdefault(state_key, {})[key] = value
+
+
+def apply_live_updates() -> None:
+    """
+    What other sessions changed since this one last ran: this user's own
+    other tabs and devices, and (for mentors) their mentees.
+    """
+    updates = get_live_updates()
+    oid     = st.session_state.get("azure_oid", "")
+    if updates is None or not oid:
+        return
+    sid = current_session_id()
+    updates.subscribe(sid, [oid])
+    changes = updates.drain(sid)
+    own     = changes.pop(oid, None)
+    if changes:
+        get_mentees.clear()
+    if own is None or not st.session_state.get("db_loaded"):
+        return
+    if own.reload:
+        st.session_state["db_loaded"] = False
+    elif own.doc is not None:
+        # A polled document from before this session's own last save is stale
+        if (own.doc.get("last_updated") or "") >= st.session_state.get("last_write_at", ""):
+            restore_from_db(get_schema_upgrader().upgrade_loaded(own.doc))
+    else:
+        apply_progress_delta(own)
+    sync_progress_widgets()
 
 
-def navigator_course_key(section: str, course: str) -> str:
-    return f"{section}::{course}"
+def watch_mentees(mentee_docs: List[Dict]) -> None:
+    updates = get_live_updates()
+    if updates is not None:
+        updates.subscribe(current_session_id(), [d["_id"] for d in mentee_docs], scope="mentees")
 
 
-def init_navigator_status() -> None:
-    role_key = get_role_key(st.session_state.get("user_role", list(ROLE_KEY_MAP.keys())[0]))
-    st.session_state.setdefault("navigator_status", {})
-    status = st.session_state["navigator_status"]
-    for c in NAVIGATOR_COURSES["Mandatory"]:
-        status.setdefault(navigator_course_key("Mandatory", c), False)
-    for c in NAVIGATOR_COURSES.get(role_key, []):
-        status.setdefault(navigator_course_key(role_key, c), False)
+@st.cache_resource
+def get_schema_upgrader() -> schema.SchemaUpgrader:
+    try:
+        cfg = st.secrets.get("schema", {})
+    except FileNotFoundError:
+        cfg = {}
+    upgrader = schema.SchemaUpgrader(
+        get_db=get_database,
+        get_bundle=lambda: get_bundle_manager().current,
+        sweep_enabled=bool(cfg.get("sweep", True)),
+        sweep_batch=int(cfg.get("sweep_batch", schema.DEFAULT_BATCH)),
+        sweep_interval_s=float(cfg.get("sweep_interval_s", schema.DEFAULT_INTERVAL_S)),
+        idle_interval_s=float(cfg.get("idle_interval_s", schema.IDLE_INTERVAL_S)),
+    )
+    upgrader.start()
+    return upgrader
 
 
-def get_navigator_progress() -> Tuple[int, int]:
-    role_key = get_role_key(st.session_state["user_role"])
-    status   = st.session_state.get("navigator_status", {})
-    all_c    = (
-        [("Mandatory", c) for c in NAVIGATOR_COURSES["Mandatory"]]
-        + [(role_key, c) for c in NAVIGATOR_COURSES.get(role_key, [])]
+@st.cache_resource
+def get_nudge_scheduler() -> Optional[nudges.NudgeScheduler]:
+    try:
+        cfg = st.secrets.get("nudges", {})
+    except FileNotFoundError:
+        cfg = {}
+    if not cfg.get("enabled", False):
+        return None
+    scheduler = nudges.NudgeScheduler(
+        get_db=get_database,
+        get_bundle=lambda: get_bundle_manager().current,
+        sink=nudges.sink_from_config(cfg),
+        send_hour=int(cfg.get("send_hour", nudges.DEFAULT_SEND_HOUR)),
+        per_minute=int(cfg.get("max_per_minute", nudges.DEFAULT_PER_MINUTE)),
+        app_url=cfg.get("app_url", ""),
     )
+    scheduler.start()
+    return scheduler
+
+
+def derived_fields(state: Optional[Mapping] = None) -> Dict:
+    """This session's next_due / summary / xp / level / cohort (see schema.derived_fields)."""
+    state = st.session_state if state is None else state
+    return schema.derived_fields(
+        bundle, state.get("user_role", ""), state.get("start_date"),
+        state.get("task_status", {}), state.get("navigator_status", {}),
+    )
+
+
+@st.cache_resource
+def get_leaderboard() -> leaderboard.Leaderboard:
+    def load(cohort: str) -> List[Dict]:
+        col = get_collection()
+        if col is None:
+            return []
+        try:
+            with db_deadline():
+                return leaderboard.load_cohort(col, cohort)
+        except Exception:
+            return []
+
+    return leaderboard.Leaderboard(load)
+
+
+def save_progress(fields: Dict) -> None:
+    """Write one click's fields plus everything derived from progress, and re-rank locally."""
+    derived = derived_fields()
+    save_fields_to_db(st.session_state.get("azure_oid", ""), {**fields, **derived})
+    get_leaderboard().update(
+        st.session_state.get("azure_oid", ""), derived["cohort"], derived["xp"],
+        st.session_state.get("user_name", ""), derived["level"],
+        st.session_state.get("leaderboard_opt_in", False),
+    )
+
+
+def record_completion(item: str, kind: str, done: bool) -> None:
+    ctx = get_script_run_ctx()
+    get_event_log().record(
+        oid=st.session_state.get("azure_oid", ""),
+        item=item,
+        kind=kind,
+        done=done,
+        role=bundle.role(st.session_state.get("user_role", "")).key,
+        session=ctx.session_id if ctx is not None else "",
+        start_date=st.session_state.get("start_date"),
+    )
+
+
+def mark_completion_day(item: str, done: bool) -> None:
+    """Remember on which day of onboarding this user finished `item` — compared against peers."""
+    days = st.session_state.setdefault("completion_days", {})
+    if done:
+        days[item] = days_since_start()
+    else:
+        days.pop(item, None)
+
+
+@st.cache_data(ttl=300, show_spinner=False)
+def get_completion_stats() -> Dict[str, Dict]:
+    """Precomputed peer distributions (tools/analytics.py). Never scans users."""
+    db = get_database()
+    if db is None:
+        return {}
+    try:
+        with db_deadline():
+            return analytics.load_stats(db)
+    except Exception:
+        return {}
+
+
+def get_peer_standing() -> Optional[float]:
+    """Share of peers this user is ahead of across their role's tasks and courses, or None without data."""
+    role    = bundle.role(st.session_state["user_role"])
+    days    = st.session_state.get("completion_days", {})
+    tasks   = st.session_state.get("task_status", {})
+    courses = st.session_state.get("navigator_status", {})
+    items   = [("task", task_id(t)) for t in role.tasks] + [
+        ("course", c.id) for c in role.courses
+    ]
+    # Done before completion days were recorded: no day to compare, so leave it out
+    items = [
+        (kind, item) for kind, item in items
+        if item in days or not (tasks if kind == "task" else courses).get(item, False)
+    ]
+    return analytics.ahead_of_peers(get_completion_stats(), items, days, days_since_start())
+
+
+def touch_session() -> None:
+    ctx = get_script_run_ctx()
+    if ctx is not None:
+        get_session_registry().touch(
+            ctx.session_id, ctx.session_state, st.session_state.get("azure_oid", ""),
+        )
+
+
+# =============================================================================
+# STATE HELPERS
+# =============================================================================
+
+def task_id(task: Mapping) -> str:
+    return task["ID"]
+
+
+def get_curriculum() -> List[Dict]:
+    """
+    The active role's checklist with each task's status. Progress lives in one
+    store per user (task_status, keyed by task ID across every role), so this
+    is a view: switching role changes which tasks it shows, not what's done.
+    """
+    status = st.session_state.get("task_status", {})
+    return [
+        {**t, "Status": bool(status.get(task_id(t), False))}
+        for t in get_checklist_data(st.session_state["user_role"])
+    ]
+
+
+def get_navigator_progress() -> Tuple[int, int]:
+    status = st.session_state.get("navigator_status", {})
+    all_c  = bundle.role(st.session_state["user_role"]).courses
     return (
-        sum(1 for s, c in all_c if status.get(navigator_course_key(s, c), False)),
+        sum(1 for c in all_c if status.get(c.id, False)),
         len(all_c),
     )
 
 
 def get_overall_progress() -> Tuple[float, float, float]:
-    df = pd.DataFrame(st.session_state["curriculum"])
+    df = pd.DataFrame(get_curriculum())
     cp = df["Status"].sum() / len(df) if not df.empty else 0.0
     nd, nt = get_navigator_progress()
     np_ = nd / nt if nt > 0 else 0.0
@@ -378,62 +1055,133 @@ def get_overall_progress() -> Tuple[float, float, float]:
 
 
 def get_xp_and_level() -> Tuple[int, int, str]:
-    df = pd.DataFrame(st.session_state["curriculum"])
+    df = pd.DataFrame(get_curriculum())
     cd = int(df["Status"].sum()) if not df.empty else 0
     nd, nt = get_navigator_progress()
-    xp     = cd * 20 + nd * 50
-    max_xp = len(df) * 20 + nt * 50 if not df.empty else 100
-    if xp == 0:              lvl = "Welcome Aboard 👋"
-    elif xp < max_xp * .30: lvl = "Rising Star ⭐"
-    elif xp < max_xp * .60: lvl = "Momentum Builder 🚀"
-    elif xp < max_xp * .85: lvl = "Process Pro 🧠"
-    elif xp < max_xp:        lvl = "Almost There 🔥"
-    else:                    lvl = "SPAE Champion 🏆"
-    return xp, max_xp, lvl
+    return leaderboard.xp_and_level(cd, len(df), nd, nt)
 
 
 def get_earned_badges() -> List[str]:
-    df  = pd.DataFrame(st.session_state["curriculum"])
-    nd, nt = get_navigator_progress()
-    _, _, op = get_overall_progress()
-    w1  = df[df["Phase"].isin(["Day 1", "Week 1"])]
-    cd  = int(df["Status"].sum()) if not df.empty else 0
-    earned = []
-    if cd >= 1:                                               earned.append("first_step")
-    if not w1.empty and w1["Status"].sum() == len(w1):       earned.append("week1_done")
-    if op >= 0.5:                                             earned.append("half_way")
-    if nt > 0 and nd == nt:                                   earned.append("learning_done")
-    if op >= 1.0:                                             earned.append("champion")
-    if st.session_state.get("session_completions", 0) >= 5:  earned.append("speed_runner")
-    return earned
+    unlocked = st.session_state.get("badges_unlocked", {})
+    return [b["id"] for b in ALL_BADGES if b["id"] in unlocked]
+
+
+def unlock_badges(changed: Optional[frozenset] = None) -> Dict:
+    """
+    Evaluate the badge rules that read what just `changed` (all of them when
+    None) and return the fields to persist for any that unlocked.
+    """
+    unlocked = st.session_state.setdefault("badges_unlocked", {})
+    facts    = BadgeFacts(
+        bundle.role(st.session_state["user_role"]),
+        st.session_state.get("task_status", {}),
+        st.session_state.get("navigator_status", {}),
+        st.session_state.get("session_completions", 0),
+        st.session_state.get("completion_days", {}),
+    )
+    fields = {}
+    names  = {b["id"]: b for b in ALL_BADGES}
+    for bid in bundle.badge_rules.evaluate(facts, unlocked, changed):
+        unlocked[bid] = fields[f"badges.unlocked.{bid}"] = datetime.utcnow().isoformat()
+        st.toast(f"Badge unlocked: {names[bid]['name']}", icon=names[bid]["icon"])
+    return fields
 
 
 def reset_user() -> None:
-    raw = get_checklist_data(st.session_state["user_role"])
-    st.session_state["curriculum"]          = [{**t, "Status": False} for t in raw]
+    st.session_state["task_status"]         = {}
     st.session_state["navigator_status"]    = {}
-    init_navigator_status()
+    st.session_state["completion_days"]     = {}
+    st.session_state["badges_unlocked"]     = {}
     st.session_state["quiz_state"]          = {}
     st.session_state["session_completions"] = 0
     st.session_state["perfect_quiz"]        = False
 
 
-def toggle_status(index: int) -> None:
-    was = st.session_state["curriculum"][index]["Status"]
-    st.session_state["curriculum"][index]["Status"] = not was
+def remap_progress_keys() -> Dict:
+    """
+    Translate this session's progress maps through the bundle's aliases (see
+    services/content_ids.py). Returns the DB fields to rewrite — empty when
+    every key was already a current ID.
+    """
+    fields = {}
+    for store, db_field, remap in (
+        ("task_status",      "checklist",        bundle.remap_tasks),
+        ("navigator_status", "navigator_status", bundle.remap_courses),
+        ("completion_days",  "completion_days",  bundle.remap_days),
+    ):
+        stored = st.session_state.get(store, {})
+        moved  = remap(stored)
+        if moved != stored:
+            st.session_state[store] = moved
+            fields[db_field]        = dict(moved)
+    return fields
+
+
+def remap_progress_to_bundle() -> None:
+    """
+    Move this session onto the live content bundle. Progress is keyed by task
+    and course ID; IDs the new content renamed move across through its aliases,
+    and a role it no longer has falls back to the first.
+    """
+    if st.session_state.get("user_role") not in ROLE_KEY_MAP:
+        st.session_state["user_role"] = list(ROLE_KEY_MAP.keys())[0]
+    if renamed := remap_progress_keys():
+        save_progress(renamed)
+
+
+def switch_role(full_role: str) -> None:
+    """Point the session at another role's view. Shared progress carries over as-is."""
+    st.session_state["user_role"] = full_role
+    save_progress({"profile.role": full_role, **unlock_badges()})
+
+
+def evicted_widget_echo() -> bool:
+    """
+    An evicted session's checkbox keys are gone, so on its next rerun every
+    value the page re-sends looks like a change and fires its callback. Those
+    aren't clicks: ignore them; the reload re-renders the boxes from the DB.
+    """
+    return bool(st.session_state.get("evicted_at"))
+
+
+def toggle_status(tid: str, title: str) -> None:
+    if evicted_widget_echo():
+        return
+    status = st.session_state.setdefault("task_status", {})
+    was    = bool(status.get(tid, False))
+    status[tid] = not was
+    record_completion(tid, "task", not was)
+    mark_completion_day(tid, not was)
     if not was:
-        st.toast(f"✅ '{st.session_state['curriculum'][index]['Task']}' done! +20 XP", icon="🔥")
+        st.toast(f"✅ '{title}' done! +20 XP", icon="🔥")
         st.session_state["session_completions"] = st.session_state.get("session_completions", 0) + 1
-    sync_to_db()
+    save_progress({
+        **progress_field("task_status", tid),
+        **progress_field("completion_days", tid),
+        "badges.session_completions": st.session_state.get("session_completions", 0),
+        **unlock_badges(TASK_CHANGE),
+    })
 
 
-def nav_click_callback(section: str, course: str) -> None:
-    key     = navigator_course_key(section, course)
+def nav_click_callback(key: str, course: str) -> None:
+    if evicted_widget_echo():
+        return
     is_done = st.session_state[f"nav_{key}"]
-    st.session_state["navigator_status"][key] = is_done
+    st.session_state.setdefault("navigator_status", {})[key] = is_done
+    record_completion(key, "course", is_done)
+    mark_completion_day(key, is_done)
     if is_done:
         st.toast(f"🎓 '{course}' complete! +50 XP", icon="🌟")
-    sync_to_db()
+    save_progress({
+        **progress_field("navigator_status", key),
+        **progress_field("completion_days", key),
+        **unlock_badges(COURSE_CHANGE),
+    })
+
+
+def leaderboard_opt_in_callback() -> None:
+    st.session_state["leaderboard_opt_in"] = st.session_state["lb_opt_in"]
+    save_progress({"leaderboard_opt_in": st.session_state["leaderboard_opt_in"]})
 
 
 def days_since_start() -> int:
@@ -444,45 +1192,27 @@ def days_since_start() -> int:
 # CSS
 # =============================================================================
 
+@st.cache_resource
+def get_assets() -> assets.AssetManifest:
+    """Self-hosted fonts and images built by `python -m tools.assets` (read once per process)."""
+    return assets.load_manifest()
+
+
+@st.cache_resource
+def get_theme_css() -> theme.ThemeCSS:
+    """Global stylesheet for the configured theme, compiled from config.toml once per process."""
+    return theme.compile_theme(
+        {k: st.get_option(f"theme.{k}") for k in theme.THEME_KEYS},
+        font_css=get_assets().font_css(["Plus Jakarta Sans"]),
+    )
+
+
 def inject_global_css():
-    st.markdown("""
-        <style>
-        @import url('https://fonts.googleapis.com/css2?family=Plus+Jakarta+Sans:wght@400;500;600;700;800&display=swap');
-        html,body,p,div,h1,h2,h3,h4,h5,h6,li,span,label,a{font-family:'Plus Jakarta Sans',sans-serif;}
-        .stApp::before{content:"";position:fixed;top:0;left:0;right:0;height:5px;
-            background:linear-gradient(90deg,#4f46e5,#0ea5e9,#10b981);z-index:99999;}
-        [data-testid="stMetricValue"]{font-weight:800;font-size:2.2rem;}
-        [data-testid="stMetricLabel"]>div{font-size:0.95rem;font-weight:600;opacity:0.8;}
-        .hero-card{padding:2rem;border-radius:1rem;
-            background-color:var(--secondary-background-color);
-            border:1px solid rgba(128,128,128,0.2);
-            box-shadow:0 8px 24px -5px rgba(0,0,0,0.1);margin-bottom:2rem;}
-        .hero-card h1{font-size:2.5rem;font-weight:800;letter-spacing:-0.5px;margin-bottom:0.2rem;}
-        .pill{display:inline-flex;align-items:center;padding:0.4rem 1rem;border-radius:999px;
-            font-size:0.85rem;font-weight:700;border:1px solid var(--primary-color);
-            background:linear-gradient(90deg,rgba(79,70,229,0.1),rgba(16,185,129,0.1));
-            color:var(--primary-color);}
-        .badge-card{padding:1rem;border-radius:0.75rem;text-align:center;
-            background-color:var(--secondary-background-color);
-            border:1px solid rgba(128,128,128,0.15);transition:transform 0.2s;}
-        .badge-card:hover{transform:translateY(-3px);}
-        .badge-locked{opacity:0.35;filter:grayscale(1);}
-        .badge-icon{font-size:2.5rem;line-height:1;}
-        .badge-name{font-weight:700;font-size:0.85rem;margin-top:4px;}
-        .badge-desc{font-size:0.75rem;opacity:0.7;margin-top:2px;}
-        .checklist-row{padding:0.5rem 1rem;border-radius:0.5rem;
-            border-left:3px solid transparent;
-            background-color:var(--secondary-background-color);
-            margin-bottom:0.5rem;transition:all 0.2s cubic-bezier(0.4,0,0.2,1);}
-        .checklist-row:hover{border-left:3px solid var(--primary-color);transform:translateX(4px);}
-        .tip-box{font-size:0.8rem;opacity:0.75;padding:2px 8px;
-            border-left:2px solid #0ea5e9;margin-top:2px;}
-        .mentor-badge{background:rgba(128,128,128,0.15);padding:4px 8px;
-            border-radius:6px;font-size:0.8rem;font-weight:600;}
-        .days-counter{font-size:3rem;font-weight:800;color:var(--primary-color);line-height:1;}
-        .muted{opacity:0.85;font-size:1.05rem;line-height:1.6;}
-        </style>
-    """, unsafe_allow_html=True)
+    """Once per browser session — the stylesheet stays in the page <head> across reruns."""
+    if st.session_state.get("global_css_sent"):
+        return
+    st.session_state["global_css_sent"] = True
+    components.html(theme.loader_html(get_theme_css().css), height=0)
 
 
 # =============================================================================
@@ -511,79 +1241,47 @@ def create_donut_chart(progress: float):
     )
 
 
+@st.cache_resource
+def get_certificate_service() -> certificates.CertificateService:
+    try:
+        cfg = st.secrets.get("certificates", {})
+    except FileNotFoundError:
+        cfg = {}
+    return certificates.CertificateService(
+        cache_dir=cfg.get("cache_dir", certificates.DEFAULT_CACHE_DIR),
+        workers=int(cfg.get("workers", certificates.DEFAULT_WORKERS)),
+    )
+
+
+def certificate_data() -> certificates.CertificateData:
+    """Completion date is the day the last item was ticked, so the certificate doesn't change daily."""
+    start = st.session_state.get("start_date", date.today())
+    days  = st.session_state.get("completion_days", {})
+    return certificates.CertificateData(
+        name=st.session_state.get("user_name", "Team Member"),
+        role=st.session_state.get("user_role", ""),
+        manager=st.session_state.get("manager_name", "Line Manager"),
+        completed_on=start + timedelta(days=max(days.values())) if days else date.today(),
+    )
+
+
 def generate_certificate_html() -> str:
-    name  = st.session_state.get("user_name", "Team Member")
-    role  = st.session_state.get("user_role", "")
-    mgr   = st.session_state.get("manager_name", "Line Manager")
-    today = date.today().strftime("%B %d, %Y")
-    return f"""<!DOCTYPE html><html><head>
-    <style>
-        @import url('https://fonts.googleapis.com/css2?family=Playfair+Display:wght@700&family=Plus+Jakarta+Sans:wght@400;600&display=swap');
-        body{{margin:0;background:#f8f7f4;display:flex;justify-content:center;align-items:center;min-height:100vh;}}
-        .cert{{width:780px;padding:60px 70px;background:white;border:12px solid transparent;
-               border-image:linear-gradient(135deg,#4f46e5,#0ea5e9,#10b981) 1;
-               text-align:center;font-family:'Plus Jakarta Sans',sans-serif;
-               box-shadow:0 20px 60px rgba(0,0,0,0.12);}}
-        h1{{font-family:'Playfair Display',serif;font-size:2.6rem;color:#1f2937;margin:0 0 8px;}}
-        .name{{font-family:'Playfair Display',serif;font-size:3.2rem;color:#4f46e5;
-               border-bottom:2px solid #e5e7eb;padding-bottom:12px;margin-bottom:24px;}}
-        .role-badge{{display:inline-block;background:linear-gradient(90deg,#4f46e5,#0ea5e9);
-                     color:white;padding:8px 24px;border-radius:999px;font-weight:600;margin-bottom:32px;}}
-        .footer{{display:flex;justify-content:space-between;margin-top:40px;
-                 border-top:1px solid #e5e7eb;padding-top:24px;color:#9ca3af;font-size:0.8rem;}}
-    </style></head><body>
-    <div class="cert">
-        <div style="font-size:3rem">⚙️</div>
-        <p style="color:#6b7280;letter-spacing:3px;text-transform:uppercase;font-size:0.9rem">
-            SPAE Onboarding Hub</p>
-        <h1>Certificate of Completion</h1>
-        <p style="color:#6b7280">This certifies that</p>
-        <div class="name">{name}</div>
-        <div class="role-badge">{role}</div>
-        <p style="color:#374151;max-width:560px;margin:0 auto 32px;line-height:1.7">
-            has successfully completed the SPAE onboarding programme, fulfilling all required
-            training modules, system access tasks, and milestone activities.
-        </p>
-        <div class="footer">
-            <div style="text-align:left">
-                <b style="color:#374151">{mgr}</b><br>Line Manager
-            </div>
-            <div style="font-size:2rem">🏆</div>
-            <div style="text-align:right">
-                <b style="color:#374151">{today}</b><br>Date of Completion
-            </div>
-        </div>
-    </div></body></html>"""
+    font_css = get_assets().font_css(["Playfair Display", "Plus Jakarta Sans"])
+    return get_certificate_service().html(certificate_data(), font_css)
 
 
-def get_tech_stack_graph(role_key: str):
-    if not HAS_GRAPHVIZ:
+def get_tech_stack_graph(stack: Optional[Mapping]):
+    if not HAS_GRAPHVIZ or not stack:
         return None
     g = graphviz.Digraph()
     g.attr(rankdir="LR", bgcolor="transparent")
     g.attr("node", shape="box", style="filled", fontname="Helvetica, sans-serif")
     g.attr("edge", color="#cbd5e1", fontcolor="#cbd5e1", fontsize="10")
-    if role_key == "SE":
-        g.node("C",   "Customer Site",      fillcolor="#bae6fd", color="#0284c7")
-        g.node("SF",  "Salesforce (CRM)",   shape="ellipse", fillcolor="#fef08a", color="#ca8a04")
-        g.node("SAP", "SAP Service Module", shape="ellipse", fillcolor="#fef08a", color="#ca8a04")
-        g.node("MOM", "MOM App (Mobile)",   fillcolor="#bbf7d0", color="#16a34a")
-        g.node("KOLA","KOLA (Parts DB)",    shape="cylinder",   fillcolor="#e9d5ff", color="#9333ea")
-        g.edge("C",   "SF",  label=" Ticket")
-        g.edge("SF",  "SAP", label=" Dispatch")
-        g.edge("SAP", "MOM", label=" Work Order")
-        g.edge("MOM", "KOLA",label=" Lookup")
-        g.edge("MOM", "SAP", label=" Timesheet")
-    else:
-        g.node("V",     "Vendor / Supplier",  fillcolor="#bae6fd", color="#0284c7")
-        g.node("SAP",   "SAP GUI (ERP)",      shape="ellipse",   fillcolor="#fef08a", color="#ca8a04")
-        g.node("PLM",   "Agile PLM",          shape="ellipse",   fillcolor="#e9d5ff", color="#9333ea")
-        g.node("CAD",   "Creo / Vault",       fillcolor="#bbf7d0", color="#16a34a")
-        g.node("GLOPPS","GLOPPS (Logistics)", shape="cylinder",   fillcolor="#fecdd3", color="#e11d48")
-        g.edge("V",   "SAP",    label=" Invoices")
-        g.edge("SAP", "GLOPPS", label=" Inventory")
-        g.edge("PLM", "SAP",    label=" Part No.")
-        g.edge("CAD", "PLM",    label=" Drawings")
+    for n in stack.get("nodes", ()):
+        g.node(n["id"], n["label"], shape=n.get("shape", "box"),
+               fillcolor=n.get("fill", "#e2e8f0"), color=n.get("color", "#64748b"))
+    for e in stack.get("edges", ()):
+        g.edge(e["from"], e["to"], label=f" {e['label']}" if e.get("label") else None)
     return g
 
 
@@ -594,32 +1292,63 @@ def get_tech_stack_graph(role_key: str):
 def show_wizard():
     given_name = st.session_state.get("azure_given_name", "")
     email      = st.session_state.get("azure_email", "")
-    st.markdown(f"""
-        <div style="max-width:640px;margin:40px auto 0 auto;text-align:center;">
-            <div style="font-size:3rem;">⚙️</div>
-            <h1 style="font-size:2rem;font-weight:800;margin:8px 0 4px;">
-                Welcome, {given_name or 'there'}!
-            </h1>
-            <p style="opacity:0.7;">
-                Signed in as <strong>{email}</strong>.<br>
-                Let's personalise your onboarding — takes 30 seconds.
-            </p>
-        </div>
-    """, unsafe_allow_html=True)
+    st.markdown(templates.render("wizard_header.html", given_name=given_name, email=email), unsafe_allow_html=True)
     col = st.columns([1, 2, 1])[1]
     with col:
         with st.container(border=True):
-            st.markdown("#### 👤 Your Details")
-            name  = st.text_input("Preferred First Name", value=given_name, placeholder="e.g. Jordan")
-            role  = st.selectbox("Your Role", list(ROLE_KEY_MAP.keys()))
-            start = st.date_input(
-                "Your Start Date",
-                value=date.today(),
-                max_value=date.today() + timedelta(days=30),
+            # Anything HR already provided (tools/provision.py) is shown, not asked
+            known = set(st.session_state.get("provisioned_fields", []))
+            if known:
+                st.markdown("#### 🗂 From HR")
+                facts = {
+                    "name":       ("Name",       st.session_state.get("user_name", "")),
+                    "role":       ("Role",       st.session_state.get("user_role", "")),
+                    "start_date": ("Start date", st.session_state.get("start_date", "")),
+                    "buddy":      ("Buddy",      st.session_state.get("buddy_name", "")),
+                    "manager":    ("Manager",    st.session_state.get("manager_name", "")),
+                }
+                for field_name, (label, value) in facts.items():
+                    if field_name in known:
+                        st.markdown(f"**{label}:** {value}")
+            if not {"name", "role", "start_date"} <= known:
+                st.markdown("#### 👤 Your Details")
+            name = (
+                st.session_state.get("user_name", "") if "name" in known else
+                st.text_input("Preferred First Name", value=given_name, placeholder="e.g. Jordan")
+            )
+            role = (
+                st.session_state.get("user_role", "") if "role" in known else
+                st.selectbox("Your Role", list(ROLE_KEY_MAP.keys()))
+            )
+            start = (
+                st.session_state.get("start_date", date.today()) if "start_date" in known else
+                st.date_input(
+                    "Your Start Date",
+                    value=date.today(),
+                    max_value=date.today() + timedelta(days=30),
+                )
+            )
+            if not {"buddy", "manager"} <= known:
+                st.markdown("#### 🤝 Your Support Network")
+            buddy = (
+                st.session_state.get("buddy_name", "") if "buddy" in known else
+                st.text_input("Buddy's Name", placeholder="e.g. Sarah J.")
+            )
+            buddy_email = (
+                st.session_state.get("buddy_email", "") if "buddy" in known else
+                st.text_input("Buddy's Email (optional)", placeholder="sarah.j@example.com")
+            )
+            manager = (
+                st.session_state.get("manager_name", "") if "manager" in known else
+                st.text_input("Manager's Name", placeholder="e.g. Mike R.")
+            )
+            manager_email = (
+                st.session_state.get("manager_email", "") if "manager" in known else
+                st.text_input(
+                    "Manager's Email (optional)", placeholder="mike.r@example.com",
+                    help="Your buddy and manager get a short digest if tasks slip past their deadline.",
+                )
             )
-            st.markdown("#### 🤝 Your Support Network")
-            buddy   = st.text_input("Buddy's Name",   placeholder="e.g. Sarah J.")
-            manager = st.text_input("Manager's Name", placeholder="e.g. Mike R.")
             st.markdown("")
             if st.button("🚀 Start My Onboarding", use_container_width=True, type="primary"):
                 if not name.strip():
@@ -631,6 +1360,8 @@ def show_wizard():
                         "start_date":   start,
                         "buddy_name":   buddy.strip()   or "Your Buddy",
                         "manager_name": manager.strip() or "Your Manager",
+                        "buddy_email":   buddy_email.strip().lower(),
+                        "manager_email": manager_email.strip().lower(),
                         "wizard_done":  True,
                     })
                     reset_user()
@@ -650,23 +1381,52 @@ if not st.session_state.get("authenticated"):
     show_login_page()
     st.stop()
 
-# First time seeing this user: try to load their saved state from MongoDB
+touch_session()
+ensure_user_indexes()
+get_nudge_scheduler()
+get_schema_upgrader()
+apply_live_updates()
+
+# First time seeing this user (or returning after idle eviction):
+# try to load their saved state from MongoDB
 if not st.session_state.get("db_loaded"):
     oid = st.session_state.get("azure_oid", "")
-    doc = load_user_from_db(oid) if oid else None
+    try:
+        doc = load_user_from_db(oid) if oid else None
+        if doc is None and oid:
+            doc = claim_provisioned_user(oid, st.session_state.get("azure_email", ""))
+        failed = False
+    except Exception:
+        doc, failed = None, True
     if doc:
-        restore_from_db(doc)
-        st.session_state["db_loaded"]   = True
-        st.session_state["wizard_done"] = True
+        # Older document shapes are upgraded here; the write-back happens in the background
+        restore_from_db(get_schema_upgrader().upgrade_loaded(doc))
+        sync_progress_widgets()
+        st.session_state["db_loaded"] = True
+        st.session_state.pop("evicted_at", None)
+    elif failed or st.session_state.get("evicted_at"):
+        # The database is unreachable, or holds this evicted session's progress —
+        # never fall back to the wizard, which would overwrite the saved progress
+        st.warning("⏳ Reconnecting to your saved progress… please refresh in a moment.")
+        st.stop()
     else:
         st.session_state["db_loaded"]   = True
         st.session_state["wizard_done"] = False
         st.session_state.setdefault("user_role", list(ROLE_KEY_MAP.keys())[0])
-        st.session_state.setdefault("curriculum", [
-            {**t, "Status": False}
-            for t in get_checklist_data(st.session_state["user_role"])
-        ])
-        init_navigator_status()
+        st.session_state.setdefault("task_status", {})
+        st.session_state.setdefault("navigator_status", {})
+
+link_as_mentor()
+
+# Content changed since this session last ran: move it to the new version
+if st.session_state.get("content_version") != bundle.version:
+    if st.session_state.get("content_version") is not None:
+        remap_progress_to_bundle()
+        st.toast(f"📚 Onboarding content updated (v{bundle.version})", icon="✨")
+    st.session_state["content_version"] = bundle.version
+    # Badges earned before they were tracked, or by rules this content just added
+    if st.session_state.get("wizard_done") and (new_badges := unlock_badges()):
+        save_fields_to_db(st.session_state.get("azure_oid", ""), new_badges)
 
 # New users see the profile wizard
 if not st.session_state.get("wizard_done"):
@@ -678,21 +1438,13 @@ if not st.session_state.get("wizard_done"):
 # SIDEBAR
 # =============================================================================
 
-role_key     = get_role_key(st.session_state["user_role"])
+active_role  = bundle.role(st.session_state["user_role"])
+role_key     = active_role.key
 user_name    = st.session_state.get("user_name", "New Hire")
 buddy_name   = st.session_state.get("buddy_name", "Your Buddy")
 manager_name = st.session_state.get("manager_name", "Your Manager")
 azure_email  = st.session_state.get("azure_email", "")
 db_ok        = get_collection() is not None
-db_pill      = (
-    '<span style="background:rgba(16,185,129,0.15);color:#10b981;'
-    'border:1px solid rgba(16,185,129,0.3);border-radius:999px;'
-    'padding:1px 8px;font-size:0.7rem;font-weight:700;">🗄️ Synced</span>'
-    if db_ok else
-    '<span style="background:rgba(239,68,68,0.1);color:#ef4444;'
-    'border:1px solid rgba(239,68,68,0.2);border-radius:999px;'
-    'padding:1px 8px;font-size:0.7rem;font-weight:700;">⚠️ Local</span>'
-)
 
 with st.sidebar:
     st.markdown("""
@@ -706,38 +1458,18 @@ with st.sidebar:
         </div>
     """, unsafe_allow_html=True)
 
-    st.markdown(f"""
-        <div style="background:rgba(79,70,229,0.08);border-radius:0.75rem;
-                    padding:12px 14px;margin-bottom:16px;
-                    border:1px solid rgba(79,70,229,0.15);">
-            <div style="display:flex;align-items:center;justify-content:space-between;">
-                <div style="font-weight:700;font-size:1rem;">👋 {user_name}</div>
-                {db_pill}
-            </div>
-            <div style="font-size:0.78rem;opacity:0.6;margin-top:3px;">{azure_email}</div>
-            <div style="font-size:0.78rem;opacity:0.6;margin-top:6px;">
-                {st.session_state['user_role'].split('(')[0].strip()}
-            </div>
-            <div style="font-size:0.78rem;opacity:0.6;margin-top:4px;">
-                🤝 Buddy: <b>{buddy_name}</b>
-            </div>
-            <div style="font-size:0.78rem;opacity:0.6;margin-top:2px;">
-                👔 Manager: <b>{manager_name}</b>
-            </div>
-        </div>
-    """, unsafe_allow_html=True)
+    st.markdown(templates.render(
+        "sidebar_profile.html",
+        user_name=user_name,
+        synced=db_ok,
+        email=azure_email,
+        role=st.session_state["user_role"].split("(")[0].strip(),
+        buddy_name=buddy_name,
+        manager_name=manager_name,
+    ), unsafe_allow_html=True)
 
     days = days_since_start()
-    st.markdown(f"""
-        <div style="text-align:center;padding:8px;
-                    background:rgba(16,185,129,0.08);border-radius:0.5rem;
-                    margin-bottom:12px;border:1px solid rgba(16,185,129,0.2);">
-            <div class="days-counter">{days}</div>
-            <div style="font-size:0.8rem;opacity:0.7;font-weight:600;">
-                day{"s" if days != 1 else ""} on the team
-            </div>
-        </div>
-    """, unsafe_allow_html=True)
+    st.markdown(templates.render("days_counter.html", days=days), unsafe_allow_html=True)
 
     selected_role = st.selectbox(
         "Switch Role",
@@ -745,16 +1477,18 @@ with st.sidebar:
         index=list(ROLE_KEY_MAP.keys()).index(st.session_state["user_role"]),
     )
     if selected_role != st.session_state["user_role"]:
-        st.session_state["user_role"] = selected_role
-        reset_user()
-        sync_to_db()
+        switch_role(selected_role)
         st.rerun()
 
     st.markdown("---")
+    my_mentees = get_mentees(st.session_state.get("azure_oid", ""))
+    watch_mentees(my_mentees)
     page = st.radio(
         "Navigation",
         ["Dashboard", "Requests & Learning", "Checklist",
-         "Achievements", "Mentor Guide", "Good to Know"],
+         "Achievements", "Mentor Guide"]
+        + (["My Mentees"] if my_mentees else [])
+        + ["Good to Know"],
         label_visibility="collapsed",
     )
     st.markdown("---")
@@ -774,15 +1508,53 @@ with st.sidebar:
             else:
                 st.error("No matches found.")
 
+    if is_admin():
+        with st.popover("📤 HR Progress Export", use_container_width=True):
+            fmt = st.radio(
+                "Format", ["parquet", "csv"], horizontal=True,
+                disabled=not progress_export.HAS_PYARROW,
+                index=0 if progress_export.HAS_PYARROW else 1,
+            )
+            if st.button("Prepare export", use_container_width=True):
+                with st.spinner("Streaming user documents…"):
+                    st.session_state["admin_export"] = (fmt, build_progress_export(fmt))
+            prepared = st.session_state.get("admin_export")
+            if prepared and prepared[1] is not None:
+                st.download_button(
+                    f"⬇️ Download .{prepared[0]}",
+                    data=prepared[1],
+                    file_name=progress_export.export_filename(prepared[0]),
+                    mime="application/octet-stream" if prepared[0] == "parquet" else "text/csv",
+                    use_container_width=True,
+                    on_click=lambda: st.session_state.pop("admin_export", None),
+                )
+            elif prepared:
+                st.error("MongoDB isn't connected — nothing to export.")
+
+        with st.popover("📈 Runtime Stats", use_container_width=True):
+            sessions = get_session_registry().stats()
+            sessions.pop("per_session", None)
+            st.caption("MongoDB pool (this replica)")
+            st.json(get_pool_metrics().stats(), expanded=False)
+            st.caption("Sessions")
+            st.json(sessions, expanded=False)
+            st.caption("Event log")
+            st.json(get_event_log().stats(), expanded=False)
+            st.caption("Schema upgrader")
+            st.json(get_schema_upgrader().counts, expanded=False)
+            if get_live_updates() is not None:
+                st.caption("Live updates")
+                st.json(get_live_updates().stats(), expanded=False)
+
     st.markdown("---")
     st.caption("Quick Links")
 
-    # Common links — shown to everyone
-    for link_name, url in QUICK_LINKS.get("Common", {}).items():
+    # Shared links — shown to everyone
+    for link_name, url in active_role.links_shared.items():
         st.markdown(f"🔗 [{link_name}]({url})")
 
-    # Role-specific links — only shown to the active role
-    role_links = QUICK_LINKS.get(role_key, {})
+    # Role-specific links — the active role's own and those it inherits
+    role_links = active_role.links_specific
     if role_links:
         st.caption(f"{role_key} Links")
         for link_name, url in role_links.items():
@@ -790,6 +1562,8 @@ with st.sidebar:
 
     st.markdown("---")
     if st.button("🚪 Sign Out", use_container_width=True):
+        revoke_session_tokens(st.session_state.get("azure_oid", ""))
+        st.query_params.clear()
         for k in list(st.session_state.keys()):
             del st.session_state[k]
         st.rerun()
@@ -799,7 +1573,8 @@ with st.sidebar:
 # PAGES
 # =============================================================================
 
-role_key = get_role_key(st.session_state["user_role"])
+active_role = bundle.role(st.session_state["user_role"])
+role_key    = active_role.key
 
 # ── DASHBOARD ─────────────────────────────────────────────────────────────────
 if page == "Dashboard":
@@ -807,17 +1582,13 @@ if page == "Dashboard":
     earned_badges                     = get_earned_badges()
     checklist_p, nav_p, overall_p     = get_overall_progress()
     nd, nt                            = get_navigator_progress()
-    df                                = pd.DataFrame(st.session_state["curriculum"])
-
-    st.markdown(f"""
-        <div class="hero-card">
-            <span class="pill">{level_name} · {xp} / {max_xp} XP</span>
-            <h1>Welcome, {user_name} 👋</h1>
-            <p class="muted">Your personalised command centre for mastering the
-            <strong>{role_key}</strong> role.
-            You're on day <strong>{days_since_start()}</strong> of your journey — keep going!</p>
-        </div>
-    """, unsafe_allow_html=True)
+    df                                = pd.DataFrame(get_curriculum())
+
+    st.markdown(templates.render(
+        "hero.html",
+        level_name=level_name, xp=xp, max_xp=max_xp,
+        user_name=user_name, role_key=role_key, days=days_since_start(),
+    ), unsafe_allow_html=True)
 
     k1, k2, k3, k4, chart_col = st.columns([1, 1, 1, 1, 1.2])
     with k1:
@@ -831,6 +1602,27 @@ if page == "Dashboard":
     with chart_col:
         st.altair_chart(create_donut_chart(overall_p), use_container_width=True)
 
+    standing = get_peer_standing()
+    if standing is not None:
+        stats = get_completion_stats()
+        st.info(f"⏱ You're ahead of **{int(standing * 100)}%** of peers on your onboarding so far.")
+        with st.expander("Pace vs. peers"):
+            pace = []
+            for phase in ["Day 1", "Week 1", "Month 1", "Month 2", "Month 3"]:
+                doc = stats.get(analytics.stat_id("phase", phase))
+                if not doc:
+                    continue
+                pt = df[df["Phase"] == phase]
+                pace.append({
+                    "Phase":            phase,
+                    "Typical day":      doc.get("p50"),
+                    "90% done by day":  doc.get("p90"),
+                    "You":              f"{int(pt['Status'].sum())}/{len(pt)} done",
+                })
+            if pace:
+                st.dataframe(pd.DataFrame(pace), hide_index=True, use_container_width=True)
+            st.caption("Day counted from each hire's start date · refreshed by the analytics job.")
+
     if overall_p >= 1.0:
         st.balloons()
         st.success("🎉 You're a SPAE Champion! Download your certificate from Achievements.")
@@ -852,12 +1644,9 @@ if page == "Dashboard":
                 st.subheader("Next Training")
                 status    = st.session_state["navigator_status"]
                 nav_focus = [
-                    {"Type": s, "Course": c}
-                    for s, c in (
-                        [("Mandatory", c) for c in NAVIGATOR_COURSES["Mandatory"]]
-                        + [(role_key, c) for c in NAVIGATOR_COURSES.get(role_key, [])]
-                    )
-                    if not status.get(navigator_course_key(s, c), False)
+                    {"Type": c.section, "Course": c.title}
+                    for c in active_role.courses
+                    if not status.get(c.id, False)
                 ][:4]
                 if nav_focus:
                     st.dataframe(pd.DataFrame(nav_focus), hide_index=True, use_container_width=True)
@@ -870,13 +1659,10 @@ if page == "Dashboard":
         for i, badge in enumerate(ALL_BADGES[:6]):
             unlocked = badge["id"] in earned_badges
             with bcols[i % 3]:
-                st.markdown(f"""
-                    <div class="badge-card {'badge-locked' if not unlocked else ''}"
-                         title="{badge['desc']}">
-                        <div class="badge-icon">{badge['icon']}</div>
-                        <div class="badge-name">{badge['name']}</div>
-                    </div>
-                """, unsafe_allow_html=True)
+                st.markdown(templates.render(
+                    "badge_card.html", unlocked=unlocked, title=badge["desc"],
+                    icon=badge["icon"], name=badge["name"], status="",
+                ), unsafe_allow_html=True)
 
 # ── REQUESTS & LEARNING ───────────────────────────────────────────────────────
 elif page == "Requests & Learning":
@@ -889,16 +1675,16 @@ elif page == "Requests & Learning":
         with c1:
             with st.container(border=True):
                 st.subheader("🏢 Core Systems (All Roles)")
-                for item in FAROS_CATALOG["Common"]:
+                for item in active_role.faros_shared:
                     st.markdown(f"✅ {item}")
         with c2:
             with st.container(border=True):
                 st.subheader(f"🛠 {role_key}-Specific Systems")
                 ic, tc = st.columns([1.2, 3])
                 with ic:
-                    st.image(THEME_IMAGES[role_key], use_container_width=True)
+                    st.markdown(get_assets().image_html(active_role.image, alt=role_key), unsafe_allow_html=True)
                 with tc:
-                    for item in FAROS_CATALOG.get(role_key, []):
+                    for item in active_role.faros_specific:
                         st.markdown(f"🔹 **{item}**")
 
     with tab2:
@@ -908,32 +1694,30 @@ elif page == "Requests & Learning":
         with c1:
             with st.container(border=True):
                 st.subheader("🚨 Mandatory Training (50 XP ea)")
-                for course in NAVIGATOR_COURSES["Mandatory"]:
-                    key = navigator_course_key("Mandatory", course)
+                for course in active_role.courses_shared:
                     st.checkbox(
-                        course,
-                        value=st.session_state["navigator_status"].get(key, False),
-                        key=f"nav_{key}",
+                        course.title,
+                        value=st.session_state["navigator_status"].get(course.id, False),
+                        key=f"nav_{course.id}",
                         on_change=nav_click_callback,
-                        args=("Mandatory", course),
+                        args=(course.id, course.title),
                     )
         with c2:
             with st.container(border=True):
                 st.subheader(f"🧠 {role_key} Specific (50 XP ea)")
-                for course in NAVIGATOR_COURSES.get(role_key, []):
-                    key = navigator_course_key(role_key, course)
+                for course in active_role.courses_specific:
                     st.checkbox(
-                        course,
-                        value=st.session_state["navigator_status"].get(key, False),
-                        key=f"nav_{key}",
+                        course.title,
+                        value=st.session_state["navigator_status"].get(course.id, False),
+                        key=f"nav_{course.id}",
                         on_change=nav_click_callback,
-                        args=(role_key, course),
+                        args=(course.id, course.title),
                     )
 
     with tab3:
         with st.container(border=True):
             st.subheader("🔗 Essential Tools")
-            for item in TOOLKIT.get("Common", []) + TOOLKIT.get(role_key, []):
+            for item in active_role.toolkit:
                 st.markdown(f"- {item}")
 
 # ── CHECKLIST ─────────────────────────────────────────────────────────────────
@@ -943,8 +1727,8 @@ elif page == "Checklist":
         f"Personalised for **{user_name}** · "
         f"Buddy: **{buddy_name}** · Manager: **{manager_name}**"
     )
-    df = pd.DataFrame(st.session_state["curriculum"])
-    df["idx"] = df.index
+    df = pd.DataFrame(get_curriculum())
+    stats     = get_completion_stats()
     search_q  = st.text_input("🔍 Filter tasks...", "").lower()
 
     for phase in ["Day 1", "Week 1", "Month 1", "Month 2", "Month 3"]:
@@ -963,7 +1747,7 @@ elif page == "Checklist":
             st.markdown(f"### 🗓 {phase} — {done}/{total} complete")
             st.progress(done / total)
             for _, row in pt.iterrows():
-                idx = int(row["idx"])
+                tid = task_id(row)
                 mentor_display = (
                     row["Mentor"]
                     .replace("Buddy",   buddy_name)
@@ -973,8 +1757,8 @@ elif page == "Checklist":
                 c1, c2, c3 = st.columns([1, 14, 4])
                 with c1:
                     st.checkbox(
-                        "Done", value=row["Status"], key=f"chk_{idx}",
-                        on_change=toggle_status, args=(idx,),
+                        "Done", value=row["Status"], key=f"chk_{tid}",
+                        on_change=toggle_status, args=(tid, row["Task"]),
                         label_visibility="collapsed",
                     )
                 with c2:
@@ -982,17 +1766,14 @@ elif page == "Checklist":
                         f"~~**{row['Task']}**~~" if row["Status"] else f"**{row['Task']}**"
                     )
                     if row.get("Tip"):
-                        st.markdown(
-                            f"<div class='tip-box'>💡 {row['Tip']}</div>",
-                            unsafe_allow_html=True,
-                        )
-                    st.caption(f"Category: {row['Category']}")
-                with c3:
-                    st.markdown(
-                        f"<div style='text-align:right;margin-top:5px;'>"
-                        f"<span class='mentor-badge'>👤 {mentor_display}</span></div>",
-                        unsafe_allow_html=True,
+                        st.markdown(templates.render("checklist_tip.html", tip=row["Tip"]), unsafe_allow_html=True)
+                    typical = stats.get(analytics.stat_id("task", tid), {}).get("p50")
+                    st.caption(
+                        f"Category: {row['Category']}"
+                        + (f" · Typically done by day {typical}" if typical is not None else "")
                     )
+                with c3:
+                    st.markdown(templates.render("mentor_badge.html", mentor=mentor_display), unsafe_allow_html=True)
                 st.markdown("</div>", unsafe_allow_html=True)
 
 # ── KNOWLEDGE QUIZ ────────────────────────────────────────────────────────────
@@ -1018,28 +1799,75 @@ elif page == "Achievements":
     cols = st.columns(4)
     for i, badge in enumerate(ALL_BADGES):
         unlocked   = badge["id"] in earned_badges
-        status_txt = "✅ Unlocked" if unlocked else f"🔒 {badge['desc']}"
+        when       = st.session_state.get("badges_unlocked", {}).get(badge["id"], "")
+        status_txt = (
+            f"✅ Unlocked {datetime.fromisoformat(when):%d %b %Y}" if unlocked and when else
+            "✅ Unlocked" if unlocked else f"🔒 {badge['desc']}"
+        )
         with cols[i % 4]:
-            st.markdown(f"""
-                <div class="badge-card {'badge-locked' if not unlocked else ''}">
-                    <div class="badge-icon">{badge['icon']}</div>
-                    <div class="badge-name">{badge['name']}</div>
-                    <div class="badge-desc">{status_txt}</div>
-                </div>
-            """, unsafe_allow_html=True)
+            st.markdown(templates.render(
+                "badge_card.html", unlocked=unlocked, title="",
+                icon=badge["icon"], name=badge["name"], status=status_txt,
+            ), unsafe_allow_html=True)
+
+    st.markdown("---")
+    st.markdown("### 🏆 Cohort Leaderboard")
+    cohort = leaderboard.cohort_key(st.session_state.get("start_date"), role_key)
+    st.toggle(
+        "Show me on my cohort's leaderboard",
+        value=st.session_state.get("leaderboard_opt_in", False),
+        key="lb_opt_in",
+        on_change=leaderboard_opt_in_callback,
+        help="Only your name, XP and level are shown, and only to people who started the same month in the same role.",
+    )
+    if cohort is None:
+        st.caption("Set your start date to join a cohort.")
+    else:
+        month = datetime.strptime(cohort.split(":")[0], "%Y-%m").strftime("%B %Y")
+        top, my_rank, size = get_leaderboard().standings(cohort, st.session_state.get("azure_oid", ""))
+        st.caption(f"{role_key} hires who started in {month} · {size} opted in")
+        if top:
+            st.dataframe(
+                pd.DataFrame([
+                    {"Rank": r["rank"], "Name": r["name"], "Level": r["level"], "XP": r["xp"]}
+                    for r in top
+                ]),
+                hide_index=True,
+                use_container_width=True,
+            )
+        if my_rank is not None:
+            st.info(f"You're **#{my_rank}** of {size} in your cohort.")
+        elif not top:
+            st.caption("Nobody in your cohort has opted in yet.")
 
     st.markdown("---")
     st.markdown("### 🎓 Completion Certificate")
     if overall_p >= 1.0:
         st.success("🏆 You've completed everything! Your certificate is ready.")
-        st.download_button(
-            label="⬇️ Download Certificate (HTML)",
-            data=generate_certificate_html(),
-            file_name=f"SPAE_Certificate_{user_name.replace(' ', '_')}.html",
-            mime="text/html",
-            use_container_width=True,
-        )
-        st.components.v1.html(generate_certificate_html(), height=520, scrolling=False)
+        cert      = certificate_data()
+        cert_html = generate_certificate_html()
+        d1, d2    = st.columns(2)
+        with d1:
+            st.download_button(
+                label="⬇️ Download Certificate (HTML)",
+                data=cert_html,
+                file_name=cert.filename("html"),
+                mime="text/html",
+                use_container_width=True,
+            )
+        with d2:
+            cert_pdf = get_certificate_service().pdf(cert) if certificates.HAS_REPORTLAB else None
+            if cert_pdf is not None:
+                st.download_button(
+                    label="⬇️ Download Certificate (PDF)",
+                    data=cert_pdf,
+                    file_name=cert.filename("pdf"),
+                    mime="application/pdf",
+                    use_container_width=True,
+                )
+            else:
+                st.button("⏳ PDF is being prepared…", disabled=True, use_container_width=True)
+        components.html(cert_html, height=520, scrolling=False)
     else:
         st.info(
             f"🔒 Complete 100% of your onboarding to unlock your certificate. "
@@ -1080,11 +1908,39 @@ elif page == "Mentor Guide":
                 """)
 
     with tab_faq:
-        all_faqs = FAQS.get("Common", []) + FAQS.get(role_key, [])
-        for faq in all_faqs:
+        for faq in active_role.faqs:
             with st.expander(f"❓ {faq['q']}"):
                 st.markdown(faq["a"])
 
+# ── MY MENTEES ────────────────────────────────────────────────────────────────
+elif page == "My Mentees":
+    st.markdown("## 🧑‍🏫 My Mentees")
+    st.caption("New hires who named you as their manager or buddy · refreshed every minute.")
+    rows    = mentees.inbox_rows(my_mentees, st.session_state.get("azure_oid", ""), bundle)
+    blocked = [r for r in rows if r["Blocked"]]
+    m1, m2, m3 = st.columns(3)
+    with m1:
+        with st.container(border=True): st.metric("Mentees", len(rows))
+    with m2:
+        with st.container(border=True): st.metric("With Access Blockers", len(blocked))
+    with m3:
+        avg = sum(r["Overall"] for r in rows) / len(rows) if rows else 0
+        with st.container(border=True): st.metric("Average Progress", f"{int(avg)}%")
+
+    for r in blocked:
+        st.error(f"🔐 **{r['Name']}** is waiting on: {r['Blocked']} — chase it with IT / FAROS.")
+
+    st.dataframe(
+        pd.DataFrame(rows),
+        hide_index=True,
+        use_container_width=True,
+        column_config={
+            "Overall": st.column_config.ProgressColumn("Overall", min_value=0, max_value=100, format="%d%%"),
+            "Next":    st.column_config.TextColumn("Next tasks", width="large"),
+            "Blocked": st.column_config.TextColumn("Blocked access"),
+        },
+    )
+
 # ── GOOD TO KNOW ──────────────────────────────────────────────────────────────
 elif page == "Good to Know":
     tab_arch, tab_gloss, tab_faq = st.tabs(
@@ -1097,14 +1953,14 @@ elif page == "Good to Know":
         with st.container(border=True):
             if HAS_GRAPHVIZ:
                 st.markdown(f"**Data Flow: {st.session_state['user_role']}**")
-                st.graphviz_chart(get_tech_stack_graph(role_key))
+                st.graphviz_chart(get_tech_stack_graph(active_role.tech_stack))
             else:
                 st.error("Install graphviz: `pip install graphviz`")
 
     with tab_gloss:
         st.markdown("## 📖 Role Glossary")
         sq = st.text_input("🔍 Search terms...", "").lower()
-        for term, defn in GLOSSARY.get(role_key, {}).items():
+        for term, defn in active_role.glossary.items():
             if sq and sq not in term.lower() and sq not in defn.lower():
                 continue
             with st.expander(f"**{term}**"):
@@ -1113,7 +1969,7 @@ elif page == "Good to Know":
     with tab_faq:
         st.markdown("## ❓ Frequently Asked Questions")
         fq = st.text_input("🔍 Search FAQs...", "").lower()
-        for faq in FAQS.get("Common", []) + FAQS.get(role_key, []):
+        for faq in active_role.faqs:
             if fq and fq not in faq["q"].lower() and fq not in faq["a"].lower():
                 continue
             with st.expander(f"❓ {faq['q']}"):
@@ -3,33 +3,46 @@ SPAE Onboarding Hub — Content Package
 ======================================
 All editable content lives here. The main app (spae_onboarding_hub.py)
 imports from this package and never needs to be touched when content changes.
+A running app picks up saved edits within a few seconds — no restart — as long
+as the edited content still validates (see services/content_bundle.py).
 
 To update any content, edit the relevant file:
+  - roles.py       → roles, what they inherit and the role dropdown
   - tasks.py       → checklist tasks (Day 1 → Month 3)
   - courses.py     → Navigator training courses
-  - systems.py     → FAROS access lists & toolkit links
+  - aliases.py     → old task / course keys → current IDs
+  - systems.py     → FAROS access lists, toolkit links & architecture diagrams
   - glossary.py    → role-specific glossary terms
   - faqs.py        → frequently asked questions
   - badges.py      → badge definitions & unlock conditions
   - acronyms.py    → internal acronym dictionary
+
+The same content can also be maintained as YAML / JSON / CSV files in
+content/data/ (see services/content_files.py); export the current modules
+with `python -m tools.content_files export` to get started.
 """
 
-from content.tasks     import get_checklist_data
+from content.roles     import ROLES, ROLE_KEY_MAP
 from content.courses   import NAVIGATOR_COURSES
-from content.systems   import FAROS_CATALOG, TOOLKIT, QUICK_LINKS, IMPORTANT_LINKS, THEME_IMAGES
+from content.aliases   import TASK_ALIASES, COURSE_ALIASES
+from content.systems   import FAROS_CATALOG, TOOLKIT, QUICK_LINKS, IMPORTANT_LINKS, THEME_IMAGES, TECH_STACKS
 from content.glossary  import GLOSSARY
 from content.faqs      import FAQS
 from content.badges    import ALL_BADGES
 from content.acronyms  import ACRONYMS
 
 __all__ = [
-    "get_checklist_data",
+    "ROLES",
+    "ROLE_KEY_MAP",
     "NAVIGATOR_COURSES",
+    "TASK_ALIASES",
+    "COURSE_ALIASES",
     "FAROS_CATALOG",
     "TOOLKIT",
     "QUICK_LINKS",
     "IMPORTANT_LINKS",
     "THEME_IMAGES",
+    "TECH_STACKS",
     "GLOSSARY",
     "FAQS",
     "ALL_BADGES",
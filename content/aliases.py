@@ -0,0 +1,27 @@
+"""
+aliases.py — Old Task & Course Keys
+====================================
+Progress is saved under each task's ID (tasks.py) and each course's ID
+(courses.py). Anything a user's progress might still be saved under that is
+not a current ID goes here, mapped to the ID it means now:
+
+  - an ID that had to be changed:           "old_id": "new_id"
+  - a title from before IDs existed that
+    has since been edited (the current
+    titles are recognised automatically):   "Old Task Title": "task_id"
+  - courses keep their section:             "Mandatory::Old Course Title": "course_id"
+
+A user's saved keys are translated when they sign in, and
+`python -m tools.migrate_ids` rewrites the stored documents once so the old
+keys can eventually be removed from here.
+
+Format:  "old key": "current ID"
+"""
+
+from typing import Dict
+
+TASK_ALIASES: Dict[str, str] = {
+}
+
+COURSE_ALIASES: Dict[str, str] = {
+}
@@ -9,10 +9,14 @@ Fields:
   name : display name shown in the UI
   icon : emoji shown on the badge card
   desc : short description of how to unlock it (shown when locked)
+  rule : when it unlocks — checked automatically, no app change needed, e.g.
+           "tasks_done >= 1"          "overall_pct >= 0.5"
+           "phases: Day 1, Week 1"    "courses: all"
+           "streak_days >= 3"         "tasks_done >= 10 and streak_days >= 2"
+         (every counter and form is listed in services/badges.py)
 
-Badge unlock logic lives in the main app (get_earned_badges) to keep it
-close to session state. If you add a new badge here, also add its
-unlock condition in spae_onboarding_hub.py → get_earned_badges().
+Keep `desc` and `rule` saying the same thing. Earned badges are saved with
+the time they were unlocked and are never taken away.
 """
 
 from typing import Dict, List
@@ -23,35 +27,48 @@ ALL_BADGES: List[Dict] = [
         "name": "First Step",
         "icon": "👟",
         "desc": "Complete your very first checklist task",
+        "rule": "tasks_done >= 1",
     },
     {
         "id":   "week1_done",
         "name": "Week 1 Warrior",
         "icon": "⚔️",
         "desc": "Complete all Day 1 & Week 1 tasks",
+        "rule": "phases: Day 1, Week 1",
     },
     {
         "id":   "half_way",
         "name": "Halfway There",
         "icon": "🌗",
         "desc": "Reach 50% overall onboarding progress",
+        "rule": "overall_pct >= 0.5",
     },
     {
         "id":   "learning_done",
         "name": "Scholar",
         "icon": "🎓",
         "desc": "Complete all Navigator training modules",
+        "rule": "courses: all",
     },
     {
         "id":   "champion",
         "name": "SPAE Champion",
         "icon": "🏆",
         "desc": "Reach 100% overall onboarding completion",
+        "rule": "overall_pct >= 1",
     },
     {
         "id":   "speed_runner",
         "name": "Speed Runner",
         "icon": "⚡",
         "desc": "Complete 5 tasks in a single session",
+        "rule": "session_completions >= 5",
+    },
+    {
+        "id":   "on_a_roll",
+        "name": "On a Roll",
+        "icon": "🔥",
+        "desc": "Complete something on 3 days in a row",
+        "rule": "streak_days >= 3",
     },
 ]
\ No newline at end of file
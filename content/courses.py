@@ -8,50 +8,47 @@ Structure:
   NAVIGATOR_COURSES["SPE"]        → shown only to Spare Parts Engineers
   NAVIGATOR_COURSES["SE"]         → shown only to Service Engineers
 
-Each entry is a plain string: "Course Title (duration)"
-Duration is shown in the UI but not enforced — it's informational only.
-
-ROLE_KEY_MAP maps the full dropdown label → short role key used throughout the app.
-Add a new role here and in tasks.py / systems.py to support it.
+Each entry maps a course ID to its title: "id": "Course Title (duration)".
+Progress is saved under the ID, so titles can be corrected freely; never
+change an ID (if one really must change, add the old one to aliases.py).
+IDs are lowercase letters, digits, "_" or "-", unique across all sections
+and tasks. Duration is shown in the UI but not enforced — it's informational only.
+
+Sections are picked up by role key: a role declared in roles.py sees the
+section named after it, plus any sections from roles it extends or includes.
+ROLE_KEY_MAP is re-exported from roles.py for older imports.
 """
 
-from typing import Dict, List
+from typing import Dict
 
-# ---------------------------------------------------------------------------
-# Role label → short key mapping
-# Add new roles here if the company expands
-# ---------------------------------------------------------------------------
-ROLE_KEY_MAP: Dict[str, str] = {
-    "SPE (Spare Parts Engineer)": "SPE",
-    "SE (Service Engineer)":      "SE",
-}
+from content.roles import ROLE_KEY_MAP  # noqa: F401  (backward compatibility)
 
 # ---------------------------------------------------------------------------
 # Navigator courses
 # ---------------------------------------------------------------------------
-NAVIGATOR_COURSES: Dict[str, List[str]] = {
+NAVIGATOR_COURSES: Dict[str, Dict[str, str]] = {
 
     # Mandatory for everyone — compliance & company-wide training
-    "Mandatory": [
-        "Global Data Privacy & GDPR (30 mins)",
-        "Cybersecurity Awareness: Phishing (15 mins)",
-        "Code of Conduct: Anti-Bribery (45 mins)",
-        "Diversity & Inclusion Basics (20 mins)",
-        "Health & Safety: Office Ergonomics (15 mins)",
-    ],
+    "Mandatory": {
+        "gdpr":                "Global Data Privacy & GDPR (30 mins)",
+        "phishing_awareness":  "Cybersecurity Awareness: Phishing (15 mins)",
+        "anti_bribery":        "Code of Conduct: Anti-Bribery (45 mins)",
+        "diversity_inclusion": "Diversity & Inclusion Basics (20 mins)",
+        "office_ergonomics":   "Health & Safety: Office Ergonomics (15 mins)",
+    },
 
     # SPE-specific courses
-    "SPE": [
-        "SAP ERP: Supply Chain Basics (60 mins)",
-        "Logistics 101: Incoterms (30 mins)",
-        "Agile PLM: Document Control (45 mins)",
-    ],
+    "SPE": {
+        "sap_supply_chain":    "SAP ERP: Supply Chain Basics (60 mins)",
+        "incoterms":           "Logistics 101: Incoterms (30 mins)",
+        "agile_plm":           "Agile PLM: Document Control (45 mins)",
+    },
 
     # SE-specific courses
-    "SE": [
-        "Field Safety: Electrical Hazards (60 mins)",
-        "Defensive Driving Certification (External)",
-        "Customer Service: Handling Conflict (30 mins)",
-    ],
+    "SE": {
+        "electrical_safety":   "Field Safety: Electrical Hazards (60 mins)",
+        "defensive_driving":   "Defensive Driving Certification (External)",
+        "conflict_handling":   "Customer Service: Handling Conflict (30 mins)",
+    },
 
 }
\ No newline at end of file
@@ -0,0 +1,54 @@
+"""
+roles.py — Roles & What Each One Sees
+=======================================
+Declare every role here. A role is a short key with:
+
+  label    : the full dropdown label, e.g. "SPE (Spare Parts Engineer)"
+  extends  : roles it inherits everything from (tasks, courses, FAROS systems,
+             toolkit, links, glossary, FAQs, hero image, architecture diagram)
+  include  : extra sets to pull in without inheriting a whole role, e.g.
+             {"courses": ["SE"]} to add the SE Navigator courses only
+  abstract : True for building blocks that can't be picked in the dropdown
+
+A role always sees its own sets — the entries keyed by its role key in
+tasks.py (the "Role" field), courses.py, systems.py, glossary.py and faqs.py —
+plus everything from the roles it extends. Parents come first, so shared
+content is listed before role-specific content.
+
+Example — a lead who covers both parts and service, plus one extra course set:
+
+    "PSL": {
+        "label":   "PSL (Parts & Service Lead)",
+        "extends": ["SPE", "SE"],
+    },
+
+Nothing else needs to change: the app resolves every role once per content
+version and switching role just points the session at a different one.
+"""
+
+from typing import Dict
+
+ROLES: Dict[str, Dict] = {
+
+    # Shared by every role — Common tasks, systems, links and FAQs,
+    # plus the Mandatory Navigator courses
+    "Common": {
+        "abstract": True,
+        "include":  {"courses": ["Mandatory"]},
+    },
+
+    "SPE": {
+        "label":   "SPE (Spare Parts Engineer)",
+        "extends": ["Common"],
+    },
+
+    "SE": {
+        "label":   "SE (Service Engineer)",
+        "extends": ["Common"],
+    },
+}
+
+# Full dropdown label → role key, in declaration order (first = default role)
+ROLE_KEY_MAP: Dict[str, str] = {
+    spec["label"]: key for key, spec in ROLES.items() if not spec.get("abstract")
+}
@@ -10,7 +10,11 @@ QUICK_LINKS   : sidebar quick links — shared + role-specific
                 "SPE" links appear only for Spare Parts Engineers
                 "SE"  links appear only for Service Engineers
 THEME_IMAGES  : hero images per role (replace URLs to change)
+TECH_STACKS   : "System Architecture" data-flow diagram per role
 KEY_CONTACTS  : support contacts shown in the Directory popover
+
+Keys are role keys from roles.py (or "Common"). A role that has no entry
+of its own uses the one from the role it extends.
 """
 
 from typing import Dict, List
@@ -131,12 +135,54 @@ IMPORTANT_LINKS = QUICK_LINKS["Common"]
 # ---------------------------------------------------------------------------
 # Hero images shown on the FAROS Access tab per role
 # Replace the URL with any Unsplash or company-hosted image
+# (or a path in the repo); re-run `python -m tools.assets` to self-host it
 # ---------------------------------------------------------------------------
 THEME_IMAGES: Dict[str, str] = {
     "SPE": "https://images.unsplash.com/photo-1581091226825-a6a2a5aee158?auto=format&fit=crop&w=600&q=80",
     "SE":  "https://images.unsplash.com/photo-1581092335397-9583eb92d232?auto=format&fit=crop&w=600&q=80",
 }
 
+# ---------------------------------------------------------------------------
+# Data-flow diagrams shown on Good to Know → System Architecture
+# nodes: id, label, fill, color and optional shape (default "box")
+# edges: from, to and optional label
+# ---------------------------------------------------------------------------
+TECH_STACKS: Dict[str, Dict[str, List[Dict]]] = {
+
+    "SPE": {
+        "nodes": [
+            {"id": "V",      "label": "Vendor / Supplier",  "fill": "#bae6fd", "color": "#0284c7"},
+            {"id": "SAP",    "label": "SAP GUI (ERP)",      "fill": "#fef08a", "color": "#ca8a04", "shape": "ellipse"},
+            {"id": "PLM",    "label": "Agile PLM",          "fill": "#e9d5ff", "color": "#9333ea", "shape": "ellipse"},
+            {"id": "CAD",    "label": "Creo / Vault",       "fill": "#bbf7d0", "color": "#16a34a"},
+            {"id": "GLOPPS", "label": "GLOPPS (Logistics)", "fill": "#fecdd3", "color": "#e11d48", "shape": "cylinder"},
+        ],
+        "edges": [
+            {"from": "V",   "to": "SAP",    "label": "Invoices"},
+            {"from": "SAP", "to": "GLOPPS", "label": "Inventory"},
+            {"from": "PLM", "to": "SAP",    "label": "Part No."},
+            {"from": "CAD", "to": "PLM",    "label": "Drawings"},
+        ],
+    },
+
+    "SE": {
+        "nodes": [
+            {"id": "C",    "label": "Customer Site",      "fill": "#bae6fd", "color": "#0284c7"},
+            {"id": "SF",   "label": "Salesforce (CRM)",   "fill": "#fef08a", "color": "#ca8a04", "shape": "ellipse"},
+            {"id": "SAP",  "label": "SAP Service Module", "fill": "#fef08a", "color": "#ca8a04", "shape": "ellipse"},
+            {"id": "MOM",  "label": "MOM App (Mobile)",   "fill": "#bbf7d0", "color": "#16a34a"},
+            {"id": "KOLA", "label": "KOLA (Parts DB)",    "fill": "#e9d5ff", "color": "#9333ea", "shape": "cylinder"},
+        ],
+        "edges": [
+            {"from": "C",   "to": "SF",   "label": "Ticket"},
+            {"from": "SF",  "to": "SAP",  "label": "Dispatch"},
+            {"from": "SAP", "to": "MOM",  "label": "Work Order"},
+            {"from": "MOM", "to": "KOLA", "label": "Lookup"},
+            {"from": "MOM", "to": "SAP",  "label": "Timesheet"},
+        ],
+    },
+}
+
 # ---------------------------------------------------------------------------
 # Key contacts shown in the Directory & Help popover
 # ---------------------------------------------------------------------------
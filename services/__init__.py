@@ -0,0 +1,10 @@
+"""
+SPAE Onboarding Hub — Services Package
+=======================================
+Process-level machinery that supports the app but isn't UI or content:
+session bookkeeping, background workers and similar plumbing.
+
+Modules here must not render anything. They may be used from app.py, from a
+background thread, or from a command-line tool in tools/, so they take the
+state they work on as arguments instead of reaching for st.session_state.
+"""
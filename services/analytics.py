@@ -0,0 +1,184 @@
+"""
+analytics.py — Time-to-Complete Statistics
+===========================================
+Turns the completion event log (services/events.py) into compact per-task,
+per-course and per-phase distributions of the day — counted from each hire's
+start date — on which things get done. Each distribution is a histogram of
+integer days (0…MAX_DAY, one bin per day, later days in the last bin), which
+is exact for this data and never grows beyond MAX_DAY + 1 counters.
+
+`update_stats` is incremental: it reads only events newer than the stored
+watermark, $inc's the affected bins with one bulk_write and recomputes
+median / p90 for the items it touched. Run it on a schedule with
+`python -m tools.analytics` (or `--loop`). The app only reads the small
+stats collection, never the users or events, so "ahead of X% of peers" costs
+nothing at request time.
+
+Events newer than `lag_s` are left for the next run, because the app's event
+writer buffers for a few seconds; anything delayed longer than that (e.g.
+during a MongoDB outage) is skipped. Re-ticking a task counts again.
+
+A run that stops part-way (crash, timeout) is safe to repeat: its window is
+recorded in the watermark as `pending` before anything is counted, the next
+run redoes exactly that window, and each histogram remembers the last run
+it absorbed (`run`), so no bin is incremented twice.
+"""
+
+from collections import Counter, defaultdict
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Tuple
+
+MAX_DAY          = 180
+DEFAULT_LAG_S    = 600
+WATERMARK_ID     = "_watermark"
+STATS_COLLECTION = "completion_stats"
+
+
+def day_bin(day: Any) -> int:
+    return min(max(int(day), 0), MAX_DAY)
+
+
+def quantile(bins: Mapping[str, int], q: float) -> Optional[int]:
+    total = sum(bins.values())
+    if not total:
+        return None
+    target = q * total
+    seen   = 0
+    for day in sorted(bins, key=int):
+        seen += bins[day]
+        if seen >= target:
+            return int(day)
+    return MAX_DAY
+
+
+def share_later(bins: Mapping[str, int], day: int) -> float:
+    """Share of peers who got it done after `day` (ties count half)."""
+    total = sum(bins.values())
+    if not total:
+        return 0.5
+    later = sum(n for d, n in bins.items() if int(d) > day)
+    same  = bins.get(str(day), 0)
+    return (later + 0.5 * same) / total
+
+
+def stat_id(kind: str, item: str) -> str:
+    return f"{kind}::{item}"
+
+
+def item_phases(bundle) -> Dict[str, str]:
+    """Task ID → phase, across every role."""
+    return {t["ID"]: t["Phase"] for role in bundle.roles.values() for t in role.tasks}
+
+
+def _utc(ts: datetime) -> datetime:
+    return ts.replace(tzinfo=timezone.utc) if ts.tzinfo is None else ts
+
+
+def update_stats(
+    db,
+    bundle,
+    events: str = "events",
+    stats: str = STATS_COLLECTION,
+    lag_s: float = DEFAULT_LAG_S,
+    batch_size: int = 5000,
+) -> Dict[str, int]:
+    """Fold new completion events into the histograms. Returns counts for logging."""
+    from pymongo import UpdateOne
+    from pymongo.errors import BulkWriteError
+
+    stats_col = db[stats]
+    mark      = stats_col.find_one({"_id": WATERMARK_ID}) or {}
+    since     = _utc(mark.get("ts", datetime(1970, 1, 1, tzinfo=timezone.utc)))
+    if mark.get("pending") is not None:
+        until = _utc(mark["pending"])               # an earlier run stopped part-way: redo its window
+    else:
+        until = datetime.now(timezone.utc) - timedelta(seconds=lag_s)
+        until = until.replace(microsecond=until.microsecond // 1000 * 1000)   # as MongoDB stores it
+        if until <= since:
+            return {"events": 0, "items": 0}
+        stats_col.update_one({"_id": WATERMARK_ID}, {"$set": {"pending": until}}, upsert=True)
+    run = until.isoformat()
+
+    phases = item_phases(bundle)
+    bins: Dict[str, Counter] = defaultdict(Counter)
+    meta: Dict[str, Dict[str, str]] = {}
+    n = 0
+    cursor = db[events].find(
+        {"ts": {"$gt": since, "$lte": until}, "action": "complete", "day": {"$exists": True}},
+        {"meta": 1, "day": 1, "_id": 0},
+        batch_size=batch_size,
+    )
+    for ev in cursor:
+        kind, item = ev["meta"]["kind"], ev["meta"]["item"]
+        item = bundle.resolve(kind, item)           # events logged under a title or old ID
+        b = day_bin(ev["day"])
+        bins[stat_id(kind, item)][b] += 1
+        meta[stat_id(kind, item)] = {"kind": kind, "item": item}
+        if kind == "task" and item in phases:
+            pid = stat_id("phase", phases[item])
+            bins[pid][b] += 1
+            meta[pid] = {"kind": "phase", "item": phases[item]}
+        n += 1
+
+    if bins:
+        try:
+            stats_col.bulk_write([
+                UpdateOne(
+                    {"_id": sid, "run": {"$ne": run}},
+                    {
+                        "$inc": {**{f"bins.{d}": c for d, c in counts.items()}, "count": sum(counts.values())},
+                        "$set": {**meta[sid], "run": run},
+                    },
+                    upsert=True,
+                )
+                for sid, counts in bins.items()
+            ], ordered=False)
+        except BulkWriteError as e:
+            # A duplicate key is a histogram this run already counted (the filter missed, the upsert collided)
+            if any(err.get("code") != 11000 for err in e.details.get("writeErrors", [])):
+                raise
+        # Percentiles only for what changed
+        refreshed = []
+        for doc in stats_col.find({"_id": {"$in": list(bins)}}, {"bins": 1}):
+            refreshed.append(UpdateOne({"_id": doc["_id"]}, {"$set": {
+                "p50": quantile(doc["bins"], 0.5),
+                "p90": quantile(doc["bins"], 0.9),
+                "updated_at": until,
+            }}))
+        if refreshed:
+            stats_col.bulk_write(refreshed, ordered=False)
+
+    stats_col.update_one({"_id": WATERMARK_ID}, {"$set": {"ts": until}, "$unset": {"pending": ""}}, upsert=True)
+    return {"events": n, "items": len(bins)}
+
+
+def load_stats(db, stats: str = STATS_COLLECTION) -> Dict[str, Dict]:
+    """Every precomputed distribution, keyed by stat_id. Small: one doc per task/course/phase."""
+    return {
+        doc["_id"]: doc
+        for doc in db[stats].find({"_id": {"$ne": WATERMARK_ID}}, {"bins": 1, "p50": 1, "p90": 1, "count": 1})
+    }
+
+
+def ahead_of_peers(
+    stats: Mapping[str, Mapping],
+    items: Iterable[Tuple[str, str]],
+    completion_days: Mapping[str, int],
+    today: int,
+) -> Optional[float]:
+    """
+    Share of peers this hire is ahead of, averaged over their items that have
+    peer data: for a finished item, the share of peers who finished it later;
+    for an unfinished one, half the share of peers still going at `today`
+    (they are level with you, not behind).
+    """
+    scores: List[float] = []
+    for kind, item in items:
+        doc = stats.get(stat_id(kind, item))
+        if not doc or not doc.get("count"):
+            continue
+        if item in completion_days:
+            scores.append(share_later(doc["bins"], day_bin(completion_days[item])))
+        else:
+            scores.append(0.5 * share_later(doc["bins"], day_bin(today)))
+    return sum(scores) / len(scores) if scores else None
@@ -0,0 +1,118 @@
+"""
+assets.py — Self-Hosted Fonts & Images
+=======================================
+Fonts and hero images are served by the app itself from `static/`
+(Streamlit static serving, `[server] enableStaticServing = true`) instead of
+being fetched from Google Fonts and Unsplash by every browser:
+
+  • `python -m tools.assets` downloads the fonts and every THEME_IMAGES
+    source once, resizes the images to IMAGE_WIDTHS as WebP and writes them
+    to `static/` under content-hashed names, plus `static/assets.json`;
+  • the app reads that manifest once per process and emits @font-face rules
+    and <img srcset> tags pointing at `app/static/<name>.<hash>.<ext>?v=<hash>`.
+    The `v` query makes Streamlit's static handler send a ten-year
+    Cache-Control, and the hash in the name means a rebuilt asset is a new URL.
+
+Anything missing from the manifest — no build yet, or an image URL edited
+since the last build — falls back to the original remote URL, so the app
+never shows a broken image because a build step was skipped.
+"""
+
+import json
+import logging
+import os
+from dataclasses import dataclass, field
+from html import escape
+from typing import Any, Dict, Iterable, List, Mapping, Tuple
+from urllib.parse import quote_plus
+
+log = logging.getLogger(__name__)
+
+REPO_ROOT     = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+STATIC_DIR    = os.path.join(REPO_ROOT, "static")
+MANIFEST_NAME = "assets.json"
+URL_PREFIX    = "app/static/"
+IMAGE_WIDTHS  = (320, 640)
+IMAGE_QUALITY = 78
+
+# Family → weights, as Google Fonts' css2 API spells them
+FONTS: Dict[str, str] = {
+    "Plus Jakarta Sans": "400;500;600;700;800",
+    "Playfair Display":  "700",
+}
+
+
+def google_fonts_url(families: Iterable[str]) -> str:
+    query = "&".join(f"family={quote_plus(f)}:wght@{FONTS[f]}" for f in families)
+    return f"https://fonts.googleapis.com/css2?{query}&display=swap"
+
+
+@dataclass(frozen=True)
+class AssetManifest:
+    fonts:  Tuple[Mapping[str, str], ...] = ()                         # family, weight, style, unicode_range, file, hash
+    images: Mapping[str, Tuple[Mapping[str, Any], ...]] = field(default_factory=dict)   # source → [{w, file, hash}]
+
+    @staticmethod
+    def url(entry: Mapping[str, Any]) -> str:
+        return f"{URL_PREFIX}{entry['file']}?v={entry['hash']}"
+
+    def font_css(self, families: Iterable[str]) -> str:
+        """@font-face rules for `families`, or the Google Fonts @import if any of them isn't vendored."""
+        families = list(families)
+        faces    = [f for f in self.fonts if f["family"] in families]
+        if {f["family"] for f in faces} != set(families):
+            return f"@import url('{google_fonts_url(families)}');"
+        rules = []
+        for f in faces:
+            rule = (
+                f"@font-face{{font-family:'{f['family']}';font-style:{f['style']};"
+                f"font-weight:{f['weight']};font-display:swap;"
+                f"src:url({self.url(f)}) format('woff2');"
+            )
+            if f.get("unicode_range"):
+                rule += f"unicode-range:{f['unicode_range']};"
+            rules.append(rule + "}")
+        return "\n".join(rules)
+
+    def image_html(self, source: str, alt: str = "", style: str = "width:100%;border-radius:0.5rem;") -> str:
+        """An <img> for a THEME_IMAGES source: local WebP variants with srcset, else the source itself."""
+        variants = self.images.get(source)
+        if not variants:
+            return f'<img src="{escape(source)}" alt="{escape(alt)}" style="{style}">'
+        srcset = ", ".join(f"{self.url(v)} {v['w']}w" for v in variants)
+        return (
+            f'<img src="{self.url(variants[0])}" srcset="{srcset}" '
+            f'sizes="(max-width: 640px) 100vw, 320px" alt="{escape(alt)}" '
+            f'loading="lazy" decoding="async" style="{style}">'
+        )
+
+
+def load_manifest(static_dir: str = STATIC_DIR) -> AssetManifest:
+    path = os.path.join(static_dir, MANIFEST_NAME)
+    try:
+        with open(path, encoding="utf-8") as fh:
+            raw = json.load(fh)
+    except FileNotFoundError:
+        return AssetManifest()
+    except (OSError, ValueError) as e:
+        log.warning("Ignoring unreadable asset manifest %s: %s", path, e)
+        return AssetManifest()
+    fonts  = tuple(f for f in raw.get("fonts", []) if os.path.exists(os.path.join(static_dir, f["file"])))
+    images = {
+        src: tuple(v for v in variants if os.path.exists(os.path.join(static_dir, v["file"])))
+        for src, variants in raw.get("images", {}).items()
+    }
+    return AssetManifest(fonts=fonts, images={k: v for k, v in images.items() if v})
+
+
+def write_manifest(
+    fonts: List[Dict[str, str]],
+    images: Mapping[str, List[Dict[str, Any]]],
+    static_dir: str = STATIC_DIR,
+) -> str:
+    path = os.path.join(static_dir, MANIFEST_NAME)
+    with open(path, "w", encoding="utf-8") as fh:
+        json.dump({"fonts": fonts, "images": images}, fh, indent=2, sort_keys=True)
+        fh.write("\n")
+    return path
+
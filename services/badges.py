@@ -0,0 +1,221 @@
+"""
+badges.py — Declarative Badge Rules
+====================================
+Badge unlock conditions live next to the badges in content/badges.py as a
+one-line `rule` — the same string in Python, YAML, JSON or a CSV column:
+
+    tasks_done >= 1                       counter threshold
+    overall_pct >= 0.5                    (pct counters are 0…1)
+    phases: Day 1, Week 1                 every task of these phases done
+    courses: all                          every Navigator course done
+    courses: Mandatory                    every course of these sections done
+    streak_days >= 3                      something completed 3 days running
+    tasks_done >= 10 and streak_days >= 2 all parts must hold
+
+Counters: tasks_done, tasks_total, courses_done, courses_total,
+checklist_pct, navigator_pct, overall_pct, session_completions, streak_days.
+
+Rules are compiled once per content bundle (validate() reports bad ones with
+the badge id) and indexed by what they read — "tasks", "courses", "session",
+"days". A click re-evaluates only the rules that read something it changed,
+and only for badges not yet earned; earned badges are kept with the time they
+were unlocked, so unticking a task later doesn't take a badge away.
+"""
+
+import re
+from dataclasses import dataclass
+from functools import cached_property
+from typing import Callable, Dict, FrozenSet, Iterable, List, Mapping, Optional, Set, Tuple
+
+COUNTER_DEPS: Dict[str, FrozenSet[str]] = {
+    "tasks_done":          frozenset({"tasks"}),
+    "tasks_total":         frozenset({"tasks"}),
+    "courses_done":        frozenset({"courses"}),
+    "courses_total":       frozenset({"courses"}),
+    "checklist_pct":       frozenset({"tasks"}),
+    "navigator_pct":       frozenset({"courses"}),
+    "overall_pct":         frozenset({"tasks", "courses"}),
+    "session_completions": frozenset({"session"}),
+    "streak_days":         frozenset({"days"}),
+}
+
+# What each kind of click can change
+TASK_CHANGE   = frozenset({"tasks", "session", "days"})
+COURSE_CHANGE = frozenset({"courses", "days"})
+
+_THRESHOLD = re.compile(r"^(\w+)\s*(>=|>|==|<=|<)\s*([0-9.]+)$")
+_OPS: Dict[str, Callable[[float, float], bool]] = {
+    ">=": lambda a, b: a >= b,
+    ">":  lambda a, b: a > b,
+    "==": lambda a, b: a == b,
+    "<=": lambda a, b: a <= b,
+    "<":  lambda a, b: a < b,
+}
+
+
+class BadgeRuleError(ValueError):
+    """A rule string that doesn't parse. The message names the problem."""
+
+
+# =============================================================================
+# FACTS — what rules read, computed lazily from one user's progress
+# =============================================================================
+
+class BadgeFacts:
+    def __init__(
+        self,
+        role,
+        task_status: Mapping[str, bool],
+        navigator_status: Mapping[str, bool],
+        session_completions: int = 0,
+        completion_days: Optional[Mapping[str, int]] = None,
+    ):
+        self.role                = role
+        self.task_status         = task_status
+        self.navigator_status    = navigator_status
+        self.session_completions = session_completions
+        self.completion_days     = completion_days or {}
+
+    def task_done(self, task: Mapping) -> bool:
+        return bool(self.task_status.get(task["ID"], False))
+
+    def course_done(self, course) -> bool:
+        return bool(self.navigator_status.get(course.id, False))
+
+    @cached_property
+    def tasks_done(self) -> int:
+        return sum(1 for t in self.role.tasks if self.task_done(t))
+
+    @cached_property
+    def tasks_total(self) -> int:
+        return len(self.role.tasks)
+
+    @cached_property
+    def courses_done(self) -> int:
+        return sum(1 for c in self.role.courses if self.course_done(c))
+
+    @cached_property
+    def courses_total(self) -> int:
+        return len(self.role.courses)
+
+    @cached_property
+    def checklist_pct(self) -> float:
+        return self.tasks_done / self.tasks_total if self.tasks_total else 0.0
+
+    @cached_property
+    def navigator_pct(self) -> float:
+        return self.courses_done / self.courses_total if self.courses_total else 0.0
+
+    @cached_property
+    def overall_pct(self) -> float:
+        return 0.5 * self.checklist_pct + 0.5 * self.navigator_pct
+
+    @cached_property
+    def streak_days(self) -> int:
+        """Longest run of consecutive onboarding days with at least one completion."""
+        days = sorted(set(self.completion_days.values()))
+        best = run = 0
+        for i, d in enumerate(days):
+            run  = run + 1 if i and d == days[i - 1] + 1 else 1
+            best = max(best, run)
+        return best
+
+
+# =============================================================================
+# COMPILING
+# =============================================================================
+
+Predicate = Callable[[BadgeFacts], bool]
+
+
+def _threshold(counter: str, op: str, value: float) -> Predicate:
+    compare = _OPS[op]
+    return lambda f: compare(getattr(f, counter), value)
+
+
+def _phases(phases: Tuple[str, ...]) -> Predicate:
+    def check(f: BadgeFacts) -> bool:
+        tasks = [t for t in f.role.tasks if t["Phase"] in phases]
+        return bool(tasks) and all(f.task_done(t) for t in tasks)
+    return check
+
+
+def _courses(sections: Optional[Tuple[str, ...]]) -> Predicate:
+    def check(f: BadgeFacts) -> bool:
+        courses = [c for c in f.role.courses if sections is None or c.section in sections]
+        return bool(courses) and all(f.course_done(c) for c in courses)
+    return check
+
+
+def _clause(text: str) -> Tuple[Predicate, FrozenSet[str]]:
+    text = text.strip()
+    if m := _THRESHOLD.match(text):
+        counter, op, value = m.groups()
+        if counter not in COUNTER_DEPS:
+            raise BadgeRuleError(f"unknown counter {counter!r} (one of {', '.join(COUNTER_DEPS)})")
+        return _threshold(counter, op, float(value)), COUNTER_DEPS[counter]
+    head, sep, rest = text.partition(":")
+    names = tuple(n.strip() for n in rest.split(",") if n.strip())
+    if sep and names and head.strip() == "phases":
+        return _phases(names), frozenset({"tasks"})
+    if sep and names and head.strip() == "courses":
+        return _courses(None if names == ("all",) else names), frozenset({"courses"})
+    raise BadgeRuleError(f"can't read {text!r}")
+
+
+def parse_rule(rule: str) -> Tuple[Predicate, FrozenSet[str]]:
+    """Rule string → (predicate, dependencies)."""
+    parts = [_clause(p) for p in re.split(r"\s+and\s+", rule.strip()) if p.strip()]
+    if not parts:
+        raise BadgeRuleError("empty rule")
+    preds = [p for p, _ in parts]
+    deps  = frozenset().union(*(d for _, d in parts))
+    return (lambda f: all(p(f) for p in preds)), deps
+
+
+def rule_errors(badges: Iterable[Mapping]) -> List[str]:
+    errors = []
+    for b in badges:
+        if b.get("rule"):
+            try:
+                parse_rule(str(b["rule"]))
+            except BadgeRuleError as e:
+                errors.append(f"badge {b.get('id', '?')!r}: rule {e}")
+    return errors
+
+
+@dataclass(frozen=True)
+class BadgeRules:
+    predicates: Mapping[str, Predicate]                 # badge id → predicate
+    by_dep:     Mapping[str, Tuple[str, ...]]           # dependency → badge ids, in display order
+
+    def evaluate(
+        self,
+        facts: BadgeFacts,
+        earned: Iterable[str],
+        changed: Optional[FrozenSet[str]] = None,
+    ) -> List[str]:
+        """Badges newly unlocked. `changed=None` re-checks every rule (first load, new content)."""
+        earned = set(earned)
+        if changed is None:
+            candidates: Iterable[str] = self.predicates
+        else:
+            seen: Set[str] = set()
+            candidates = [
+                bid for dep in sorted(changed) for bid in self.by_dep.get(dep, ())
+                if not (bid in seen or seen.add(bid))
+            ]
+        return [bid for bid in candidates if bid not in earned and self.predicates[bid](facts)]
+
+
+def compile_rules(badges: Iterable[Mapping]) -> BadgeRules:
+    predicates: Dict[str, Predicate] = {}
+    by_dep: Dict[str, List[str]] = {}
+    for b in badges:
+        if not b.get("rule"):
+            continue                                   # awarded some other way, never automatically
+        pred, deps = parse_rule(str(b["rule"]))
+        predicates[b["id"]] = pred
+        for dep in deps:
+            by_dep.setdefault(dep, []).append(b["id"])
+    return BadgeRules(predicates, {k: tuple(v) for k, v in by_dep.items()})
@@ -0,0 +1,254 @@
+"""
+certificates.py — Completion Certificates (HTML + PDF)
+=======================================================
+A certificate is fully determined by CertificateData — name, role, manager
+and completion date — so it is rendered once per distinct input and cached
+by a hash of it (plus TEMPLATE_VERSION, bumped whenever the layout changes):
+
+  • HTML comes from templates/certificate.html, memoised per input;
+  • PDF is drawn with ReportLab — pure Python, no browser or system fonts —
+    in a process pool, so the script thread never renders, and written to
+    `cache_dir/<hash>.pdf`, which every replica sharing the directory reuses.
+
+`CertificateService.batch` renders a whole cohort in parallel for HR
+(`python -m tools.certificates`).
+
+    [certificates]           # optional
+    cache_dir = ".cache/certificates"
+    workers   = 2
+"""
+
+import hashlib
+import logging
+import os
+import tempfile
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass
+from datetime import date
+from multiprocessing import get_context
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from markupsafe import Markup
+
+from services import templates
+
+logger = logging.getLogger(__name__)
+
+try:
+    from reportlab.lib.colors import HexColor
+    from reportlab.lib.pagesizes import A4, landscape
+    from reportlab.pdfgen import canvas
+    HAS_REPORTLAB = True
+except ImportError:
+    HAS_REPORTLAB = False
+
+TEMPLATE_VERSION  = 1
+DEFAULT_CACHE_DIR = os.path.join(".cache", "certificates")
+DEFAULT_WORKERS   = 2
+
+
+@dataclass(frozen=True)
+class CertificateData:
+    name:         str
+    role:         str
+    manager:      str
+    completed_on: date
+
+    def digest(self) -> str:
+        raw = "\x1f".join([str(TEMPLATE_VERSION), self.name, self.role, self.manager, self.completed_on.isoformat()])
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def filename(self, ext: str) -> str:
+        slug = "".join(c if c.isalnum() else "_" for c in self.name).strip("_") or "Team_Member"
+        return f"SPAE_Certificate_{slug}.{ext}"
+
+
+# =============================================================================
+# HTML
+# =============================================================================
+
+def render_html(data: CertificateData, font_css: str = "") -> str:
+    """`font_css` is the @font-face block for Playfair Display and Plus Jakarta Sans (services/assets.py)."""
+    return templates.render(
+        "certificate.html",
+        name=data.name,
+        role=data.role,
+        manager=data.manager,
+        completed_on=data.completed_on.strftime("%B %d, %Y"),
+        font_css=Markup(font_css),
+    )
+
+
+# =============================================================================
+# PDF — runs in worker processes
+# =============================================================================
+
+def _fit(c, text: str, font: str, size: float, max_width: float) -> float:
+    while size > 10 and c.stringWidth(text, font, size) > max_width:
+        size -= 1
+    return size
+
+
+def draw_pdf(data: CertificateData, path: str) -> None:
+    """Draw the certificate onto an A4-landscape page at `path`."""
+    w, h = landscape(A4)
+    c = canvas.Canvas(path, pagesize=(w, h))
+    c.setTitle(f"SPAE Certificate of Completion — {data.name}")
+
+    # Gradient-ish frame: the three brand colours as nested borders
+    for inset, colour in ((18, "#4f46e5"), (24, "#0ea5e9"), (30, "#10b981")):
+        c.setStrokeColor(HexColor(colour))
+        c.setLineWidth(5)
+        c.rect(inset, inset, w - 2 * inset, h - 2 * inset)
+
+    cx = w / 2
+    c.setFillColor(HexColor("#6b7280"))
+    c.setFont("Helvetica", 11)
+    c.drawCentredString(cx, h - 95, "S P A E   O N B O A R D I N G   H U B")
+    c.setFillColor(HexColor("#1f2937"))
+    c.setFont("Times-Bold", 34)
+    c.drawCentredString(cx, h - 145, "Certificate of Completion")
+    c.setFillColor(HexColor("#6b7280"))
+    c.setFont("Helvetica", 13)
+    c.drawCentredString(cx, h - 185, "This certifies that")
+
+    size = _fit(c, data.name, "Times-Bold", 40, w - 200)
+    c.setFillColor(HexColor("#4f46e5"))
+    c.setFont("Times-Bold", size)
+    c.drawCentredString(cx, h - 240, data.name)
+    c.setStrokeColor(HexColor("#e5e7eb"))
+    c.setLineWidth(1)
+    c.line(cx - 220, h - 258, cx + 220, h - 258)
+
+    size  = _fit(c, data.role, "Helvetica-Bold", 13, w - 260)
+    pill  = c.stringWidth(data.role, "Helvetica-Bold", size) + 48
+    c.setFillColor(HexColor("#4f46e5"))
+    c.roundRect(cx - pill / 2, h - 300, pill, 28, 14, stroke=0, fill=1)
+    c.setFillColor(HexColor("#ffffff"))
+    c.setFont("Helvetica-Bold", size)
+    c.drawCentredString(cx, h - 291, data.role)
+
+    c.setFillColor(HexColor("#374151"))
+    c.setFont("Helvetica", 12)
+    c.drawCentredString(cx, h - 340, "has successfully completed the SPAE onboarding programme, fulfilling all required")
+    c.drawCentredString(cx, h - 358, "training modules, system access tasks, and milestone activities.")
+
+    c.setStrokeColor(HexColor("#e5e7eb"))
+    c.line(90, 130, w - 90, 130)
+    c.setFillColor(HexColor("#374151"))
+    c.setFont("Helvetica-Bold", 12)
+    c.drawString(90, 105, data.manager)
+    c.drawRightString(w - 90, 105, data.completed_on.strftime("%B %d, %Y"))
+    c.setFillColor(HexColor("#9ca3af"))
+    c.setFont("Helvetica", 10)
+    c.drawString(90, 90, "Line Manager")
+    c.drawRightString(w - 90, 90, "Date of Completion")
+    c.showPage()
+    c.save()
+
+
+def render_pdf_file(data: CertificateData, cache_dir: str) -> str:
+    """Worker entry point: render into the cache (atomically) unless already there."""
+    path = os.path.join(cache_dir, f"{data.digest()}.pdf")
+    if os.path.exists(path):
+        return path
+    os.makedirs(cache_dir, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=cache_dir, suffix=".tmp")
+    os.close(fd)
+    try:
+        draw_pdf(data, tmp)
+        os.replace(tmp, path)
+    finally:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+    return path
+
+
+# =============================================================================
+# SERVICE
+# =============================================================================
+
+class CertificateService:
+    """Process-wide. PDFs render in a spawn-context pool (safe next to the server's threads)."""
+
+    def __init__(self, cache_dir: str = DEFAULT_CACHE_DIR, workers: int = DEFAULT_WORKERS):
+        self.cache_dir = cache_dir
+        self.workers   = workers
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._pending: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+
+    def html(self, data: CertificateData, font_css: str = "") -> str:
+        return render_html(data, font_css)
+
+    def _executor(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self.workers, mp_context=get_context("spawn"))
+        return self._pool
+
+    def submit_pdf(self, data: CertificateData) -> Future:
+        """Start rendering (once per digest) and return its future."""
+        if not HAS_REPORTLAB:
+            raise RuntimeError("PDF certificates need reportlab. Run: pip install reportlab")
+        key = data.digest()
+        with self._lock:
+            future = self._pending.get(key)
+            if future is None or (future.done() and future.exception() is not None):
+                future = self._executor().submit(render_pdf_file, data, self.cache_dir)
+                self._pending[key] = future
+                future.add_done_callback(lambda f, k=key: self._forget(k, f))
+            return future
+
+    def _reset_pool(self) -> None:
+        """A worker died (OOM, spawn failure) and took the pool with it — start a fresh one next time."""
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+    def _forget(self, key: str, future: Future) -> None:
+        if future.exception() is None:
+            with self._lock:
+                self._pending.pop(key, None)
+
+    def pdf(self, data: CertificateData, wait_s: float = 10.0) -> Optional[bytes]:
+        """
+        Cached PDF bytes, rendering in the pool if needed. None if it isn't
+        ready within `wait_s` or rendering failed (logged) — the page goes on.
+        """
+        path = os.path.join(self.cache_dir, f"{data.digest()}.pdf")
+        if not os.path.exists(path):
+            try:
+                path = self.submit_pdf(data).result(timeout=wait_s)
+            except TimeoutError:
+                return None
+            except BrokenProcessPool:
+                logger.error("Certificate worker died rendering %s — restarting the pool", data.digest()[:12])
+                self._reset_pool()
+                return None
+            except Exception:
+                logger.exception("Certificate PDF %s failed", data.digest()[:12])
+                return None
+        with open(path, "rb") as fh:
+            return fh.read()
+
+    def batch(self, items: Iterable[CertificateData], out_dir: str) -> List[Tuple[CertificateData, str]]:
+        """Render every certificate in parallel and link/copy it into `out_dir` under a readable name."""
+        os.makedirs(out_dir, exist_ok=True)
+        items   = list(items)
+        futures = [self.submit_pdf(d) for d in items]
+        written = []
+        for data, future in zip(items, futures):
+            src = future.result()
+            dst = os.path.join(out_dir, f"{data.filename('pdf')[:-4]}_{data.digest()[:8]}.pdf")
+            with open(src, "rb") as fh, open(dst, "wb") as out:
+                out.write(fh.read())
+            written.append((data, dst))
+        return written
+
+    def shutdown(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=True)
+            self._pool = None
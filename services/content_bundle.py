@@ -0,0 +1,421 @@
+"""
+content_bundle.py — Versioned Content Bundles & Hot Reload
+===========================================================
+The app never reads content/ modules directly. It reads an immutable
+ContentBundle: a frozen snapshot of everything in content/, plus a version
+number and a digest of the source files it was compiled from.
+Roles are resolved once per bundle into RoleViews (services/roles.py), so
+switching role only looks up a different precompiled view.
+
+BundleManager polls content/ for changes. When a file changes it reloads the
+package in its own thread, validates the result and — only if validation
+passes — swaps the new bundle in with the next version number. A broken edit
+is logged and ignored; the previous bundle stays live.
+
+Sessions compare their `content_version` with the live bundle on every rerun
+and move across on their next click (see remap_progress_to_bundle in app.py),
+so a content edit no longer needs a restart that drops everyone's session.
+
+Content can come from the Python modules in content/, from YAML / JSON / CSV
+files (services/content_files.py), or both. The merged, validated result is
+pickled under `cache_dir`, keyed by a hash of every source file, so a cold
+start with unchanged content loads it without importing or parsing anything.
+
+Progress is keyed by task and course IDs. Each bundle also carries the alias
+maps (services/content_ids.py) that turn older keys — titles, renamed IDs —
+into current IDs; `remap_tasks` / `remap_courses` apply them to stored maps.
+
+    [content]              # optional
+    watch           = true
+    poll_interval_s = 5
+    sources         = ["python"]          # and/or "files"
+    data_dir        = "content/data"
+    cache_dir       = ".cache/content"    # omit to disable the cache
+"""
+
+import hashlib
+import importlib
+import logging
+import os
+import pickle
+import sys
+import tempfile
+import threading
+import time
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Any, Dict, List, Mapping, Optional, Tuple
+
+from services.badges import BadgeRules, compile_rules, rule_errors
+from services.content_files import data_files, load_data_dir, merge_fragment
+from services.content_ids import (
+    alias_errors, alias_map, course_ids, id_errors, legacy_course_keys, legacy_task_keys, remap_keys, task_ids,
+)
+from services.roles import RoleView, compile_roles, role_key_map, validate_roles
+
+logger = logging.getLogger(__name__)
+
+REPO_ROOT        = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CONTENT_DIR      = os.path.join(REPO_ROOT, "content")
+DEFAULT_DATA_DIR = os.path.join("content", "data")
+
+# Bump when the cached namespace layout changes so stale caches miss
+CACHE_FORMAT = 3
+
+# Reload order matters: content/__init__.py imports the others
+CONTENT_MODULES = (
+    "content.roles", "content.courses", "content.aliases", "content.tasks", "content.systems",
+    "content.glossary", "content.faqs", "content.badges", "content.acronyms", "content",
+)
+
+TASK_KEYS   = ("ID", "Phase", "Category", "Task", "Mentor", "Type", "Tip", "Role")
+BADGE_KEYS  = ("id", "name", "icon", "desc")
+NS_KEYS     = (
+    "roles", "phase_order", "tasks", "navigator_courses", "faros_catalog",
+    "toolkit", "quick_links", "theme_images", "tech_stacks", "key_contacts",
+    "glossary", "faqs", "badges", "acronyms", "task_aliases", "course_aliases",
+)
+
+_COMPILE_LOCK = threading.Lock()
+
+
+class ContentError(ValueError):
+    """Raised when content/ fails validation. Message lists every problem found."""
+
+
+def freeze(obj: Any) -> Any:
+    """Recursively turn dicts into read-only mappings and lists into tuples."""
+    if isinstance(obj, Mapping):
+        return MappingProxyType({k: freeze(v) for k, v in obj.items()})
+    if isinstance(obj, (list, tuple)):
+        return tuple(freeze(v) for v in obj)
+    return obj
+
+
+@dataclass(frozen=True)
+class ContentBundle:
+    version:           int
+    digest:            str
+    compiled_at:       float
+    role_key_map:      Mapping[str, str]
+    roles:             Mapping[str, RoleView]                # full role label → compiled role
+    phase_order:       Tuple[str, ...]
+    navigator_courses: Mapping[str, Mapping[str, str]]       # section → course ID → title
+    faros_catalog:     Mapping[str, Tuple[str, ...]]
+    toolkit:           Mapping[str, Tuple[str, ...]]
+    quick_links:       Mapping[str, Mapping[str, str]]
+    important_links:   Mapping[str, str]
+    theme_images:      Mapping[str, str]
+    key_contacts:      Mapping[str, str]
+    glossary:          Mapping[str, Mapping[str, str]]
+    faqs:              Mapping[str, Tuple[Mapping, ...]]
+    badges:            Tuple[Mapping, ...]
+    acronyms:          Mapping[str, str]
+    badge_rules:       BadgeRules                            # compiled `rule` of each badge
+    task_aliases:      Mapping[str, str]                     # any older task key → task ID
+    course_aliases:    Mapping[str, str]                     # any older course key → course ID
+
+    def role(self, full_role: str) -> RoleView:
+        """Unknown roles fall back to the first."""
+        if full_role in self.roles:
+            return self.roles[full_role]
+        return self.roles[next(iter(self.role_key_map))]
+
+    def checklist(self, full_role: str) -> Tuple[Mapping, ...]:
+        return self.role(full_role).tasks
+
+    def resolve(self, kind: str, key: str) -> str:
+        """The current ID for a "task" / "course" key; current and unknown keys come back as-is."""
+        aliases = self.task_aliases if kind == "task" else self.course_aliases
+        return aliases.get(key, key)
+
+    def remap_tasks(self, stored: Mapping[str, Any]) -> Dict[str, Any]:
+        return remap_keys(stored, self.task_aliases)[0]
+
+    def remap_courses(self, stored: Mapping[str, Any]) -> Dict[str, Any]:
+        return remap_keys(stored, self.course_aliases)[0]
+
+    def remap_days(self, stored: Mapping[str, Any]) -> Dict[str, Any]:
+        """completion_days holds tasks and courses side by side (their IDs never clash)."""
+        return remap_keys(stored, {**self.course_aliases, **self.task_aliases})[0]
+
+
+# =============================================================================
+# SOURCES
+# =============================================================================
+
+@dataclass(frozen=True)
+class ContentSources:
+    """
+    Where content comes from. Both sources can be on at once: data files are
+    merged over the Python modules (lists append, mappings merge by key), so
+    teams can move one file at a time.
+    """
+    python:    bool          = True
+    data_dir:  Optional[str] = None      # YAML / JSON / CSV, see services/content_files.py
+    cache_dir: Optional[str] = None      # compiled-bundle cache; None disables it
+
+    @classmethod
+    def from_config(cls, cfg: Mapping[str, Any]) -> "ContentSources":
+        names = [str(s).lower() for s in cfg.get("sources", ["python"])]
+        unknown = set(names) - {"python", "files"}
+        if unknown or not names:
+            raise ContentError(f"[content] sources must be 'python' and/or 'files', got {names}")
+        return cls(
+            python=("python" in names),
+            data_dir=_abs(cfg.get("data_dir", DEFAULT_DATA_DIR)) if "files" in names else None,
+            cache_dir=_abs(cfg["cache_dir"]) if cfg.get("cache_dir") else None,
+        )
+
+
+def _abs(path: str) -> str:
+    return path if os.path.isabs(path) else os.path.join(REPO_ROOT, path)
+
+
+def source_files(sources: ContentSources = ContentSources()) -> List[str]:
+    paths = []
+    if sources.python:
+        for root, _, files in os.walk(CONTENT_DIR):
+            paths.extend(os.path.join(root, f) for f in files if f.endswith(".py"))
+    if sources.data_dir:
+        paths.extend(data_files(sources.data_dir))
+    return sorted(paths)
+
+
+def source_signature(sources: ContentSources = ContentSources()) -> Tuple[Tuple[str, float, int], ...]:
+    """Cheap change detector: (path, mtime, size) of every content file."""
+    sig = []
+    for path in source_files(sources):
+        try:
+            st = os.stat(path)
+        except OSError:
+            continue
+        sig.append((path, st.st_mtime, st.st_size))
+    return tuple(sig)
+
+
+def source_digest(sources: ContentSources = ContentSources()) -> str:
+    """Content hash of every source file — also the key of the compiled cache."""
+    h = hashlib.sha256(f"{CACHE_FORMAT}|{sources.python}|{bool(sources.data_dir)}".encode())
+    for path in source_files(sources):
+        h.update(os.path.relpath(path, REPO_ROOT).encode())
+        with open(path, "rb") as fh:
+            h.update(fh.read())
+    return h.hexdigest()
+
+
+def _load_python(reload: bool) -> Dict[str, Any]:
+    if reload:
+        importlib.invalidate_caches()
+        for name in CONTENT_MODULES:
+            if name in sys.modules:
+                importlib.reload(sys.modules[name])
+    content  = importlib.import_module("content")
+    tasks    = importlib.import_module("content.tasks")
+    systems  = importlib.import_module("content.systems")
+
+    return {
+        "roles":             content.ROLES,
+        "phase_order":       list(tasks.PHASE_ORDER),
+        "tasks":             tasks.ALL_TASKS,
+        "navigator_courses": content.NAVIGATOR_COURSES,
+        "faros_catalog":     content.FAROS_CATALOG,
+        "toolkit":           content.TOOLKIT,
+        "quick_links":       content.QUICK_LINKS,
+        "theme_images":      content.THEME_IMAGES,
+        "tech_stacks":       content.TECH_STACKS,
+        "key_contacts":      systems.KEY_CONTACTS,
+        "glossary":          content.GLOSSARY,
+        "faqs":              content.FAQS,
+        "badges":            content.ALL_BADGES,
+        "acronyms":          content.ACRONYMS,
+        "task_aliases":      content.TASK_ALIASES,
+        "course_aliases":    content.COURSE_ALIASES,
+    }
+
+
+# =============================================================================
+# COMPILE & VALIDATE
+# =============================================================================
+
+def validate(ns: Dict[str, Any]) -> List[str]:
+    """Return every problem found in freshly loaded content (empty list = valid)."""
+    missing = [k for k in NS_KEYS if k not in ns]
+    if missing:
+        return [f"no source provides {', '.join(missing)}"]
+
+    errors      = validate_roles(ns)
+    phase_order = ns["phase_order"]
+
+    complete = []
+    for t in ns["tasks"]:
+        missing = [k for k in TASK_KEYS if k not in t]
+        if missing:
+            errors.append(f"task {t.get('Task', '?')!r}: missing {', '.join(missing)}")
+            continue
+        if t["Phase"] not in phase_order:
+            errors.append(f"task {t['Task']!r}: unknown Phase {t['Phase']!r}")
+        complete.append(t)
+    if "Mandatory" not in ns["navigator_courses"]:
+        errors.append("NAVIGATOR_COURSES has no 'Mandatory' section")
+    id_problems = id_errors(complete, ns["navigator_courses"])
+    errors += id_problems
+    if not id_problems:
+        errors += alias_errors("task", task_ids(complete), ns["task_aliases"])
+        errors += alias_errors("course", course_ids(ns["navigator_courses"]), ns["course_aliases"])
+    if "Common" not in ns["quick_links"]:
+        errors.append("QUICK_LINKS has no 'Common' section")
+    badge_ids = [b.get("id") for b in ns["badges"]]
+    for b in ns["badges"]:
+        missing = [k for k in BADGE_KEYS if k not in b]
+        if missing:
+            errors.append(f"badge {b.get('id', '?')!r}: missing {', '.join(missing)}")
+    if len(badge_ids) != len(set(badge_ids)):
+        errors.append("ALL_BADGES has duplicate ids")
+    errors += rule_errors(ns["badges"])
+    return errors
+
+
+def _cache_path(sources: ContentSources, digest: str) -> Optional[str]:
+    if not sources.cache_dir:
+        return None
+    return os.path.join(sources.cache_dir, f"content-{digest[:16]}.pkl")
+
+
+def _read_cache(path: Optional[str]) -> Optional[Dict[str, Any]]:
+    if not path or not os.path.exists(path):
+        return None
+    try:
+        with open(path, "rb") as fh:
+            return pickle.load(fh)
+    except Exception as e:
+        logger.warning("Ignoring unreadable content cache %s — %s", path, e)
+        return None
+
+
+def _write_cache(path: Optional[str], ns: Dict[str, Any]) -> None:
+    """Atomic write, then drop cache entries for older digests."""
+    if not path:
+        return
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        with os.fdopen(fd, "wb") as fh:
+            pickle.dump(ns, fh, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, path)
+        for f in os.listdir(os.path.dirname(path)):
+            if f.startswith("content-") and f.endswith(".pkl") and f != os.path.basename(path):
+                os.remove(os.path.join(os.path.dirname(path), f))
+    except OSError as e:
+        logger.warning("Could not write content cache %s — %s", path, e)
+
+
+def compile_bundle(
+    version: int,
+    reload: bool = False,
+    sources: ContentSources = ContentSources(),
+) -> ContentBundle:
+    """
+    Load every enabled source (re-executing the content modules if `reload`),
+    validate the merged result and freeze it into a bundle. A cached compile
+    with the same digest is used as-is, skipping imports and parsing entirely.
+    Raises ContentError, ContentFileError or whatever the content modules
+    themselves raise (e.g. SyntaxError) — callers keep the old bundle.
+    """
+    with _COMPILE_LOCK:
+        digest = source_digest(sources)
+        cache  = _cache_path(sources, digest)
+        ns     = _read_cache(cache)
+        if ns is None:
+            ns = _load_python(reload) if sources.python else {}
+            if sources.data_dir:
+                for fragment in load_data_dir(sources.data_dir):
+                    merge_fragment(ns, fragment)
+            ns.setdefault("task_aliases", {})          # optional in every source
+            ns.setdefault("course_aliases", {})
+            errors = validate(ns)
+            if errors:
+                raise ContentError("; ".join(errors))
+            ns = {k: ns[k] for k in NS_KEYS}
+            _write_cache(cache, ns)
+    frozen = {k: freeze(v) for k, v in ns.items()}
+    task_aliases = alias_map(task_ids(ns["tasks"]), legacy_task_keys(ns["tasks"]), ns["task_aliases"])
+    course_aliases = alias_map(
+        course_ids(ns["navigator_courses"]), legacy_course_keys(ns["navigator_courses"]), ns["course_aliases"],
+    )
+    return ContentBundle(
+        version=version,
+        digest=digest,
+        compiled_at=time.time(),
+        role_key_map=MappingProxyType(role_key_map(ns["roles"])),
+        roles=MappingProxyType(compile_roles(frozen)),
+        important_links=frozen["quick_links"]["Common"],
+        badge_rules=compile_rules(frozen["badges"]),
+        task_aliases=MappingProxyType(task_aliases),
+        course_aliases=MappingProxyType(course_aliases),
+        **{k: v for k, v in frozen.items() if k not in ("roles", "tasks", "tech_stacks", "task_aliases", "course_aliases")},
+    )
+
+
+# =============================================================================
+# HOT RELOAD
+# =============================================================================
+
+class BundleManager:
+    """Holds the live bundle for the process and swaps in new versions."""
+
+    def __init__(
+        self,
+        watch: bool = True,
+        poll_interval_s: float = 5.0,
+        sources: ContentSources = ContentSources(),
+    ):
+        self.sources        = sources
+        self._bundle        = compile_bundle(version=1, sources=sources)
+        self._signature     = source_signature(sources)
+        self.poll_interval  = poll_interval_s
+        self.last_error: Optional[str] = None
+        self._lock   = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        if watch:
+            self.start()
+
+    @property
+    def current(self) -> ContentBundle:
+        return self._bundle
+
+    def check_for_changes(self) -> bool:
+        """Recompile if any content file changed. Returns True if a new bundle went live."""
+        signature = source_signature(self.sources)
+        if signature == self._signature:
+            return False
+        with self._lock:
+            self._signature = signature
+            if source_digest(self.sources) == self._bundle.digest:
+                return False            # touched but not changed
+            try:
+                bundle = compile_bundle(self._bundle.version + 1, reload=True, sources=self.sources)
+            except Exception as e:
+                self.last_error = f"{type(e).__name__}: {e}"
+                logger.error("Content reload rejected, keeping v%d — %s",
+                             self._bundle.version, self.last_error)
+                return False
+            self._bundle    = bundle     # single reference swap — readers never see a half bundle
+            self.last_error = None
+        logger.info("Content bundle v%d live (%s)", bundle.version, bundle.digest[:12])
+        return True
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+
+        def loop() -> None:
+            while True:
+                time.sleep(self.poll_interval)
+                try:
+                    self.check_for_changes()
+                except Exception:
+                    logger.exception("Content watcher failed")
+
+        self._thread = threading.Thread(target=loop, name="spae-content-watcher", daemon=True)
+        self._thread.start()
@@ -0,0 +1,331 @@
+"""
+content_files.py — Content from YAML / JSON / CSV Data Files
+=============================================================
+Lets non-engineers maintain content as data files instead of Python. Each
+file in the data directory is named after the kind of content it holds; the
+extension picks the parser:
+
+  tasks.csv      / .yaml / .json  → checklist tasks (same keys as content/tasks.py, incl. ID)
+  roles.yaml     / .json          → {key: {label, extends, include, abstract}} (see content/roles.py)
+  courses.yaml   / .json          → {"phases": [phase], "navigator": {section: {course ID: title}}}
+  systems.yaml   / .json          → {"faros": …, "toolkit": …, "quick_links": …,
+                                     "theme_images": …, "tech_stacks": …, "key_contacts": …}
+  glossary.csv   / .yaml / .json  → CSV columns: role, term, definition
+  faqs.csv       / .yaml / .json  → CSV columns: role, q, a
+  badges.csv     / .yaml / .json  → CSV columns: id, name, icon, desc, rule
+  acronyms.csv   / .yaml / .json  → CSV columns: acronym, meaning
+  aliases.csv    / .yaml / .json  → CSV columns: kind (task / course), old, new
+                                    (or {"tasks": {old: new}, "courses": {old: new}})
+
+Every file is checked against its schema before anything is merged, and every
+problem is reported with the file (and CSV row) it came from, so a typo gives
+a readable error instead of a broken app. `python -m tools.content_files`
+exports the current Python content to this format and checks a data folder.
+
+YAML needs PyYAML; JSON and CSV need nothing beyond the standard library.
+"""
+
+import csv
+import json
+import os
+from typing import Any, Callable, Dict, List, Tuple
+
+try:
+    import yaml
+    HAS_YAML = True
+except ImportError:
+    HAS_YAML = False
+
+DATA_EXTENSIONS = (".yaml", ".yml", ".json", ".csv")
+
+TASK_KEYS  = ("ID", "Phase", "Category", "Task", "Mentor", "Type", "Tip", "Role")
+BADGE_KEYS = ("id", "name", "icon", "desc")
+SYSTEM_SECTIONS = ("faros", "toolkit", "quick_links", "theme_images", "tech_stacks", "key_contacts")
+
+# Ordered vocabularies: a data file replaces these instead of appending to them
+REPLACE_KEYS = ("phase_order",)
+
+
+class ContentFileError(ValueError):
+    """A data file is unreadable or doesn't match its schema."""
+
+
+# =============================================================================
+# PARSERS
+# =============================================================================
+
+def _read_csv(path: str) -> List[Dict[str, str]]:
+    with open(path, newline="", encoding="utf-8-sig") as fh:
+        return [
+            {k.strip(): (v or "").strip() for k, v in row.items() if k}
+            for row in csv.DictReader(fh)
+        ]
+
+
+def read_data_file(path: str) -> Any:
+    ext = os.path.splitext(path)[1].lower()
+    try:
+        if ext == ".csv":
+            return _read_csv(path)
+        with open(path, encoding="utf-8") as fh:
+            if ext == ".json":
+                return json.load(fh)
+            if not HAS_YAML:
+                raise ContentFileError(f"{os.path.basename(path)}: PyYAML not installed. Run: pip install pyyaml")
+            return yaml.safe_load(fh)
+    except (OSError, ValueError) as e:
+        if isinstance(e, ContentFileError):
+            raise
+        raise ContentFileError(f"{os.path.basename(path)}: {e}") from e
+
+
+# =============================================================================
+# SCHEMAS — each returns (fragment for the bundle namespace, errors)
+# =============================================================================
+
+def _is_str_map(obj: Any) -> bool:
+    return isinstance(obj, dict) and all(isinstance(k, str) and isinstance(v, str) for k, v in obj.items())
+
+
+def _is_str_list(obj: Any) -> bool:
+    return isinstance(obj, list) and all(isinstance(v, str) for v in obj)
+
+
+def _rows(data: Any, where: str, errors: List[str]) -> List[Dict]:
+    if not isinstance(data, list) or not all(isinstance(r, dict) for r in data):
+        errors.append(f"{where}: expected a list of records")
+        return []
+    return data
+
+
+def _tasks(data: Any, where: str) -> Tuple[Dict, List[str]]:
+    errors: List[str] = []
+    tasks = []
+    for n, row in enumerate(_rows(data, where, errors), start=1):
+        missing = [k for k in TASK_KEYS if not isinstance(row.get(k), str) or not row.get(k)]
+        if missing and missing != ["Tip"]:
+            errors.append(f"{where} row {n}: missing {', '.join(missing)}")
+            continue
+        tasks.append({k: row.get(k, "") for k in TASK_KEYS})
+    return {"tasks": tasks}, errors
+
+
+def _badges(data: Any, where: str) -> Tuple[Dict, List[str]]:
+    errors: List[str] = []
+    badges = []
+    for n, row in enumerate(_rows(data, where, errors), start=1):
+        missing = [k for k in BADGE_KEYS if not row.get(k)]
+        if missing:
+            errors.append(f"{where} row {n}: missing {', '.join(missing)}")
+            continue
+        badges.append({k: row[k] for k in BADGE_KEYS} | {k: v for k, v in row.items() if k not in BADGE_KEYS})
+    return {"badges": badges}, errors
+
+
+def _acronyms(data: Any, where: str) -> Tuple[Dict, List[str]]:
+    if isinstance(data, list):
+        errors: List[str] = []
+        rows   = _rows(data, where, errors)
+        errors += [f"{where} row {n}: needs acronym and meaning"
+                   for n, r in enumerate(rows, start=1) if not (r.get("acronym") and r.get("meaning"))]
+        return {"acronyms": {r["acronym"]: r["meaning"] for r in rows
+                             if r.get("acronym") and r.get("meaning")}}, errors
+    if not _is_str_map(data):
+        return {}, [f"{where}: expected acronym → meaning"]
+    return {"acronyms": data}, []
+
+
+def _glossary(data: Any, where: str) -> Tuple[Dict, List[str]]:
+    if isinstance(data, list):
+        out: Dict[str, Dict[str, str]] = {}
+        errors: List[str] = []
+        for n, r in enumerate(_rows(data, where, errors), start=1):
+            if not (r.get("role") and r.get("term") and r.get("definition")):
+                errors.append(f"{where} row {n}: needs role, term and definition")
+                continue
+            out.setdefault(r["role"], {})[r["term"]] = r["definition"]
+        return {"glossary": out}, errors
+    if not isinstance(data, dict) or not all(_is_str_map(v) for v in data.values()):
+        return {}, [f"{where}: expected role → {{term: definition}}"]
+    return {"glossary": data}, []
+
+
+def _faqs(data: Any, where: str) -> Tuple[Dict, List[str]]:
+    out: Dict[str, List[Dict[str, str]]] = {}
+    errors: List[str] = []
+    if isinstance(data, list):
+        for n, r in enumerate(_rows(data, where, errors), start=1):
+            if not (r.get("role") and r.get("q") and r.get("a")):
+                errors.append(f"{where} row {n}: needs role, q and a")
+                continue
+            out.setdefault(r["role"], []).append({"q": r["q"], "a": r["a"]})
+        return {"faqs": out}, errors
+    if not isinstance(data, dict):
+        return {}, [f"{where}: expected role → [{{q, a}}]"]
+    for role, items in data.items():
+        if not isinstance(items, list) or not all(
+            isinstance(i, dict) and isinstance(i.get("q"), str) and isinstance(i.get("a"), str) for i in items
+        ):
+            errors.append(f"{where} [{role}]: every FAQ needs string q and a")
+            continue
+        out[role] = [{"q": i["q"], "a": i["a"]} for i in items]
+    return {"faqs": out}, errors
+
+
+def _aliases(data: Any, where: str) -> Tuple[Dict, List[str]]:
+    out: Dict[str, Dict[str, str]] = {"task_aliases": {}, "course_aliases": {}}
+    if isinstance(data, list):
+        errors: List[str] = []
+        for n, r in enumerate(_rows(data, where, errors), start=1):
+            if r.get("kind") not in ("task", "course") or not (r.get("old") and r.get("new")):
+                errors.append(f"{where} row {n}: needs kind (task or course), old and new")
+                continue
+            out[f"{r['kind']}_aliases"][r["old"]] = r["new"]
+        return out, errors
+    if not isinstance(data, dict) or set(data) - {"tasks", "courses"} or not all(_is_str_map(v) for v in data.values()):
+        return {}, [f"{where}: expected {{tasks: {{old: new}}, courses: {{old: new}}}}"]
+    out["task_aliases"].update(data.get("tasks", {}))
+    out["course_aliases"].update(data.get("courses", {}))
+    return out, []
+
+
+def _roles(data: Any, where: str) -> Tuple[Dict, List[str]]:
+    if not isinstance(data, dict) or not all(isinstance(v, dict) for v in data.values()):
+        return {}, [f"{where}: expected role key → {{label, extends, include, abstract}}"]
+    errors = []
+    for key, spec in data.items():
+        if "label" in spec and not isinstance(spec["label"], str):
+            errors.append(f"{where} [{key}]: label must be a string")
+        if not _is_str_list(spec.get("extends", [])):
+            errors.append(f"{where} [{key}]: extends must be a list of role keys")
+        include = spec.get("include", {})
+        if not isinstance(include, dict) or not all(_is_str_list(v) for v in include.values()):
+            errors.append(f"{where} [{key}]: include must map a set kind to a list of set names")
+        if not isinstance(spec.get("abstract", False), bool):
+            errors.append(f"{where} [{key}]: abstract must be true or false")
+    return {"roles": data}, errors
+
+
+def _tech_stack(value: Any) -> bool:
+    if not isinstance(value, dict) or set(value) - {"nodes", "edges"}:
+        return False
+    nodes, edges = value.get("nodes", []), value.get("edges", [])
+    return (
+        isinstance(nodes, list) and isinstance(edges, list)
+        and all(isinstance(n, dict) and isinstance(n.get("id"), str) and isinstance(n.get("label"), str) for n in nodes)
+        and all(isinstance(e, dict) and isinstance(e.get("from"), str) and isinstance(e.get("to"), str) for e in edges)
+    )
+
+
+def _courses(data: Any, where: str) -> Tuple[Dict, List[str]]:
+    if not isinstance(data, dict):
+        return {}, [f"{where}: expected {{phases: …, navigator: …}}"]
+    errors, out = [], {}
+    if "phases" in data:
+        if _is_str_list(data["phases"]) and data["phases"]:
+            out["phase_order"] = data["phases"]
+        else:
+            errors.append(f"{where} phases: expected a list of phase names, in order")
+    if "navigator" in data:
+        nav = data["navigator"]
+        if isinstance(nav, dict) and all(_is_str_map(v) for v in nav.values()):
+            out["navigator_courses"] = nav
+        else:
+            errors.append(f"{where} navigator: expected section → {{course ID: title}}")
+    return out, errors
+
+
+def _systems(data: Any, where: str) -> Tuple[Dict, List[str]]:
+    if not isinstance(data, dict):
+        return {}, [f"{where}: expected a mapping with {', '.join(SYSTEM_SECTIONS)}"]
+    errors, out = [], {}
+    checks: Dict[str, Tuple[str, Callable[[Any], bool]]] = {
+        "faros":        ("faros_catalog", lambda v: isinstance(v, dict) and all(_is_str_list(x) for x in v.values())),
+        "toolkit":      ("toolkit",       lambda v: isinstance(v, dict) and all(_is_str_list(x) for x in v.values())),
+        "quick_links":  ("quick_links",   lambda v: isinstance(v, dict) and all(_is_str_map(x) for x in v.values())),
+        "theme_images": ("theme_images",  _is_str_map),
+        "tech_stacks":  ("tech_stacks",   lambda v: isinstance(v, dict) and all(_tech_stack(x) for x in v.values())),
+        "key_contacts": ("key_contacts",  _is_str_map),
+    }
+    for section, value in data.items():
+        if section not in checks:
+            errors.append(f"{where}: unknown section {section!r}")
+            continue
+        key, ok = checks[section]
+        if ok(value):
+            out[key] = value
+        else:
+            errors.append(f"{where} {section}: wrong shape")
+    return out, errors
+
+
+SCHEMAS: Dict[str, Callable[[Any, str], Tuple[Dict, List[str]]]] = {
+    "roles":    _roles,
+    "tasks":    _tasks,
+    "badges":   _badges,
+    "acronyms": _acronyms,
+    "aliases":  _aliases,
+    "glossary": _glossary,
+    "faqs":     _faqs,
+    "courses":  _courses,
+    "systems":  _systems,
+}
+
+
+# =============================================================================
+# LOADING
+# =============================================================================
+
+def data_files(data_dir: str) -> List[str]:
+    if not data_dir or not os.path.isdir(data_dir):
+        return []
+    return sorted(
+        os.path.join(data_dir, f) for f in os.listdir(data_dir)
+        if os.path.splitext(f)[1].lower() in DATA_EXTENSIONS
+    )
+
+
+def load_data_dir(data_dir: str) -> List[Dict]:
+    """
+    Parse and schema-check every data file. Returns one namespace fragment per
+    file, in file-name order. Raises ContentFileError listing all problems.
+    """
+    fragments, errors = [], []
+    for path in data_files(data_dir):
+        name = os.path.basename(path)
+        kind = os.path.splitext(name)[0].lower()
+        if kind not in SCHEMAS:
+            errors.append(f"{name}: unknown content file (expected one of {', '.join(SCHEMAS)})")
+            continue
+        try:
+            data = read_data_file(path)
+        except ContentFileError as e:
+            errors.append(str(e))
+            continue
+        fragment, problems = SCHEMAS[kind](data, name)
+        errors.extend(problems)
+        fragments.append(fragment)
+    if errors:
+        raise ContentFileError("; ".join(errors))
+    return fragments
+
+
+def merge_fragment(ns: Dict[str, Any], fragment: Dict[str, Any]) -> None:
+    """Lists append, mappings merge key by key (later sources win)."""
+    for key, value in fragment.items():
+        if key not in ns or key in REPLACE_KEYS:
+            ns[key] = value
+        elif isinstance(value, list):
+            ns[key] = list(ns[key]) + value
+        elif isinstance(value, dict):
+            merged = dict(ns[key])
+            for k, v in value.items():
+                if isinstance(v, list) and isinstance(merged.get(k), list):
+                    merged[k] = merged[k] + v
+                elif isinstance(v, dict) and isinstance(merged.get(k), dict):
+                    merged[k] = {**merged[k], **v}
+                else:
+                    merged[k] = v
+            ns[key] = merged
+        else:
+            ns[key] = value
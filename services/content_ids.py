@@ -0,0 +1,113 @@
+"""
+content_ids.py — Stable Task & Course IDs
+==========================================
+Progress maps (checklist, navigator_status, completion_days) are keyed by
+each task's `ID` and each course's ID, never by display text, so a typo fix
+in a title no longer orphans everyone's progress.
+
+Keys that are not current IDs — the task title or "section::course title"
+they were saved under before IDs existed, and IDs that were later changed —
+resolve through one alias map per kind (see content/aliases.py). Current
+titles are recognised automatically; aliases may chain (a → b → c).
+
+`remap_keys` translates one stored map. The app applies it to a user's
+progress when it loads it (and when the content changes under a session);
+`python -m tools.migrate_ids` writes the result back to every document.
+"""
+
+import re
+from typing import Any, Dict, Iterable, List, Mapping, Set, Tuple
+
+ID_PATTERN = re.compile(r"^[a-z0-9][a-z0-9_-]*$")
+
+
+def legacy_course_key(section: str, title: str) -> str:
+    """What a course's progress was saved under before it had an ID."""
+    return f"{section}::{title}"
+
+
+def task_ids(tasks: Iterable[Mapping]) -> List[str]:
+    return [t["ID"] for t in tasks]
+
+
+def course_ids(navigator_courses: Mapping[str, Mapping[str, str]]) -> List[str]:
+    return [cid for courses in navigator_courses.values() for cid in courses]
+
+
+def legacy_task_keys(tasks: Iterable[Mapping]) -> Dict[str, str]:
+    return {t["Task"]: t["ID"] for t in tasks}
+
+
+def legacy_course_keys(navigator_courses: Mapping[str, Mapping[str, str]]) -> Dict[str, str]:
+    return {
+        legacy_course_key(section, title): cid
+        for section, courses in navigator_courses.items() for cid, title in courses.items()
+    }
+
+
+def id_errors(tasks: Iterable[Mapping], navigator_courses: Mapping[str, Any]) -> List[str]:
+    errors = []
+    seen: Set[str] = set()
+    for t in tasks:
+        tid = t.get("ID")
+        if not isinstance(tid, str) or not ID_PATTERN.match(tid):
+            errors.append(f"task {t.get('Task', '?')!r}: ID {tid!r} must be lowercase letters, digits, '_' or '-'")
+        elif tid in seen:
+            errors.append(f"duplicate task ID {tid!r}")
+        seen.add(tid)
+    for section, courses in navigator_courses.items():
+        if not isinstance(courses, Mapping) or not all(isinstance(t, str) for t in courses.values()):
+            errors.append(f"NAVIGATOR_COURSES[{section!r}]: map each course ID to its title")
+            continue
+        for cid in courses:
+            if not isinstance(cid, str) or not ID_PATTERN.match(cid):
+                errors.append(f"course {section}::{cid}: ID must be lowercase letters, digits, '_' or '-'")
+            elif cid in seen:
+                errors.append(f"duplicate ID {cid!r} (course IDs share completion_days with tasks)")
+            seen.add(cid)
+    return errors
+
+
+def alias_map(current: Iterable[str], legacy: Mapping[str, str], declared: Mapping[str, str]) -> Dict[str, str]:
+    """Every non-current key → the current ID it resolves to. Declared aliases win over legacy titles."""
+    current = set(current)
+    edges   = {**legacy, **declared}
+    out: Dict[str, str] = {}
+    for key in edges:
+        if key in current:
+            continue                          # a title equal to an ID is just the ID
+        target, hops = edges[key], 0
+        while target not in current and target in edges and hops < len(edges):
+            target, hops = edges[target], hops + 1
+        if target in current:
+            out[key] = target
+    return out
+
+
+def alias_errors(kind: str, current: Iterable[str], declared: Mapping[str, str]) -> List[str]:
+    current = set(current)
+    errors  = []
+    for old, new in declared.items():
+        if old in current:
+            errors.append(f"{kind} alias {old!r} is a current ID — remove it from the aliases")
+        elif new not in current and new not in declared:
+            errors.append(f"{kind} alias {old!r} → unknown ID {new!r}")
+    resolved = alias_map(current, {}, declared)
+    for old in declared:
+        if old not in current and old not in resolved:
+            errors.append(f"{kind} alias {old!r} never reaches a current ID (cycle?)")
+    return errors
+
+
+def remap_keys(stored: Mapping[str, Any], aliases: Mapping[str, str]) -> Tuple[Dict[str, Any], bool]:
+    """
+    (map with every aliased key replaced by its ID, whether anything changed).
+    A value already saved under the ID is newer and wins over the aliased one;
+    unknown keys are kept as they are, never dropped.
+    """
+    out     = {k: v for k, v in stored.items() if k not in aliases}
+    changed = len(out) != len(stored)
+    for k, v in stored.items():
+        if k in aliases and aliases[k] not in out:
+            out[aliases[k]] = v
+    return out, changed
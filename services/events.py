@@ -0,0 +1,185 @@
+"""
+events.py — Completion Event Log
+=================================
+Append-only stream of every checklist/Navigator click, so questions like
+"how long does SAP training take new hires" or "which tasks stall" can be
+answered later. The `checklist` / `navigator_status` maps on the user
+document stay the source of truth for current state; this is the history.
+
+Clicks only append to an in-memory buffer — nothing blocks the rerun. A
+background thread writes the buffer with insert_many every
+`flush_interval_s`, or sooner when `batch_size` events are waiting. If
+MongoDB is unreachable the buffer keeps up to `max_buffer` events and drops
+the oldest beyond that (counted in stats()).
+
+Events go to a MongoDB time-series collection (plain collection with a TTL
+index on servers older than 5.0):
+
+    {ts, meta: {oid, item, kind, role}, action, session, day}
+
+  item    : task ID or Navigator course key
+  kind    : "task" | "course"
+  action  : "complete" | "uncomplete"
+  day     : days since the user's start date when it happened
+
+Indexes serve per-user and per-item time-range queries; raw events expire
+after `ttl_days`.
+
+    [events]               # optional
+    collection       = "events"
+    flush_interval_s = 2
+    batch_size       = 500
+    ttl_days         = 365
+"""
+
+import atexit
+import logging
+import threading
+from collections import deque
+from datetime import date, datetime, timezone
+from typing import Any, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_COLLECTION     = "events"
+DEFAULT_FLUSH_INTERVAL = 2.0
+DEFAULT_BATCH_SIZE     = 500
+DEFAULT_TTL_DAYS       = 365
+DEFAULT_MAX_BUFFER     = 50_000
+
+INDEXES = (
+    [("meta.oid", 1), ("ts", 1)],                  # one user's history
+    [("meta.item", 1), ("ts", 1)],                 # one task/course across users
+)
+
+
+def ensure_collection(db, name: str, ttl_days: int):
+    """Create the events collection once (time-series where supported) with its indexes."""
+    from pymongo.errors import CollectionInvalid, OperationFailure
+    ttl_s = int(ttl_days * 86400)
+    if name not in db.list_collection_names():
+        try:
+            db.create_collection(
+                name,
+                timeseries={"timeField": "ts", "metaField": "meta", "granularity": "minutes"},
+                expireAfterSeconds=ttl_s,
+            )
+        except CollectionInvalid:
+            pass                                # another replica created it first
+        except OperationFailure:
+            db.create_collection(name)           # pre-5.0 server: TTL index instead
+            db[name].create_index("ts", expireAfterSeconds=ttl_s)
+    col = db[name]
+    for keys in INDEXES:
+        col.create_index(keys)
+    return col
+
+
+class EventLog:
+    """Process-wide buffered writer. One instance per process."""
+
+    def __init__(
+        self,
+        get_db: Callable[[], Any],
+        collection: str = DEFAULT_COLLECTION,
+        flush_interval_s: float = DEFAULT_FLUSH_INTERVAL,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        ttl_days: int = DEFAULT_TTL_DAYS,
+        max_buffer: int = DEFAULT_MAX_BUFFER,
+    ):
+        self._get_db         = get_db
+        self.collection_name = collection
+        self.flush_interval  = flush_interval_s
+        self.batch_size      = batch_size
+        self.ttl_days        = ttl_days
+        self._buffer: deque  = deque(maxlen=max_buffer)
+        self._lock           = threading.Lock()
+        self._flush_lock     = threading.Lock()
+        self._wake           = threading.Event()
+        self._col            = None
+        self._thread: Optional[threading.Thread] = None
+        self.written = 0
+        self.dropped = 0
+        self.failures = 0
+
+    # ── Called from the script thread ────────────────────────────────────────
+    def record(
+        self,
+        oid: str,
+        item: str,
+        kind: str,
+        done: bool,
+        role: str = "",
+        session: str = "",
+        start_date: Optional[date] = None,
+    ) -> None:
+        now = datetime.now(timezone.utc)
+        event = {
+            "ts":      now,
+            "meta":    {"oid": oid, "item": item, "kind": kind, "role": role},
+            "action":  "complete" if done else "uncomplete",
+            "session": session,
+        }
+        if start_date is not None:
+            event["day"] = (now.date() - start_date).days
+        with self._lock:
+            if len(self._buffer) == self._buffer.maxlen:
+                self.dropped += 1
+            self._buffer.append(event)
+            full = len(self._buffer) >= self.batch_size
+        if full:
+            self._wake.set()
+
+    # ── Writer ───────────────────────────────────────────────────────────────
+    def _collection(self):
+        if self._col is None:
+            db = self._get_db()
+            if db is None:
+                return None
+            self._col = ensure_collection(db, self.collection_name, self.ttl_days)
+        return self._col
+
+    def flush(self) -> int:
+        """Write everything buffered, batch_size at a time. Returns events written."""
+        written = 0
+        with self._flush_lock:
+            while True:
+                with self._lock:
+                    batch: List[Dict] = [self._buffer.popleft() for _ in range(min(self.batch_size, len(self._buffer)))]
+                if not batch:
+                    return written
+                try:
+                    col = self._collection()
+                    if col is None:
+                        raise ConnectionError("MongoDB unavailable")
+                    col.insert_many(batch, ordered=False)
+                except Exception as e:
+                    with self._lock:                  # put them back, oldest first
+                        self._buffer.extendleft(reversed(batch))
+                    self.failures += 1
+                    logger.warning("Event flush failed, %d event(s) kept — %s", len(batch), e)
+                    return written
+                written      += len(batch)
+                self.written += len(batch)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            pending = len(self._buffer)
+        return {"pending": pending, "written": self.written, "dropped": self.dropped, "failures": self.failures}
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+
+        def loop() -> None:
+            while True:
+                self._wake.wait(self.flush_interval)
+                self._wake.clear()
+                try:
+                    self.flush()
+                except Exception:
+                    logger.exception("Event writer failed")
+
+        self._thread = threading.Thread(target=loop, name="spae-event-writer", daemon=True)
+        self._thread.start()
+        atexit.register(self.flush)
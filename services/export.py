@@ -0,0 +1,184 @@
+"""
+export.py — Streaming Progress Export for HR Analytics
+=======================================================
+Flattens every user document into one row of a fixed-schema table — profile,
+per-role completion, one column per checklist task and Navigator course, and
+badge counters — and writes it as Parquet or CSV while the cursor is still
+being read. Memory is bounded by `batch_size` rows, not by the collection:
+documents are fetched with a projection in cursor batches, converted and
+written one chunk at a time.
+
+Used by `python -m tools.export` and by the admin download in the app.
+Parquet needs pyarrow (CSV needs nothing extra).
+"""
+
+import csv
+import itertools
+from datetime import datetime
+from typing import IO, Any, Dict, Iterable, Iterator, List, Mapping, Optional, Tuple
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    HAS_PYARROW = True
+except ImportError:
+    HAS_PYARROW = False
+
+DEFAULT_BATCH_SIZE = 2000
+
+# Only what the table needs — quiz answers and the like never leave MongoDB
+PROJECTION = {
+    "azure_email":                  1,
+    "profile":                      1,
+    "checklist":                    1,
+    "navigator_status":             1,
+    "badges.session_completions":   1,
+    "quiz.perfect_quiz":            1,
+    "last_updated":                 1,
+    "wizard_pending":               1,
+    "pending_claim":                1,
+    "provisioned.batch":            1,
+}
+
+PROFILE_COLUMNS: List[Tuple[str, str]] = [
+    ("oid",                 "string"),
+    ("email",               "string"),
+    ("name",                "string"),
+    ("role",                "string"),
+    ("role_key",            "string"),
+    ("start_date",          "string"),
+    ("buddy",               "string"),
+    ("manager",             "string"),
+    ("provisioned_batch",   "string"),
+    ("signed_in",           "bool"),
+    ("wizard_done",         "bool"),
+    ("last_updated",        "string"),
+    ("tasks_done",          "int"),
+    ("tasks_total",         "int"),
+    ("checklist_pct",       "float"),
+    ("courses_done",        "int"),
+    ("courses_total",       "int"),
+    ("navigator_pct",       "float"),
+    ("overall_pct",         "float"),
+    ("session_completions", "int"),
+    ("perfect_quiz",        "bool"),
+]
+
+
+def item_columns(bundle) -> Tuple[List[str], List[str]]:
+    """Every task ID and course key in the content, across all roles, in display order."""
+    tasks, courses = [], []
+    for role in bundle.roles.values():
+        for t in role.tasks:
+            if t["ID"] not in tasks:
+                tasks.append(t["ID"])
+        for c in role.courses:
+            if c.id not in courses:
+                courses.append(c.id)
+    return tasks, courses
+
+
+def columns(bundle) -> List[Tuple[str, str]]:
+    tasks, courses = item_columns(bundle)
+    return (
+        PROFILE_COLUMNS
+        + [(f"task::{t}", "bool") for t in tasks]
+        + [(f"course::{c}", "bool") for c in courses]
+    )
+
+
+def flatten(doc: Mapping[str, Any], bundle, tasks: List[str], courses: List[str]) -> Dict[str, Any]:
+    profile   = doc.get("profile", {})
+    checklist = bundle.remap_tasks(doc.get("checklist", {}))
+    navigator = bundle.remap_courses(doc.get("navigator_status", {}))
+    role      = bundle.role(profile.get("role", ""))
+
+    tasks_total   = len(role.tasks)
+    tasks_done    = sum(1 for t in role.tasks if checklist.get(t["ID"]))
+    courses_total = len(role.courses)
+    courses_done  = sum(1 for c in role.courses if navigator.get(c.id))
+    checklist_pct = tasks_done / tasks_total if tasks_total else 0.0
+    navigator_pct = courses_done / courses_total if courses_total else 0.0
+
+    row = {
+        "oid":                 str(doc["_id"]),
+        "email":               doc.get("azure_email", ""),
+        "name":                profile.get("name", ""),
+        "role":                profile.get("role", ""),
+        "role_key":            role.key,
+        "start_date":          str(profile.get("start_date", "")),
+        "buddy":               profile.get("buddy", ""),
+        "manager":             profile.get("manager", ""),
+        "provisioned_batch":   doc.get("provisioned", {}).get("batch", ""),
+        "signed_in":           not doc.get("pending_claim", False),
+        "wizard_done":         not doc.get("wizard_pending", False),
+        "last_updated":        str(doc.get("last_updated", "")),
+        "tasks_done":          tasks_done,
+        "tasks_total":         tasks_total,
+        "checklist_pct":       round(checklist_pct, 4),
+        "courses_done":        courses_done,
+        "courses_total":       courses_total,
+        "navigator_pct":       round(navigator_pct, 4),
+        "overall_pct":         round(0.5 * checklist_pct + 0.5 * navigator_pct, 4),
+        "session_completions": int(doc.get("badges", {}).get("session_completions", 0)),
+        "perfect_quiz":        bool(doc.get("quiz", {}).get("perfect_quiz", False)),
+    }
+    for t in tasks:
+        row[f"task::{t}"] = bool(checklist.get(t, False))
+    for c in courses:
+        row[f"course::{c}"] = bool(navigator.get(c, False))
+    return row
+
+
+def iter_rows(col, bundle, query: Optional[Dict] = None, batch_size: int = DEFAULT_BATCH_SIZE) -> Iterator[Dict]:
+    """One flattened row per document, fetched `batch_size` at a time."""
+    tasks, courses = item_columns(bundle)
+    cursor = col.find(query or {}, PROJECTION, batch_size=batch_size).sort("_id", 1)
+    try:
+        for doc in cursor:
+            yield flatten(doc, bundle, tasks, courses)
+    finally:
+        cursor.close()
+
+
+def _chunks(rows: Iterable[Dict], size: int) -> Iterator[List[Dict]]:
+    it = iter(rows)
+    while chunk := list(itertools.islice(it, size)):
+        yield chunk
+
+
+def write_csv(rows: Iterable[Dict], fh: IO[str], cols: List[Tuple[str, str]]) -> int:
+    writer = csv.DictWriter(fh, fieldnames=[name for name, _ in cols])
+    writer.writeheader()
+    n = 0
+    for row in rows:
+        writer.writerow(row)
+        n += 1
+    return n
+
+
+def arrow_schema(cols: List[Tuple[str, str]]):
+    types = {"string": pa.string(), "bool": pa.bool_(), "int": pa.int64(), "float": pa.float64()}
+    return pa.schema([(name, types[kind]) for name, kind in cols])
+
+
+def write_parquet(
+    rows: Iterable[Dict],
+    path_or_file: Any,
+    cols: List[Tuple[str, str]],
+    batch_size: int = DEFAULT_BATCH_SIZE,
+) -> int:
+    """One row group per chunk, so at most `batch_size` rows are ever materialised."""
+    if not HAS_PYARROW:
+        raise RuntimeError("Parquet export needs pyarrow. Run: pip install pyarrow")
+    schema = arrow_schema(cols)
+    n = 0
+    with pq.ParquetWriter(path_or_file, schema, compression="zstd") as writer:
+        for chunk in _chunks(rows, batch_size):
+            writer.write_batch(pa.RecordBatch.from_pylist(chunk, schema=schema))
+            n += len(chunk)
+    return n
+
+
+def export_filename(fmt: str) -> str:
+    return f"spae-onboarding-progress-{datetime.utcnow():%Y%m%d-%H%M}.{fmt}"
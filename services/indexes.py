@@ -0,0 +1,181 @@
+"""
+indexes.py — Index Registry & Query-Plan Checks for `users`
+============================================================
+Every index on the users collection is declared here, next to the query it
+serves, and nowhere else. The app ensures them once per process in a
+background thread (create_index is idempotent, so replicas starting together
+and restarts are harmless); tools that run without the app call
+`ensure_indexes` themselves.
+
+The queries the app and its background jobs run against `users` are listed
+in APP_QUERIES, built by the same functions the code uses, so they can't
+drift apart. `assert_indexed` explains one and fails if the winning plan
+scans the collection; `python -m tools.indexes --check` runs it for all of
+them against a MongoDB (a local one is enough — plans don't need data).
+
+Adding a query on users: add its builder to APP_QUERIES and, if --check
+reports a COLLSCAN, the index that serves it to USERS_INDEXES.
+"""
+
+import logging
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Mapping, Optional, Tuple
+
+from services import leaderboard, mentees, nudges, schema
+
+logger = logging.getLogger(__name__)
+
+RETRY_S = 30.0
+
+Keys = Tuple[Tuple[str, int], ...]
+
+
+@dataclass(frozen=True)
+class IndexSpec:
+    keys:    Keys
+    serves:  str
+    options: Mapping[str, Any] = field(default_factory=dict)
+
+    @property
+    def name(self) -> str:
+        """MongoDB's default name, so specs match indexes created before the registry existed."""
+        return "_".join(f"{k}_{d}" for k, d in self.keys)
+
+
+USERS_INDEXES: Tuple[IndexSpec, ...] = (
+    # mentees.py — inbox, newest hires first, and linking mentors on sign-in
+    IndexSpec((("mentors.manager", 1), ("profile.start_date", -1)), "mentor inbox (manager)"),
+    IndexSpec((("mentors.buddy", 1), ("profile.start_date", -1)),   "mentor inbox (buddy)"),
+    IndexSpec((("profile.manager_email", 1),),                     "link_mentor (manager)"),
+    IndexSpec((("profile.buddy_email", 1),),                       "link_mentor (buddy)"),
+    # provisioning.py — re-imports find hires who have claimed their document
+    IndexSpec((("azure_email", 1),),                               "provision re-import (by email)"),
+    # nudges.py — only users with an open deadline are in it
+    IndexSpec((("next_due", 1),), "overdue digests",
+              {"partialFilterExpression": {"next_due": {"$type": "string"}}}),
+    # leaderboard.py — only opted-in users are in it
+    IndexSpec((("cohort", 1), ("xp", -1)), "cohort leaderboard",
+              {"partialFilterExpression": {"leaderboard_opt_in": True}}),
+    # schema.py — the sweeper's outdated-documents query
+    IndexSpec(((schema.VERSION_FIELD, 1),), "schema sweep"),
+    # admin / analytics
+    IndexSpec((("profile.role", 1), ("profile.start_date", -1)), "hires by role, newest first"),
+    IndexSpec((("profile.start_date", -1),),                    "hires by start date (cohorts, exports)"),
+    IndexSpec((("profile.manager", 1),),                        "hires by manager name"),
+    IndexSpec((("last_updated", -1),),                          "recently active / changed since"),
+    IndexSpec((("summary.overall_pct", 1),),                    "hires furthest behind"),
+)
+
+
+# =============================================================================
+# ENSURING
+# =============================================================================
+
+def ensure_indexes(col, specs: Tuple[IndexSpec, ...] = USERS_INDEXES) -> Dict[str, str]:
+    """
+    Create every index in `specs` that is missing. One that conflicts with an
+    existing index of the same keys (different options) is reported, not
+    raised, so the rest still get built. Returns name → "ok" or the error.
+    """
+    result = {}
+    for spec in specs:
+        try:
+            col.create_index(list(spec.keys), **spec.options)
+            result[spec.name] = "ok"
+        except Exception as e:
+            result[spec.name] = f"{type(e).__name__}: {e}"
+            logger.warning("Index %s on %s not created — %s", spec.name, col.name, e)
+    return result
+
+
+def missing_indexes(col, specs: Tuple[IndexSpec, ...] = USERS_INDEXES) -> List[str]:
+    existing = col.index_information()
+    return [s.name for s in specs if s.name not in existing]
+
+
+def ensure_in_background(get_col: Callable[[], Any], specs: Tuple[IndexSpec, ...] = USERS_INDEXES,
+                         retry_s: float = RETRY_S) -> threading.Thread:
+    """Ensure `specs` off the request path, retrying until the database is reachable."""
+    def run() -> None:
+        while True:
+            try:
+                col = get_col()
+                if col is not None:
+                    result = ensure_indexes(col, specs)
+                    failed = [n for n, r in result.items() if r != "ok"]
+                    logger.info("users indexes ensured (%d/%d ok)", len(result) - len(failed), len(result))
+                    return
+            except Exception:
+                logger.exception("Ensuring users indexes failed")
+            time.sleep(retry_s)
+
+    thread = threading.Thread(target=run, name="spae-index-builder", daemon=True)
+    thread.start()
+    return thread
+
+
+# =============================================================================
+# QUERY PLANS
+# =============================================================================
+
+@dataclass(frozen=True)
+class QueryShape:
+    name:   str
+    filter: Mapping[str, Any]
+    sort:   Optional[List[Tuple[str, int]]] = None
+
+
+def app_queries() -> List[QueryShape]:
+    """Every query the app and its jobs run on `users`, with placeholder values."""
+    oid, email, day = "00000000-0000-0000-0000-000000000000", "someone@example.com", "2026-01-01"
+    return [
+        QueryShape("sign-in",                  {"_id": oid}),
+        QueryShape("claim provisioned",        {"_id": f"hr:{email}"}),
+        QueryShape("provision re-import",      {"$or": [{"_id": {"$in": [oid]}}, {"azure_email": {"$in": [email]}}]}),
+        QueryShape("mentor inbox",             mentees.inbox_query(oid), [("profile.start_date", -1)]),
+        QueryShape("link mentor (manager)",    mentees.link_query("manager", email, oid)),
+        QueryShape("link mentor (buddy)",      mentees.link_query("buddy", email, oid)),
+        QueryShape("overdue digests",          nudges.overdue_query(day)),
+        QueryShape("cohort leaderboard",       leaderboard.cohort_query(f"{day[:7]}:SPE"), [("xp", -1)]),
+        QueryShape("schema sweep",             schema.outdated_query(), [("_id", 1)]),
+        QueryShape("hires by role",            {"profile.role": "SPE"}, [("profile.start_date", -1)]),
+        QueryShape("hires by start date",      {"profile.start_date": {"$gte": day}}),
+        QueryShape("hires by manager",         {"profile.manager": "Line Manager"}),
+        QueryShape("recently active",          {"last_updated": {"$gte": day}}),
+        QueryShape("furthest behind",          {"summary.overall_pct": {"$lt": 0.25}}),
+    ]
+
+
+def plan_stages(plan: Mapping[str, Any]) -> List[str]:
+    """Every stage name in a winning plan, outermost first (classic and SBE explain output)."""
+    stages = [plan["stage"]] if "stage" in plan else []
+    for key in ("queryPlan", "inputStage"):
+        if key in plan:
+            stages += plan_stages(plan[key])
+    for child in plan.get("inputStages", []):
+        stages += plan_stages(child)
+    return stages
+
+
+def explain(col, shape: QueryShape) -> Dict[str, Any]:
+    cursor = col.find(shape.filter)
+    if shape.sort:
+        cursor = cursor.sort(shape.sort)
+    plan   = cursor.explain()["queryPlanner"]["winningPlan"]
+    stages = plan_stages(plan)
+    return {
+        "query":          shape.name,
+        "stages":         stages,
+        "indexed":        "COLLSCAN" not in stages,
+        "in_memory_sort": "SORT" in stages,
+    }
+
+
+def assert_indexed(col, shape: QueryShape) -> Dict[str, Any]:
+    """Explain `shape` and raise AssertionError if the winning plan scans the collection."""
+    result = explain(col, shape)
+    if not result["indexed"]:
+        raise AssertionError(f"{shape.name}: collection scan ({' → '.join(result['stages'])}) for {dict(shape.filter)}")
+    return result
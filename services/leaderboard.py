@@ -0,0 +1,134 @@
+"""
+leaderboard.py — Opt-In Cohort Leaderboard
+===========================================
+Ranks new hires who opted in against their cohort: same start month, same
+role (e.g. "2026-09:SE"). XP and level are derived fields written with every
+progress update (see derived_fields in services/schema.py), so nothing is recomputed per
+viewer.
+
+Each process keeps one sorted ranking per cohort it has served:
+  • the first request (and every `ttl_s` after) loads the cohort with one
+    indexed query — (cohort, xp) with a partial filter on opt-in;
+  • writes made by this process are applied straight away with insort, so
+    your own ticks show up in your rank immediately;
+  • top-N is a slice and "your rank" a bisect, O(log n) per lookup.
+
+Writes on other replicas appear after at most `ttl_s`.
+"""
+
+import bisect
+import threading
+import time
+from dataclasses import dataclass, field
+from datetime import date
+from typing import Any, Callable, Dict, Iterable, List, Mapping, Optional, Tuple
+
+DEFAULT_TTL_S = 60
+TASK_XP       = 20
+COURSE_XP     = 50
+
+PROJECTION = {"xp": 1, "level": 1, "profile.name": 1}
+
+
+def xp_and_level(tasks_done: int, tasks_total: int, courses_done: int, courses_total: int) -> Tuple[int, int, str]:
+    xp     = tasks_done * TASK_XP + courses_done * COURSE_XP
+    max_xp = tasks_total * TASK_XP + courses_total * COURSE_XP if tasks_total else 100
+    if xp == 0:              lvl = "Welcome Aboard 👋"
+    elif xp < max_xp * .30: lvl = "Rising Star ⭐"
+    elif xp < max_xp * .60: lvl = "Momentum Builder 🚀"
+    elif xp < max_xp * .85: lvl = "Process Pro 🧠"
+    elif xp < max_xp:        lvl = "Almost There 🔥"
+    else:                    lvl = "SPAE Champion 🏆"
+    return xp, max_xp, lvl
+
+
+def cohort_key(start_date: Any, role_key: str) -> Optional[str]:
+    if isinstance(start_date, str):
+        try:
+            start_date = date.fromisoformat(start_date)
+        except ValueError:
+            return None
+    if not isinstance(start_date, date):
+        return None
+    return f"{start_date:%Y-%m}:{role_key}"
+
+
+def cohort_query(cohort: str) -> Dict[str, Any]:
+    return {"cohort": cohort, "leaderboard_opt_in": True}
+
+
+def load_cohort(col, cohort: str) -> List[Dict[str, Any]]:
+    """Every opted-in member of one cohort, served by the partial (cohort, xp) index."""
+    return list(col.find(cohort_query(cohort), PROJECTION).sort("xp", -1))
+
+
+@dataclass
+class CohortRanking:
+    keys:      List[Tuple[int, str]] = field(default_factory=list)   # (-xp, oid), ascending
+    members:   Dict[str, Dict[str, Any]] = field(default_factory=dict)
+    loaded_at: float = 0.0
+
+    def put(self, oid: str, xp: int, name: str, level: str) -> None:
+        self.remove(oid)
+        bisect.insort(self.keys, (-xp, oid))
+        self.members[oid] = {"xp": xp, "name": name, "level": level}
+
+    def remove(self, oid: str) -> None:
+        old = self.members.pop(oid, None)
+        if old is not None:
+            i = bisect.bisect_left(self.keys, (-old["xp"], oid))
+            if i < len(self.keys) and self.keys[i] == (-old["xp"], oid):
+                del self.keys[i]
+
+    def rank(self, oid: str) -> Optional[int]:
+        """1-based; ties share the best rank."""
+        member = self.members.get(oid)
+        if member is None:
+            return None
+        return bisect.bisect_left(self.keys, (-member["xp"], "")) + 1
+
+    def top(self, n: int) -> List[Dict[str, Any]]:
+        out = []
+        for neg_xp, oid in self.keys[:n]:
+            out.append({"oid": oid, "rank": bisect.bisect_left(self.keys, (neg_xp, "")) + 1, **self.members[oid]})
+        return out
+
+
+class Leaderboard:
+    """Process-wide. `loader(cohort)` returns the cohort's documents (load_cohort)."""
+
+    def __init__(self, loader: Callable[[str], Iterable[Mapping[str, Any]]], ttl_s: float = DEFAULT_TTL_S):
+        self._loader  = loader
+        self.ttl_s    = ttl_s
+        self._cohorts: Dict[str, CohortRanking] = {}
+        self._lock    = threading.Lock()
+
+    def _ranking(self, cohort: str) -> CohortRanking:
+        with self._lock:
+            ranking = self._cohorts.get(cohort)
+            if ranking is not None and time.monotonic() - ranking.loaded_at < self.ttl_s:
+                return ranking
+        fresh = CohortRanking(loaded_at=time.monotonic())
+        for doc in self._loader(cohort):
+            fresh.put(
+                str(doc["_id"]), int(doc.get("xp", 0)),
+                doc.get("profile", {}).get("name", ""), doc.get("level", ""),
+            )
+        with self._lock:
+            self._cohorts[cohort] = fresh
+        return fresh
+
+    def update(self, oid: str, cohort: Optional[str], xp: int, name: str, level: str, opt_in: bool) -> None:
+        """Apply this process's own write to the cached rankings (no query)."""
+        with self._lock:
+            for key, ranking in self._cohorts.items():
+                if key != cohort or not opt_in:
+                    ranking.remove(oid)
+            if cohort and opt_in and cohort in self._cohorts:
+                self._cohorts[cohort].put(oid, xp, name, level)
+
+    def standings(self, cohort: str, oid: str, n: int = 10) -> Tuple[List[Dict[str, Any]], Optional[int], int]:
+        """(top n, your rank or None, cohort size)."""
+        ranking = self._ranking(cohort)
+        with self._lock:
+            return ranking.top(n), ranking.rank(oid), len(ranking.keys)
@@ -0,0 +1,333 @@
+"""
+live.py — Live Updates Across Sessions
+=======================================
+One listener per process watches the users collection and hands each
+change to the in-process sessions that care about that user: the user's
+own other tabs and devices, and mentors whose inbox lists them. Sessions
+never query for this themselves — at the top of every rerun the app drains
+its mailbox and applies what is there to the session's cached state.
+
+  • MongoDB replica sets (Atlas included): a change stream, resumed from its
+    last token after a dropped connection;
+  • anything else — a standalone mongod, the SQLite backend, mongomock — is
+    polled: one `{_id: {$in: subscribed}}` query per interval for the whole
+    process, comparing `last_updated`, then one read of the documents that
+    changed.
+
+A mailbox keeps at most one pending Change per user, with later changes
+merged into it, so a session that hasn't rerun in a while holds one small
+entry per user it watches, not a backlog. Sessions that stop subscribing
+(closed tabs) are dropped after `session_ttl_s`.
+
+Writes are tagged with the session that made them (`last_session`), and a
+session is never sent the deltas of its own saves — an old echo arriving
+after a newer click would otherwise undo it. Whole documents (polling)
+reach every session; the app drops one older than its own last save. If
+the stream had to restart without its resume point, every subscriber is
+told to reload from the database instead.
+
+    [live]                 # optional
+    enabled         = true
+    mode            = "auto"     # "stream" | "poll" | "auto" (stream, else poll)
+    poll_interval_s = 5
+"""
+
+import logging
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+SESSION_FIELD      = "last_session"
+MODES              = ("auto", "stream", "poll")
+POLL_INTERVAL_S    = 5.0
+MAX_AWAIT_MS       = 1000
+RETRY_S            = 10.0
+SESSION_TTL_S      = 3600.0
+POLL_BATCH         = 1000
+
+# Server errors meaning "no change streams here": not a replica set, or not supported
+NO_CHANGE_STREAMS  = {40573, 40324, 115}
+HISTORY_LOST       = 286
+
+
+@dataclass
+class Change:
+    """What changed in one user document since the session last drained."""
+    oid:     str
+    updated: Dict[str, Any] = field(default_factory=dict)  # dotted path → new value
+    removed: Set[str]       = field(default_factory=set)
+    doc:     Optional[Dict[str, Any]] = None               # whole document (replace / poll)
+    reload:  bool = False                                  # changes were missed: read it again
+    session: str = ""                                      # session that wrote it, if tagged
+
+    def merge(self, later: "Change") -> "Change":
+        if later.reload or self.reload:
+            return Change(self.oid, reload=True)
+        if later.doc is not None:
+            return later
+        if self.doc is not None:
+            doc = dict(self.doc)
+            for path in later.removed:
+                _unset(doc, path)
+            for path, value in later.updated.items():
+                _set(doc, path, value)
+            return Change(self.oid, doc=doc, session=later.session)
+        touched = (*later.updated, *later.removed)
+        updated = {p: v for p, v in self.updated.items() if not _covered(p, touched)}
+        removed = {p for p in self.removed if not _covered(p, touched)} | later.removed
+        updated.update(later.updated)
+        return Change(self.oid, updated=updated, removed=removed, session=later.session)
+
+
+def _covered(path: str, by: Iterable[str]) -> bool:
+    """True if writing any of `by` replaces `path` (the same field or one of its parents)."""
+    return any(path == p or path.startswith(p + ".") for p in by)
+
+
+def _set(doc: Dict[str, Any], path: str, value: Any) -> None:
+    *parents, last = path.split(".")
+    for part in parents:
+        doc[part] = dict(doc.get(part) or {})
+        doc = doc[part]
+    doc[last] = value
+
+
+def _unset(doc: Dict[str, Any], path: str) -> None:
+    *parents, last = path.split(".")
+    for part in parents:
+        if not isinstance(doc.get(part), dict):
+            return
+        doc[part] = dict(doc[part])
+        doc = doc[part]
+    doc.pop(last, None)
+
+
+def change_from_event(event: Dict[str, Any]) -> Optional[Change]:
+    """A Change from one change-stream event on users, or None if it isn't about a document."""
+    key = event.get("documentKey", {}).get("_id")
+    if key is None:
+        return None
+    op = event.get("operationType")
+    if op == "update":
+        desc = event.get("updateDescription", {})
+        updated = dict(desc.get("updatedFields", {}))
+        return Change(str(key), updated=updated, removed=set(desc.get("removedFields", [])),
+                      session=updated.get(SESSION_FIELD, ""))
+    if op in ("insert", "replace") and event.get("fullDocument") is not None:
+        doc = event["fullDocument"]
+        return Change(str(key), doc=doc, session=doc.get(SESSION_FIELD, ""))
+    return Change(str(key), reload=True)
+
+
+@dataclass
+class _Subscriber:
+    scopes:    Dict[str, Set[str]] = field(default_factory=dict)   # scope → oids
+    mailbox:   Dict[str, Change]   = field(default_factory=dict)
+    last_seen: float = 0.0
+
+    def oids(self) -> Set[str]:
+        return set().union(*self.scopes.values()) if self.scopes else set()
+
+
+class LiveUpdates:
+    """Process-wide change listener with per-session mailboxes."""
+
+    def __init__(
+        self,
+        get_db: Callable[[], Any],
+        collection: str = "users",
+        mode: str = "auto",
+        poll_interval_s: float = POLL_INTERVAL_S,
+        session_ttl_s: float = SESSION_TTL_S,
+        max_await_ms: int = MAX_AWAIT_MS,
+    ):
+        if mode not in MODES:
+            raise ValueError(f"[live] mode must be one of {', '.join(MODES)}, got {mode!r}")
+        self._get_db        = get_db
+        self.collection     = collection
+        self.mode           = mode
+        self.poll_interval  = poll_interval_s
+        self.session_ttl    = session_ttl_s
+        self.max_await_ms   = max_await_ms
+        self.source         = "idle"                 # "stream" | "poll" once running
+        self._subs: Dict[str, _Subscriber] = {}
+        self._by_oid: Dict[str, Set[str]]  = {}      # oid → session ids
+        self._versions: Dict[str, Any]     = {}      # poll: oid → last_updated seen
+        self._resume_token: Any            = None
+        self._lock   = threading.Lock()
+        self._stop   = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.counts  = {"events": 0, "delivered": 0, "polls": 0, "restarts": 0, "failures": 0}
+
+    # ── Called from script threads ───────────────────────────────────────────
+    def subscribe(self, session_id: str, oids: Iterable[str], scope: str = "self") -> None:
+        """Route changes to these users to this session (replacing its previous `scope` list)."""
+        wanted = {o for o in oids if o}
+        with self._lock:
+            sub = self._subs.setdefault(session_id, _Subscriber())
+            sub.last_seen = time.monotonic()
+            if sub.scopes.get(scope) == wanted:
+                return
+            before = sub.oids()
+            sub.scopes[scope] = wanted
+            self._reindex(session_id, before, sub.oids())
+
+    def unsubscribe(self, session_id: str) -> None:
+        with self._lock:
+            sub = self._subs.pop(session_id, None)
+            if sub is not None:
+                self._reindex(session_id, sub.oids(), set())
+
+    def drain(self, session_id: str) -> Dict[str, Change]:
+        """Everything that changed for this session's users since its last drain."""
+        with self._lock:
+            sub = self._subs.get(session_id)
+            if sub is None or not sub.mailbox:
+                return {}
+            sub.last_seen = time.monotonic()
+            mailbox, sub.mailbox = sub.mailbox, {}
+            return mailbox
+
+    # ── Routing ──────────────────────────────────────────────────────────────
+    def _reindex(self, session_id: str, before: Set[str], after: Set[str]) -> None:
+        for oid in before - after:
+            sessions = self._by_oid.get(oid)
+            if sessions is not None:
+                sessions.discard(session_id)
+                if not sessions:
+                    del self._by_oid[oid]
+                    self._versions.pop(oid, None)
+        for oid in after - before:
+            self._by_oid.setdefault(oid, set()).add(session_id)
+
+    def publish(self, change: Change) -> int:
+        """Put `change` in the mailbox of every session watching its user. Returns sessions notified."""
+        with self._lock:
+            sessions = self._by_oid.get(change.oid, ())
+            for sid in sessions:
+                if change.session == sid and change.doc is None and not change.reload:
+                    continue                             # its own save coming back
+                box = self._subs[sid].mailbox
+                box[change.oid] = box[change.oid].merge(change) if change.oid in box else change
+            self.counts["events"]    += 1
+            self.counts["delivered"] += len(sessions)
+            return len(sessions)
+
+    def reload_all(self) -> None:
+        """Changes may have been missed: every subscriber re-reads its users."""
+        with self._lock:
+            oids = list(self._by_oid)
+        for oid in oids:
+            self.publish(Change(oid, reload=True))
+
+    def subscribed(self) -> List[str]:
+        with self._lock:
+            return list(self._by_oid)
+
+    def prune(self) -> int:
+        """Forget sessions that haven't subscribed or drained for `session_ttl_s` (closed tabs)."""
+        cutoff = time.monotonic() - self.session_ttl
+        with self._lock:
+            stale = [sid for sid, sub in self._subs.items() if sub.last_seen < cutoff]
+        for sid in stale:
+            self.unsubscribe(sid)
+        return len(stale)
+
+    # ── Sources ──────────────────────────────────────────────────────────────
+    def _collection(self):
+        db = self._get_db()
+        return None if db is None else db[self.collection]
+
+    def watch(self, col) -> None:
+        """Follow the change stream until it fails or stop() is called."""
+        pipeline = [{"$match": {"operationType": {"$in": ["insert", "update", "replace", "delete"]}}}]
+        try:
+            stream = col.watch(pipeline, resume_after=self._resume_token, max_await_time_ms=self.max_await_ms)
+        except TypeError as e:                       # a stand-in whose "watch" is just a sub-collection
+            raise NotImplementedError(f"{type(col).__name__}.watch is not supported") from e
+        with stream:
+            self.source = "stream"
+            while not self._stop.is_set():
+                event = stream.try_next()
+                self._resume_token = stream.resume_token
+                if event is None:
+                    self.prune()
+                    continue
+                change = change_from_event(event)
+                if change is not None:
+                    self.publish(change)
+
+    def poll_once(self, col) -> int:
+        """One poll for the whole process. Returns users that changed."""
+        oids = self.subscribed()
+        self.counts["polls"] += 1
+        seen: Dict[str, Any] = {}
+        for i in range(0, len(oids), POLL_BATCH):
+            for doc in col.find({"_id": {"$in": oids[i:i + POLL_BATCH]}}, {"last_updated": 1}):
+                seen[doc["_id"]] = doc.get("last_updated")
+        with self._lock:
+            changed = [oid for oid, version in seen.items()
+                       if oid in self._versions and self._versions[oid] != version]
+            self._versions.update(seen)
+        for i in range(0, len(changed), POLL_BATCH):
+            for doc in col.find({"_id": {"$in": changed[i:i + POLL_BATCH]}}):
+                self.publish(Change(doc["_id"], doc=doc, session=doc.get(SESSION_FIELD, "")))
+        return len(changed)
+
+    def _stream_unavailable(self, e: Exception) -> bool:
+        return isinstance(e, NotImplementedError) or getattr(e, "code", None) in NO_CHANGE_STREAMS
+
+    def _run(self) -> None:
+        use_stream = self.mode in ("auto", "stream")
+        while not self._stop.is_set():
+            try:
+                col = self._collection()
+                if col is None:
+                    self._stop.wait(RETRY_S)
+                    continue
+                if use_stream and not hasattr(col, "watch"):
+                    raise NotImplementedError(f"{type(col).__name__} has no change streams")
+                if use_stream:
+                    self.watch(col)
+                    continue
+                self.source = "poll"
+                self.poll_once(col)
+                self.prune()
+                self._stop.wait(self.poll_interval)
+            except Exception as e:
+                if use_stream and self._stream_unavailable(e):
+                    if self.mode == "stream":
+                        logger.error("[live] mode = \"stream\" but change streams are unavailable — %s", e)
+                        return
+                    logger.info("No change streams on this database (%s) — polling every %gs", e, self.poll_interval)
+                    use_stream = False
+                    continue
+                self.counts["failures"] += 1
+                if getattr(e, "code", None) == HISTORY_LOST or (use_stream and self._resume_token is None):
+                    self._resume_token = None
+                    self.counts["restarts"] += 1
+                    self.reload_all()
+                logger.warning("Live updates interrupted, retrying in %gs — %s", RETRY_S, e)
+                self._stop.wait(RETRY_S)
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._run, name="spae-live-updates", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                **self.counts,
+                "source":   self.source,
+                "sessions": len(self._subs),
+                "users":    len(self._by_oid),
+                "pending":  sum(len(s.mailbox) for s in self._subs.values()),
+            }
@@ -0,0 +1,118 @@
+"""
+mentees.py — Mentor / Buddy Inbox
+==================================
+Lets a manager or buddy see the new hires they look after. Hires name their
+mentors by email (wizard or HR import); the first time a mentor signs in,
+`link_mentor` stamps their Azure object ID into `mentors.manager` /
+`mentors.buddy` on every hire that names them, so from then on "my mentees"
+is one indexed query by oid (indexes: services/indexes.py).
+
+The inbox never loads full mentee documents. Every progress write also
+stores a small `summary` (counts, next tasks, open access requests with their
+deadlines — see progress_summary), and the query projects only that and a
+few profile fields.
+"""
+
+from datetime import date
+from typing import Any, Dict, Iterable, List, Mapping, Optional
+
+from services.nudges import parse_start, task_due
+
+RELATIONS       = ("manager", "buddy")
+NEXT_TASKS      = 3
+ACCESS_CATEGORY = "Access"
+DEFAULT_LIMIT   = 200
+
+PROJECTION = {
+    "azure_email":        1,
+    "profile.name":       1,
+    "profile.role":       1,
+    "profile.start_date": 1,
+    "mentors":            1,
+    "summary":            1,
+}
+
+
+def progress_summary(
+    bundle,
+    role_label: str,
+    start_date: Any,
+    task_status: Mapping[str, bool],
+    navigator_status: Mapping[str, bool],
+) -> Dict[str, Any]:
+    """The precomputed fields the inbox shows, stored on the user document with each write."""
+    role    = bundle.role(role_label)
+    start   = parse_start(start_date)
+    open_t  = [t for t in role.tasks if not task_status.get(t["ID"], False)]
+    tasks_done   = len(role.tasks) - len(open_t)
+    courses_done = sum(1 for c in role.courses if navigator_status.get(c.id, False))
+    checklist_p  = tasks_done / len(role.tasks) if role.tasks else 0.0
+    navigator_p  = courses_done / len(role.courses) if role.courses else 0.0
+    access = []
+    for t in open_t:
+        if t.get("Category") == ACCESS_CATEGORY:
+            due = task_due(start, t) if start else None
+            access.append({"task": t["Task"], "due": due.isoformat() if due else None})
+    return {
+        "tasks_done":    tasks_done,
+        "tasks_total":   len(role.tasks),
+        "courses_done":  courses_done,
+        "courses_total": len(role.courses),
+        "overall_pct":   round(0.5 * checklist_p + 0.5 * navigator_p, 4),
+        "next_tasks":    [t["Task"] for t in open_t[:NEXT_TASKS]],
+        "open_access":   access,
+    }
+
+
+def link_query(relation: str, email: str, oid: str) -> Dict[str, Any]:
+    return {f"profile.{relation}_email": email, f"mentors.{relation}": {"$ne": oid}}
+
+
+def inbox_query(oid: str) -> Dict[str, Any]:
+    return {"$or": [{f"mentors.{r}": oid} for r in RELATIONS]}
+
+
+def link_mentor(col, oid: str, email: str) -> int:
+    """Stamp this mentor's oid on every hire that names their email. Returns hires newly linked."""
+    if not oid or not email:
+        return 0
+    email  = email.lower()
+    linked = 0
+    for relation in RELATIONS:
+        result = col.update_many(link_query(relation, email, oid), {"$set": {f"mentors.{relation}": oid}})
+        linked += result.modified_count
+    return linked
+
+
+def find_mentees(col, oid: str, limit: int = DEFAULT_LIMIT) -> List[Dict[str, Any]]:
+    """Everyone this oid is manager or buddy for — projected summaries only."""
+    cursor = col.find(inbox_query(oid), PROJECTION).sort("profile.start_date", -1).limit(limit)
+    return list(cursor)
+
+
+def blocked_access(summary: Mapping[str, Any], today: Optional[date] = None) -> List[str]:
+    """Open access requests past their deadline."""
+    today = (today or date.today()).isoformat()
+    return [a["task"] for a in summary.get("open_access", []) if a.get("due") and a["due"] < today]
+
+
+def inbox_rows(mentees: Iterable[Mapping[str, Any]], oid: str, bundle, today: Optional[date] = None) -> List[Dict]:
+    today = today or date.today()
+    rows  = []
+    for doc in mentees:
+        profile = doc.get("profile", {})
+        summary = doc.get("summary", {})
+        start   = parse_start(profile.get("start_date"))
+        mentors = doc.get("mentors", {})
+        rows.append({
+            "Name":     profile.get("name") or doc.get("azure_email", ""),
+            "Role":     bundle.role(profile.get("role", "")).key,
+            "You are":  " & ".join(r.title() for r in RELATIONS if mentors.get(r) == oid),
+            "Day":      (today - start).days if start else None,
+            "Overall":  round(summary.get("overall_pct", 0.0) * 100),
+            "Tasks":    f"{summary.get('tasks_done', 0)}/{summary.get('tasks_total', 0)}",
+            "Training": f"{summary.get('courses_done', 0)}/{summary.get('courses_total', 0)}",
+            "Next":     ", ".join(summary.get("next_tasks", [])),
+            "Blocked":  ", ".join(blocked_access(summary, today)),
+        })
+    return rows
@@ -0,0 +1,360 @@
+"""
+nudges.py — Overdue-Task Digests for Managers and Buddies
+==========================================================
+Once a day, every manager and buddy with a new hire who has fallen behind
+gets one email listing those hires and their overdue tasks. A task is overdue
+once its phase's deadline (PHASE_DUE_DAYS, counted from the start date) has
+passed and it isn't ticked.
+
+Finding them never scans the users collection: each user document carries
+`next_due` — the earliest deadline among their open tasks, or null when
+nothing is left — kept up to date by the app on every write. A partial index
+on it (services/indexes.py) answers "who is overdue today" directly.
+
+Delivery is idempotent and resumable. Each (day, recipient) digest is claimed
+in the `nudges` ledger with a unique _id before it is sent and marked sent
+afterwards, so a second run — another replica, a retry after a crash — skips
+what already went out; claims that never completed are retried after
+`CLAIM_LEASE_S`. Sends are rate-limited to `max_per_minute`.
+
+Sinks are pluggable (anything with `send(to, subject, body)`): FileSink
+writes .eml files for local testing, SMTPSink talks to a real relay.
+
+    [nudges]                 # optional — off unless enabled
+    enabled        = true
+    send_hour      = 8                 # UTC; digests go out on the first check after this
+    sink           = "file"            # or "smtp"
+    outbox_dir     = ".cache/outbox"
+    smtp_host      = "smtp.example.com"
+    smtp_port      = 587
+    smtp_user      = ""
+    smtp_password  = ""
+    sender         = "onboarding@example.com"
+    max_per_minute = 30
+    app_url        = "https://spaeonboardingtool.azurewebsites.net/"
+"""
+
+import logging
+import os
+import smtplib
+import threading
+import time
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta, timezone
+from email.message import EmailMessage
+from typing import Any, Callable, Dict, Iterable, List, Mapping, Optional, Protocol
+
+logger = logging.getLogger(__name__)
+
+PHASE_DUE_DAYS: Dict[str, int] = {
+    "Day 1":   1,
+    "Week 1":  7,
+    "Month 1": 30,
+    "Month 2": 60,
+    "Month 3": 90,
+}
+
+LEDGER_COLLECTION  = "nudges"
+CLAIM_LEASE_S      = 600
+DEFAULT_PER_MINUTE = 30
+DEFAULT_SEND_HOUR  = 8
+CHECK_INTERVAL_S   = 900
+MAX_TASKS_LISTED   = 5
+
+# Only what a digest needs from each overdue user
+PROJECTION = {"azure_email": 1, "profile": 1, "checklist": 1, "next_due": 1}
+
+
+# =============================================================================
+# DUE DATES
+# =============================================================================
+
+def parse_start(value: Any) -> Optional[date]:
+    if isinstance(value, date):
+        return value
+    try:
+        return date.fromisoformat(str(value))
+    except ValueError:
+        return None
+
+
+def task_due(start: date, task: Mapping) -> Optional[date]:
+    days = PHASE_DUE_DAYS.get(task.get("Phase", ""))
+    return None if days is None else start + timedelta(days=days)
+
+
+def next_due(start_date: Any, tasks: Iterable[Mapping], status: Mapping[str, bool]) -> Optional[str]:
+    """Earliest deadline among the open tasks, as an ISO date — None once all are done."""
+    start = parse_start(start_date)
+    if start is None:
+        return None
+    dues = [
+        d for t in tasks
+        if not status.get(t["ID"], False) and (d := task_due(start, t)) is not None
+    ]
+    return min(dues).isoformat() if dues else None
+
+
+def overdue_tasks(doc: Mapping, bundle, today: date) -> List[Dict[str, Any]]:
+    profile = doc.get("profile", {})
+    start   = parse_start(profile.get("start_date"))
+    if start is None:
+        return []
+    status  = bundle.remap_tasks(doc.get("checklist", {}))
+    overdue = []
+    for t in bundle.checklist(profile.get("role", "")):
+        due = task_due(start, t)
+        if due is not None and due < today and not status.get(t["ID"], False):
+            overdue.append({"task": t["Task"], "phase": t["Phase"], "days_late": (today - due).days})
+    return overdue
+
+
+def overdue_query(today: str) -> Dict[str, Any]:
+    # $type repeats the partial index's filter — without it the planner can't use the index
+    return {"next_due": {"$type": "string", "$lt": today}}
+
+
+# =============================================================================
+# DIGESTS
+# =============================================================================
+
+@dataclass
+class Digest:
+    recipient: str                          # email, lower-cased
+    name:      str
+    relation:  str                          # "manager" | "buddy"
+    hires:     List[Dict[str, Any]] = field(default_factory=list)
+
+    def subject(self) -> str:
+        n = len(self.hires)
+        return f"SPAE onboarding: {n} new hire{'s' if n != 1 else ''} with overdue tasks"
+
+    def body(self, app_url: str = "") -> str:
+        lines = [f"Hi {self.name or 'there'},", "",
+                 f"These new hires you're the {self.relation} for have onboarding tasks past their deadline:", ""]
+        for hire in self.hires:
+            lines.append(f"• {hire['name']} ({hire['role']}, day {hire['day']}) — {len(hire['overdue'])} overdue")
+            for t in hire["overdue"][:MAX_TASKS_LISTED]:
+                lines.append(f"    - {t['task']} [{t['phase']}, {t['days_late']} day(s) late]")
+            if len(hire["overdue"]) > MAX_TASKS_LISTED:
+                lines.append(f"    … and {len(hire['overdue']) - MAX_TASKS_LISTED} more")
+        lines += ["", "A quick check-in usually unblocks these."]
+        if app_url:
+            lines.append(f"Open the hub: {app_url}")
+        return "\n".join(lines) + "\n"
+
+
+def build_digests(col, bundle, today: date, batch_size: int = 500) -> Dict[str, Digest]:
+    """One digest per manager/buddy email, from the indexed overdue query."""
+    digests: Dict[str, Digest] = {}
+    cursor = col.find(overdue_query(today.isoformat()), PROJECTION, batch_size=batch_size)
+    for doc in cursor:
+        overdue = overdue_tasks(doc, bundle, today)
+        if not overdue:
+            continue
+        profile = doc.get("profile", {})
+        start   = parse_start(profile.get("start_date")) or today
+        hire    = {
+            "name":    profile.get("name") or doc.get("azure_email", ""),
+            "role":    bundle.role(profile.get("role", "")).key,
+            "day":     (today - start).days,
+            "overdue": overdue,
+        }
+        for relation in ("manager", "buddy"):
+            email = (profile.get(f"{relation}_email") or "").lower()
+            if not email:
+                continue
+            digest = digests.setdefault(email, Digest(email, profile.get(relation, ""), relation))
+            digest.hires.append(hire)
+    return digests
+
+
+# =============================================================================
+# SINKS
+# =============================================================================
+
+class DigestSink(Protocol):
+    def send(self, to: str, subject: str, body: str) -> None: ...
+
+
+def _message(sender: str, to: str, subject: str, body: str) -> EmailMessage:
+    msg = EmailMessage()
+    msg["From"], msg["To"], msg["Subject"] = sender, to, subject
+    msg.set_content(body)
+    return msg
+
+
+class FileSink:
+    """Writes each digest as an .eml file — the local stand-in for SMTP."""
+
+    def __init__(self, directory: str, sender: str = "onboarding@localhost"):
+        self.directory = directory
+        self.sender    = sender
+        os.makedirs(directory, exist_ok=True)
+
+    def send(self, to: str, subject: str, body: str) -> None:
+        name = f"{datetime.utcnow():%Y%m%dT%H%M%S%f}-{to.replace('@', '_at_')}.eml"
+        with open(os.path.join(self.directory, name), "wb") as fh:
+            fh.write(bytes(_message(self.sender, to, subject, body)))
+
+
+class SMTPSink:
+    def __init__(self, host: str, port: int = 587, user: str = "", password: str = "",
+                 sender: str = "onboarding@localhost", starttls: bool = True):
+        self.host, self.port, self.user, self.password = host, port, user, password
+        self.sender, self.starttls = sender, starttls
+
+    def send(self, to: str, subject: str, body: str) -> None:
+        with smtplib.SMTP(self.host, self.port, timeout=30) as smtp:
+            if self.starttls:
+                smtp.starttls()
+            if self.user:
+                smtp.login(self.user, self.password)
+            smtp.send_message(_message(self.sender, to, subject, body))
+
+
+def sink_from_config(cfg: Mapping[str, Any]) -> DigestSink:
+    sender = cfg.get("sender", "onboarding@localhost")
+    if cfg.get("sink", "file") == "smtp":
+        return SMTPSink(
+            host=cfg["smtp_host"],
+            port=int(cfg.get("smtp_port", 587)),
+            user=cfg.get("smtp_user", ""),
+            password=cfg.get("smtp_password", ""),
+            sender=sender,
+            starttls=bool(cfg.get("starttls", True)),
+        )
+    return FileSink(cfg.get("outbox_dir", os.path.join(".cache", "outbox")), sender)
+
+
+# =============================================================================
+# DELIVERY
+# =============================================================================
+
+class RateLimiter:
+    """At most `per_minute` calls per minute, evenly spaced."""
+
+    def __init__(self, per_minute: int, sleep: Callable[[float], None] = time.sleep):
+        self.interval = 60.0 / per_minute if per_minute > 0 else 0.0
+        self._next    = 0.0
+        self._sleep   = sleep
+
+    def wait(self) -> None:
+        now = time.monotonic()
+        if now < self._next:
+            self._sleep(self._next - now)
+            now = self._next
+        self._next = now + self.interval
+
+
+def _claim(ledger, key: str, digest: Digest) -> bool:
+    """Take the (day, recipient) slot; False if it was sent or another run holds it."""
+    from pymongo.errors import DuplicateKeyError
+    now = datetime.now(timezone.utc)
+    try:
+        ledger.insert_one({"_id": key, "status": "claimed", "claimed_at": now,
+                           "recipient": digest.recipient, "hires": len(digest.hires)})
+        return True
+    except DuplicateKeyError:
+        # A claim that never completed (crash mid-send) can be retaken after the lease
+        stale = ledger.find_one_and_update(
+            {"_id": key, "status": "claimed", "claimed_at": {"$lt": now - timedelta(seconds=CLAIM_LEASE_S)}},
+            {"$set": {"claimed_at": now}},
+        )
+        return stale is not None
+
+
+def send_digests(
+    db,
+    bundle,
+    sink: DigestSink,
+    today: Optional[date] = None,
+    per_minute: int = DEFAULT_PER_MINUTE,
+    app_url: str = "",
+    dry_run: bool = False,
+    users: str = "users",
+    ledger: str = LEDGER_COLLECTION,
+) -> Dict[str, int]:
+    """Send today's digests that haven't gone out yet. Returns counts for logging."""
+    today   = today or datetime.now(timezone.utc).date()
+    digests = build_digests(db[users], bundle, today)
+    counts  = {"recipients": len(digests), "sent": 0, "skipped": 0, "failed": 0}
+    if dry_run:
+        return counts
+
+    col     = db[ledger]
+    limiter = RateLimiter(per_minute)
+    for recipient, digest in sorted(digests.items()):
+        key = f"{today.isoformat()}:{recipient}"
+        if not _claim(col, key, digest):
+            counts["skipped"] += 1
+            continue
+        limiter.wait()
+        try:
+            sink.send(recipient, digest.subject(), digest.body(app_url))
+        except Exception as e:
+            col.delete_one({"_id": key})           # let the next run try again
+            counts["failed"] += 1
+            logger.warning("Nudge digest to %s failed — %s", recipient, e)
+            continue
+        col.update_one({"_id": key}, {"$set": {"status": "sent", "sent_at": datetime.now(timezone.utc)}})
+        counts["sent"] += 1
+    return counts
+
+
+class NudgeScheduler:
+    """
+    Background thread: one send_digests pass per day after `send_hour` (UTC),
+    repeated every check while any send failed that day.
+    """
+
+    def __init__(
+        self,
+        get_db: Callable[[], Any],
+        get_bundle: Callable[[], Any],
+        sink: DigestSink,
+        send_hour: int = DEFAULT_SEND_HOUR,
+        per_minute: int = DEFAULT_PER_MINUTE,
+        app_url: str = "",
+        check_interval_s: float = CHECK_INTERVAL_S,
+    ):
+        self._get_db        = get_db
+        self._get_bundle    = get_bundle
+        self.sink           = sink
+        self.send_hour      = send_hour
+        self.per_minute     = per_minute
+        self.app_url        = app_url
+        self.check_interval = check_interval_s
+        self.last_run: Optional[date] = None
+        self.last_counts: Dict[str, int] = {}
+        self._thread: Optional[threading.Thread] = None
+
+    def run_once(self) -> None:
+        now = datetime.now(timezone.utc)
+        if now.hour < self.send_hour or self.last_run == now.date():
+            return
+        db = self._get_db()
+        if db is None:
+            return
+        self.last_counts = send_digests(
+            db, self._get_bundle(), self.sink, now.date(), self.per_minute, self.app_url,
+        )
+        # Failed sends were released from the ledger; keep retrying them today
+        if self.last_counts["failed"] == 0:
+            self.last_run = now.date()
+        logger.info("Nudge digests for %s: %s", now.date(), self.last_counts)
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+
+        def loop() -> None:
+            while True:
+                try:
+                    self.run_once()
+                except Exception:
+                    logger.exception("Nudge scheduler failed")
+                time.sleep(self.check_interval)
+
+        self._thread = threading.Thread(target=loop, name="spae-nudge-scheduler", daemon=True)
+        self._thread.start()
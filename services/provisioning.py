@@ -0,0 +1,210 @@
+"""
+provisioning.py — Pre-provisioned New Hires from HR Exports
+============================================================
+Turns rows of an HR export (CSV or Excel) into user documents the app can
+pick up on the new hire's first sign-in, so HR-known facts — role, start
+date, buddy, manager — are never typed by hand. `python -m tools.provision`
+does the file reading and MongoDB writes; this module only parses, validates
+and builds the upserts, one row at a time.
+
+Documents are keyed like the app's own: by Azure object ID when the export
+has one, otherwise by "hr:<email>" until the user signs in and the app claims
+the document for their object ID (see claim_provisioned_user in app.py).
+A hire who already has a document — claimed since the last import — is
+matched by email and updated in place (`target_id`), never duplicated.
+
+Only profile fields present in the row are written, and progress is never
+touched, so importing the same file twice — or a corrected one — is safe.
+The fields derived from profile + progress (next_due, summary, cohort, …)
+are recomputed on every import, so a corrected start date or role shows up
+everywhere. The wizard then only asks for what HR didn't provide
+(`provisioned.fields`).
+"""
+
+import re
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, List, Mapping, Optional, Tuple
+
+PENDING_PREFIX = "hr:"
+
+# Accepted header spellings (lower-cased, spaces/underscores/dashes ignored)
+COLUMN_ALIASES: Dict[str, Tuple[str, ...]] = {
+    "email":         ("email", "workemail", "mail", "emailaddress", "userprincipalname", "upn"),
+    "oid":           ("oid", "objectid", "azureoid", "azureobjectid", "entraid"),
+    "name":          ("preferredname", "preferredfirstname", "firstname", "givenname", "name"),
+    "role":          ("role", "jobrole", "position", "jobtitle"),
+    "start_date":    ("startdate", "hiredate", "start", "firstday"),
+    "buddy":         ("buddy", "buddyname"),
+    "buddy_email":   ("buddyemail",),
+    "manager":       ("manager", "managername", "linemanager"),
+    "manager_email": ("manageremail", "linemanageremail"),
+}
+
+# Profile fields the wizard can skip when HR provided them
+PROFILE_FIELDS = ("name", "role", "start_date", "buddy", "manager")
+
+DATE_FORMATS = ("%Y-%m-%d", "%d/%m/%Y", "%d.%m.%Y", "%m/%d/%Y", "%Y/%m/%d", "%d-%b-%Y")
+EMAIL_RE     = re.compile(r"^[^@\s]+@[^@\s]+\.[^@\s]+$")
+
+# What re-imports read from existing documents: the profile and progress derived fields come from
+EXISTING_PROJECTION = {"azure_email": 1, "profile": 1, "checklist": 1, "navigator_status": 1}
+
+
+class RowError(ValueError):
+    """A row that can't be provisioned. The message says which field and why."""
+
+
+def _norm(header: str) -> str:
+    return re.sub(r"[\s_\-]", "", str(header or "")).lower()
+
+
+def map_columns(headers: List[str]) -> Dict[str, int]:
+    """Canonical field → column index. Raises RowError if there is no email column."""
+    found: Dict[str, int] = {}
+    normed = [_norm(h) for h in headers]
+    for fieldname, aliases in COLUMN_ALIASES.items():
+        for alias in aliases:
+            if alias in normed:
+                found[fieldname] = normed.index(alias)
+                break
+    if "email" not in found:
+        raise RowError(f"no email column (looked for: {', '.join(COLUMN_ALIASES['email'])})")
+    return found
+
+
+def role_resolver(role_key_map: Mapping[str, str]):
+    """Accepts the full label, the role key or the label's short name, case-insensitively."""
+    lookup: Dict[str, str] = {}
+    for label, key in role_key_map.items():
+        for spelling in (label, key, label.split("(")[0], label.split("(")[-1].rstrip(")")):
+            lookup.setdefault(spelling.strip().lower(), label)
+
+    def resolve(raw: str) -> str:
+        label = lookup.get(raw.strip().lower())
+        if label is None:
+            raise RowError(f"role {raw!r} is not one of {', '.join(role_key_map.values())}")
+        return label
+    return resolve
+
+
+def parse_date(raw: Any) -> date:
+    if isinstance(raw, datetime):
+        return raw.date()
+    if isinstance(raw, date):
+        return raw
+    if isinstance(raw, (int, float)):                    # Excel serial date
+        return date(1899, 12, 30) + timedelta(days=int(raw))
+    text = str(raw).strip()
+    for fmt in DATE_FORMATS:
+        try:
+            return datetime.strptime(text, fmt).date()
+        except ValueError:
+            continue
+    raise RowError(f"start date {text!r} not recognised (use YYYY-MM-DD)")
+
+
+def _cell(row: List[Any], columns: Mapping[str, int], name: str) -> Any:
+    idx = columns.get(name)
+    if idx is None or idx >= len(row):
+        return None
+    value = row[idx]
+    if isinstance(value, str):
+        value = value.strip()
+    return value if value not in ("", None) else None
+
+
+@dataclass
+class ProvisionedUser:
+    key:     str                         # document _id
+    email:   str
+    profile: Dict[str, Any] = field(default_factory=dict)
+
+    def target_id(self, existing: Optional[Mapping[str, Any]]) -> str:
+        """
+        The _id to write: the row's object ID when HR gave one, else the hire's
+        existing document (found by email — claimed ones no longer carry the
+        "hr:" key), else "hr:<email>".
+        """
+        if existing is None or not self.key.startswith(PENDING_PREFIX):
+            return self.key
+        return existing["_id"]
+
+    def merged_profile(self, existing: Optional[Mapping[str, Any]]) -> Dict[str, Any]:
+        """The profile after this row is applied, for recomputing derived fields."""
+        return {**((existing or {}).get("profile") or {}), **self.profile}
+
+    def update(self, batch_id: str, now: str, derived: Mapping[str, Any],
+               existing: Optional[Mapping[str, Any]] = None) -> Tuple[Dict, Dict]:
+        """
+        (filter, update) for an upsert that never touches progress. `existing`
+        is the hire's current document, if any; `derived` is
+        services/schema.derived_fields for merged_profile and its progress.
+        """
+        key    = self.target_id(existing)
+        fields = [f for f in PROFILE_FIELDS if f in self.profile]
+        return (
+            {"_id": key},
+            {
+                "$set": {
+                    **{f"profile.{k}": v for k, v in self.profile.items()},
+                    **derived,
+                    "azure_email":        self.email,
+                    "provisioned.batch":  batch_id,
+                    "provisioned.at":     now,
+                    "provisioned.fields": fields,
+                    "last_updated":       now,
+                },
+                "$setOnInsert": {
+                    "wizard_pending": True,
+                    "pending_claim":  key.startswith(PENDING_PREFIX),
+                },
+            },
+        )
+
+
+def existing_documents(col, users: List["ProvisionedUser"]) -> Dict[str, Dict[str, Any]]:
+    """
+    ProvisionedUser.key → the hire's current document, for one batch in one
+    query. Pending keys match by email, preferring a claimed document over a
+    leftover "hr:" one.
+    """
+    keys   = [u.key for u in users]
+    emails = [u.email for u in users]
+    found: Dict[str, Dict[str, Any]] = {}
+    by_email: Dict[str, Dict[str, Any]] = {}
+    for doc in col.find({"$or": [{"_id": {"$in": keys}}, {"azure_email": {"$in": emails}}]}, EXISTING_PROJECTION):
+        found[doc["_id"]] = doc
+        email = str(doc.get("azure_email") or "").lower()
+        if email and (email not in by_email or str(by_email[email]["_id"]).startswith(PENDING_PREFIX)):
+            by_email[email] = doc
+    result = {}
+    for u in users:
+        doc = by_email.get(u.email) if u.key.startswith(PENDING_PREFIX) else found.get(u.key)
+        if doc is not None:
+            result[u.key] = doc
+    return result
+
+
+def parse_row(row: List[Any], columns: Mapping[str, int], resolve_role) -> ProvisionedUser:
+    email = _cell(row, columns, "email")
+    if not email or not EMAIL_RE.match(str(email)):
+        raise RowError(f"email {email!r} is missing or invalid")
+    email = str(email).lower()
+    oid   = _cell(row, columns, "oid")
+    user  = ProvisionedUser(key=str(oid) if oid else PENDING_PREFIX + email, email=email)
+
+    if (name := _cell(row, columns, "name")) is not None:
+        user.profile["name"] = str(name)
+    if (role := _cell(row, columns, "role")) is not None:
+        user.profile["role"] = resolve_role(str(role))
+    if (start := _cell(row, columns, "start_date")) is not None:
+        user.profile["start_date"] = parse_date(start).isoformat()
+    for person in ("buddy", "manager"):
+        if (value := _cell(row, columns, person)) is not None:
+            user.profile[person] = str(value)
+        if (value := _cell(row, columns, f"{person}_email")) is not None:
+            if not EMAIL_RE.match(str(value)):
+                raise RowError(f"{person} email {value!r} is invalid")
+            user.profile[f"{person}_email"] = str(value).lower()
+    return user
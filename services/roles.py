@@ -0,0 +1,198 @@
+"""
+roles.py — Role Engine
+=======================
+Resolves the role declarations in content/roles.py into one compiled
+RoleView per selectable role. Each view already holds everything that role
+sees — ordered checklist, Navigator courses, FAROS systems, toolkit, links,
+glossary, FAQs, hero image and architecture diagram — so pages read fields
+instead of branching on role keys, and switching role is a dictionary lookup.
+
+Resolution:
+  - lineage is parents-first, depth-first over `extends`, each role once
+    (so diamond inheritance shares a single copy of the common base)
+  - every role in the lineage contributes the sets keyed by its own role key,
+    then the sets named in its `include`
+  - sets contributed by abstract roles are "shared", the rest are "specific";
+    pages use the split for their two-column layouts
+  - the hero image and diagram come from the most specific role that has one
+  - courses become Course records; progress is keyed by `Course.id`
+"""
+
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Any, Dict, List, Mapping, NamedTuple, Optional, Tuple
+
+# Set kind → content namespace key holding the sets, keyed by set name
+SET_KINDS: Dict[str, str] = {
+    "tasks":      "tasks",                # sets are the tasks' "Role" field
+    "courses":    "navigator_courses",
+    "faros":      "faros_catalog",
+    "toolkit":    "toolkit",
+    "links":      "quick_links",
+    "glossary":   "glossary",
+    "faqs":       "faqs",
+    "image":      "theme_images",
+    "tech_stack": "tech_stacks",
+}
+
+ROLE_FIELDS = ("label", "extends", "include", "abstract")
+
+
+class Course(NamedTuple):
+    section: str
+    title:   str
+    id:      str                          # navigator_status / completion_days key
+
+
+@dataclass(frozen=True)
+class RoleView:
+    key:              str
+    label:            str
+    lineage:          Tuple[str, ...]
+    sets:             Mapping[str, Tuple[str, ...]]        # kind → set names, shared first
+    tasks:            Tuple[Mapping, ...]                  # phase-ordered checklist
+    courses_shared:   Tuple[Course, ...]
+    courses_specific: Tuple[Course, ...]
+    faros_shared:     Tuple[str, ...]
+    faros_specific:   Tuple[str, ...]
+    toolkit:          Tuple[str, ...]
+    links_shared:     Mapping[str, str]
+    links_specific:   Mapping[str, str]
+    glossary:         Mapping[str, str]
+    faqs:             Tuple[Mapping, ...]
+    image:            Optional[str]
+    tech_stack:       Optional[Mapping]
+
+    @property
+    def courses(self) -> Tuple[Course, ...]:
+        return self.courses_shared + self.courses_specific
+
+
+def role_key_map(roles: Mapping[str, Mapping]) -> Dict[str, str]:
+    """Full label → key for every selectable role, in declaration order."""
+    return {spec["label"]: key for key, spec in roles.items() if not spec.get("abstract")}
+
+
+def lineage(roles: Mapping[str, Mapping], key: str) -> Tuple[str, ...]:
+    """Parents-first linearisation. Raises ValueError on unknown parents or cycles."""
+    order: List[str] = []
+
+    def visit(k: str, path: Tuple[str, ...]) -> None:
+        if k in path:
+            raise ValueError(f"role {key!r}: inheritance cycle {' → '.join(path + (k,))}")
+        if k not in roles:
+            raise ValueError(f"role {path[-1] if path else key!r}: extends unknown role {k!r}")
+        for parent in roles[k].get("extends", ()):
+            visit(parent, path + (k,))
+        if k not in order:
+            order.append(k)
+
+    visit(key, ())
+    return tuple(order)
+
+
+def role_sets(roles: Mapping[str, Mapping], chain: Tuple[str, ...], kind: str) -> Tuple[List[str], List[str]]:
+    """(shared, specific) set names of one kind for a resolved lineage."""
+    shared, specific = [], []
+    for k in chain:
+        target = shared if roles[k].get("abstract") else specific
+        for name in (k, *roles[k].get("include", {}).get(kind, ())):
+            if name not in shared and name not in specific:
+                target.append(name)
+    return shared, specific
+
+
+def validate_roles(ns: Mapping[str, Any]) -> List[str]:
+    roles  = ns["roles"]
+    errors = []
+    if not role_key_map(roles):
+        errors.append("ROLES declares no selectable (non-abstract) role")
+    labels = [spec.get("label") for spec in roles.values() if not spec.get("abstract")]
+    if len(labels) != len(set(labels)):
+        errors.append("ROLES has duplicate labels")
+    for key, spec in roles.items():
+        unknown = set(spec) - set(ROLE_FIELDS)
+        if unknown:
+            errors.append(f"role {key!r}: unknown field(s) {', '.join(sorted(unknown))}")
+        if not spec.get("abstract") and not isinstance(spec.get("label"), str):
+            errors.append(f"role {key!r}: needs a label")
+        for kind in spec.get("include", {}):
+            if kind not in SET_KINDS:
+                errors.append(f"role {key!r}: can't include {kind!r} (one of {', '.join(SET_KINDS)})")
+        try:
+            lineage(roles, key)
+        except ValueError as e:
+            errors.append(str(e))
+    if errors:
+        return errors
+
+    task_sets = {t.get("Role") for t in ns["tasks"]}
+    for key, spec in roles.items():
+        for kind, names in spec.get("include", {}).items():
+            known = task_sets if kind == "tasks" else ns.get(SET_KINDS[kind], {})
+            for name in names:
+                if name not in known:
+                    errors.append(f"role {key!r}: includes unknown {kind} set {name!r}")
+    for key in role_key_map(roles).values():
+        if not any(k in ns["theme_images"] for k in lineage(roles, key)):
+            errors.append(f"role {key!r}: no THEME_IMAGES entry for it or any role it extends")
+    declared = set(roles) | {n for spec in roles.values() for n in spec.get("include", {}).get("tasks", ())}
+    for name in sorted(task_sets - declared):
+        errors.append(f"tasks reference undeclared role {name!r}")
+    return errors
+
+
+def compile_roles(ns: Mapping[str, Any]) -> Dict[str, RoleView]:
+    """
+    Full label → RoleView. Expects an already-frozen, validated namespace:
+    views share its task and course objects rather than copying them.
+    """
+    roles = ns["roles"]
+    order = {p: i for i, p in enumerate(ns["phase_order"])}
+    views = {}
+    for label, key in role_key_map(roles).items():
+        chain = lineage(roles, key)
+        split = {kind: role_sets(roles, chain, kind) for kind in SET_KINDS}
+        sets  = {kind: tuple(s + p) for kind, (s, p) in split.items()}
+
+        def pick(kind: str, names: List[str]) -> List[Tuple[str, Any]]:
+            catalog = ns.get(SET_KINDS[kind], {})
+            return [(n, catalog[n]) for n in names if n in catalog]
+
+        def flat(kind: str, names: List[str]) -> List[Any]:
+            return [item for _, items in pick(kind, names) for item in items]
+
+        def merged(kind: str, names: List[str]) -> Dict[str, Any]:
+            out: Dict[str, Any] = {}
+            for _, mapping in pick(kind, names):
+                out.update(mapping)
+            return out
+
+        task_sets = set(sets["tasks"])
+        rank      = {n: i for i, n in enumerate(sets["tasks"])}
+        tasks     = sorted(
+            (t for t in ns["tasks"] if t["Role"] in task_sets),
+            key=lambda t: (order[t["Phase"]], rank[t["Role"]]),
+        )
+        images = pick("image", list(sets["image"]))
+        stacks = pick("tech_stack", list(sets["tech_stack"]))
+
+        views[label] = RoleView(
+            key=key,
+            label=label,
+            lineage=chain,
+            sets=MappingProxyType(sets),
+            tasks=tuple(tasks),
+            courses_shared=tuple(Course(n, t, cid) for n, items in pick("courses", split["courses"][0]) for cid, t in items.items()),
+            courses_specific=tuple(Course(n, t, cid) for n, items in pick("courses", split["courses"][1]) for cid, t in items.items()),
+            faros_shared=tuple(flat("faros", split["faros"][0])),
+            faros_specific=tuple(flat("faros", split["faros"][1])),
+            toolkit=tuple(flat("toolkit", list(sets["toolkit"]))),
+            links_shared=MappingProxyType(merged("links", split["links"][0])),
+            links_specific=MappingProxyType(merged("links", split["links"][1])),
+            glossary=MappingProxyType(merged("glossary", list(sets["glossary"]))),
+            faqs=tuple(flat("faqs", list(sets["faqs"]))),
+            image=images[-1][1] if images else None,
+            tech_stack=stacks[-1][1] if stacks else None,
+        )
+    return views
@@ -0,0 +1,319 @@
+"""
+schema.py — User Document Versions & Lazy Upgrades
+===================================================
+Every user document carries `schema_version`. When the stored shape changes,
+the change is written as an upgrade function registered for the version it
+produces; documents are brought forward through the chain one step at a
+time, so a document several versions behind needs nothing special.
+
+Upgrades never stop the world:
+
+  • on sign-in the app upgrades the loaded document in memory and carries
+    on — the write-back is queued and written by a background thread;
+  • the same thread sweeps cold documents (users who haven't signed in
+    since) a small batch at a time, so the collection converges without a
+    migration window and without load spikes.
+
+Write-backs are conditional on the `last_updated` and `schema_version` that
+were read, so they never overwrite a click that landed in between; such a
+document is simply picked up again by a later sweep. Documents from a newer
+version (a rolling deploy) are left alone. `last_updated` is not touched —
+an upgrade isn't user activity.
+
+Versions
+  (none) → 1   progress keyed by task / course ID (services/content_ids.py)
+  1 → 2        completion_days and badges.unlocked present
+  2 → 3        derived fields present: next_due, summary, xp, level, cohort
+  3 → 4        azure_email lower-cased, as provisioning and mentor links match it
+
+    [schema]               # optional
+    sweep            = true
+    sweep_batch      = 200      # documents per sweep step
+    sweep_interval_s = 30       # between steps while there is work
+    idle_interval_s  = 3600     # between checks once everything is current
+"""
+
+import atexit
+import copy
+import logging
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Mapping, Optional
+
+from services import leaderboard, mentees, nudges
+
+logger = logging.getLogger(__name__)
+
+SCHEMA_VERSION     = 4
+VERSION_FIELD      = "schema_version"
+DEFAULT_BATCH      = 200
+DEFAULT_INTERVAL_S = 30.0
+IDLE_INTERVAL_S    = 3600.0
+FLUSH_INTERVAL_S   = 2.0
+MAX_PENDING        = 10_000
+
+# Produced version → upgrade(doc, bundle), which edits the document in place
+UPGRADES: Dict[int, Callable[[Dict[str, Any], Any], None]] = {}
+
+
+def upgrade(version: int):
+    """Register the function that turns a version-(n-1) document into version n."""
+    def register(fn):
+        if version in UPGRADES:
+            raise ValueError(f"schema version {version} already has an upgrade ({UPGRADES[version].__name__})")
+        UPGRADES[version] = fn
+        return fn
+    return register
+
+
+def version_of(doc: Mapping[str, Any]) -> int:
+    return int(doc.get(VERSION_FIELD) or 0)
+
+
+def outdated_query() -> Dict[str, Any]:
+    return {"$or": [{VERSION_FIELD: {"$exists": False}}, {VERSION_FIELD: {"$lt": SCHEMA_VERSION}}]}
+
+
+def derived_fields(bundle, role_label: str, start_date: Any,
+                   task_status: Mapping[str, bool], navigator_status: Mapping[str, bool]) -> Dict[str, Any]:
+    """
+    Fields computed from progress and stored with every write so other views
+    never recompute them: `next_due` (nudge scheduler's index), `summary`
+    (mentor inbox) and xp / level / cohort (leaderboard).
+    """
+    summary = mentees.progress_summary(bundle, role_label, start_date, task_status, navigator_status)
+    xp, _, level = leaderboard.xp_and_level(
+        summary["tasks_done"], summary["tasks_total"], summary["courses_done"], summary["courses_total"],
+    )
+    return {
+        "next_due": nudges.next_due(start_date, bundle.checklist(role_label), task_status),
+        "summary":  summary,
+        "xp":       xp,
+        "level":    level,
+        "cohort":   leaderboard.cohort_key(start_date, bundle.role(role_label).key),
+    }
+
+
+# =============================================================================
+# UPGRADES — append only; never edit one that has shipped
+# =============================================================================
+
+@upgrade(1)
+def _progress_ids(doc: Dict[str, Any], bundle) -> None:
+    for field, remap in (
+        ("checklist",        bundle.remap_tasks),
+        ("navigator_status", bundle.remap_courses),
+        ("completion_days",  bundle.remap_days),
+    ):
+        if field in doc:
+            doc[field] = remap(doc[field] or {})
+
+
+@upgrade(2)
+def _progress_maps(doc: Dict[str, Any], bundle) -> None:
+    doc.setdefault("completion_days", {})
+    badges = doc.setdefault("badges", {})
+    badges.setdefault("unlocked", {})
+    badges.setdefault("session_completions", 0)
+
+
+@upgrade(3)
+def _derived(doc: Dict[str, Any], bundle) -> None:
+    profile = doc.get("profile", {})
+    doc.update(derived_fields(
+        bundle, profile.get("role", ""), profile.get("start_date"),
+        doc.get("checklist", {}), doc.get("navigator_status", {}),
+    ))
+
+
+@upgrade(4)
+def _email_case(doc: Dict[str, Any], bundle) -> None:
+    if isinstance(doc.get("azure_email"), str):
+        doc["azure_email"] = doc["azure_email"].lower()
+
+
+# =============================================================================
+# APPLYING
+# =============================================================================
+
+@dataclass(frozen=True)
+class Upgrade:
+    """The write that stores an upgraded document, guarded against concurrent saves."""
+    filter: Dict[str, Any]
+    fields: Dict[str, Any]
+
+    def op(self):
+        from pymongo import UpdateOne
+        return UpdateOne(self.filter, {"$set": self.fields})
+
+
+def upgrade_doc(doc: Dict[str, Any], bundle) -> Optional[Upgrade]:
+    """
+    Run every upgrade `doc` is missing, in place. Returns the write-back, or
+    None if the document is already current (or from a newer version).
+    """
+    version = version_of(doc)
+    if version >= SCHEMA_VERSION:
+        if version > SCHEMA_VERSION:
+            logger.debug("Document %s is schema v%d, newer than v%d — left as is", doc.get("_id"), version, SCHEMA_VERSION)
+        return None
+    before = {k: copy.deepcopy(v) for k, v in doc.items()}
+    for target in range(version + 1, SCHEMA_VERSION + 1):
+        UPGRADES[target](doc, bundle)
+    doc[VERSION_FIELD] = SCHEMA_VERSION
+    fields = {k: v for k, v in doc.items() if k != "_id" and (k not in before or before[k] != v)}
+    return Upgrade(
+        filter={
+            "_id":          doc["_id"],
+            "last_updated": before.get("last_updated"),
+            VERSION_FIELD:  before.get(VERSION_FIELD),
+        },
+        fields=fields,
+    )
+
+
+def sweep_all(col, bundle, batch_size: int = DEFAULT_BATCH, passes: int = 3) -> Dict[str, int]:
+    """
+    Upgrade every outdated document now, for jobs that query fields a recent
+    upgrade normalises. Documents saved in between are retried on the next
+    pass; `remaining` counts those still outdated after the last one.
+    """
+    upgraded = 0
+    for _ in range(passes):
+        after, raced = None, 0
+        while True:
+            result    = sweep(col, bundle, batch_size, after)
+            upgraded += result["upgraded"]
+            raced    += result["raced"]
+            if result["last_id"] is None:
+                break
+            after = result["last_id"]
+        if not raced:
+            break
+    return {"upgraded": upgraded, "remaining": col.count_documents(outdated_query())}
+
+
+def sweep(col, bundle, batch_size: int = DEFAULT_BATCH, after: Any = None) -> Dict[str, Any]:
+    """
+    Upgrade one batch of outdated documents with _id > `after`. Returns counts
+    and `last_id` to continue from (None once nothing is left after `after`).
+    """
+    query = outdated_query()
+    if after is not None:
+        query = {"$and": [query, {"_id": {"$gt": after}}]}
+    docs = list(col.find(query).sort("_id", 1).limit(batch_size))
+    ops  = [u.op() for d in docs if (u := upgrade_doc(d, bundle)) is not None]
+    upgraded = col.bulk_write(ops, ordered=False).modified_count if ops else 0
+    return {
+        "scanned":  len(docs),
+        "upgraded": upgraded,
+        "raced":    len(ops) - upgraded,            # saved in between — the next pass gets them
+        "last_id":  docs[-1]["_id"] if len(docs) == batch_size else None,
+    }
+
+
+class SchemaUpgrader:
+    """Process-wide background writer for sign-in upgrades, plus the cold-document sweeper."""
+
+    def __init__(
+        self,
+        get_db: Callable[[], Any],
+        get_bundle: Callable[[], Any],
+        sweep_enabled: bool = True,
+        sweep_batch: int = DEFAULT_BATCH,
+        sweep_interval_s: float = DEFAULT_INTERVAL_S,
+        idle_interval_s: float = IDLE_INTERVAL_S,
+        flush_interval_s: float = FLUSH_INTERVAL_S,
+        collection: str = "users",
+    ):
+        self._get_db         = get_db
+        self._get_bundle     = get_bundle
+        self.collection_name = collection
+        self.sweep_enabled   = sweep_enabled
+        self.sweep_batch     = sweep_batch
+        self.sweep_interval  = sweep_interval_s
+        self.idle_interval   = idle_interval_s
+        self.flush_interval  = flush_interval_s
+        self._pending: deque = deque(maxlen=MAX_PENDING)
+        self._lock           = threading.Lock()
+        self._flush_lock     = threading.Lock()
+        self._after: Any     = None
+        self._next_sweep     = 0.0
+        self._thread: Optional[threading.Thread] = None
+        self.counts = {"written": 0, "raced": 0, "swept": 0, "failures": 0}
+
+    # ── Called from the script thread ────────────────────────────────────────
+    def upgrade_loaded(self, doc: Dict[str, Any]) -> Dict[str, Any]:
+        """Upgrade a just-loaded document in place and queue its write-back. Never touches the DB."""
+        pending = upgrade_doc(doc, self._get_bundle())
+        if pending is not None:
+            with self._lock:
+                self._pending.append(pending)   # dropped if the queue is full: the sweeper gets it later
+        return doc
+
+    # ── Background ───────────────────────────────────────────────────────────
+    def _collection(self):
+        db = self._get_db()
+        if db is None:
+            return None
+        return db[self.collection_name]
+
+    def flush(self) -> int:
+        """Write queued sign-in upgrades. Returns documents written."""
+        with self._flush_lock:
+            with self._lock:
+                batch: List[Upgrade] = list(self._pending)
+                self._pending.clear()
+            if not batch:
+                return 0
+            try:
+                col = self._collection()
+                if col is None:
+                    raise ConnectionError("MongoDB unavailable")
+                written = col.bulk_write([u.op() for u in batch], ordered=False).modified_count
+            except Exception as e:
+                with self._lock:
+                    self._pending.extendleft(reversed(batch))
+                self.counts["failures"] += 1
+                logger.warning("Schema write-back failed, %d document(s) kept — %s", len(batch), e)
+                return 0
+            self.counts["written"] += written
+            self.counts["raced"]   += len(batch) - written
+            return written
+
+    def sweep_once(self) -> Dict[str, Any]:
+        col = self._collection()
+        if col is None:
+            return {"scanned": 0, "upgraded": 0, "raced": 0, "last_id": None}
+        result = sweep(col, self._get_bundle(), self.sweep_batch, self._after)
+        self._after = result["last_id"]
+        self.counts["swept"] += result["upgraded"]
+        if result["upgraded"]:
+            logger.info("Schema sweep: %d document(s) upgraded to v%d", result["upgraded"], SCHEMA_VERSION)
+        return result
+
+    def _tick(self) -> None:
+        self.flush()
+        if self.sweep_enabled and time.monotonic() >= self._next_sweep:
+            result = self.sweep_once()
+            busy   = result["scanned"] and (result["last_id"] is not None or result["raced"])
+            self._next_sweep = time.monotonic() + (self.sweep_interval if busy else self.idle_interval)
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+
+        def loop() -> None:
+            while True:
+                time.sleep(self.flush_interval)
+                try:
+                    self._tick()
+                except Exception:
+                    self.counts["failures"] += 1
+                    logger.exception("Schema upgrader failed")
+
+        self._thread = threading.Thread(target=loop, name="spae-schema-upgrader", daemon=True)
+        self._thread.start()
+        atexit.register(self.flush)
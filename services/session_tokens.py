@@ -0,0 +1,66 @@
+"""
+session_tokens.py — Signed Session Resume Tokens
+=================================================
+Lets any replica rebuild a signed-in session without the original process.
+
+After sign-in the app puts a short token in the URL (?s=…). When a replica
+dies, the browser reconnects through the proxy to another replica and re-sends
+the same URL; that replica verifies the token, reloads the user document from
+MongoDB and carries on. Widget values (current page, etc.) come back from the
+browser itself, since widget IDs are deterministic across processes.
+
+Token format:  <oid>.<auth_epoch>.<expiry unix ts>.<nonce>.<hmac-sha256, base64url>
+
+`auth_epoch` is stored on the user document and bumped on Sign Out, which
+revokes every token issued before it.
+
+A token in the URL is a bearer credential: proxies that log the full URI
+record it, and it travels with any copied page link. So every token is
+single-use — the app keeps the nonces it issued on the user document
+(`resume.<nonce>`), a resume consumes its nonce and puts a fresh token in
+the URL. A copied link stops working as soon as its owner reconnects (and
+if someone else used it first, the owner is simply asked to sign in). Keep
+`token_ttl_h` short and the query string out of access logs
+(deploy/local/nginx.conf shows how).
+
+    [sessions]
+    signing_key = "long-random-string"   # same value on every replica
+    token_ttl_h = 4
+"""
+
+import base64
+import hashlib
+import hmac
+import secrets
+import time
+from typing import Optional, Tuple
+
+DEFAULT_TTL_S = 4 * 3600
+
+
+def _sign(key: str, payload: str) -> str:
+    digest = hmac.new(key.encode(), payload.encode(), hashlib.sha256).digest()
+    return base64.urlsafe_b64encode(digest).rstrip(b"=").decode()
+
+
+def new_nonce() -> str:
+    return secrets.token_urlsafe(12)                     # no "." — safe inside the token
+
+
+def issue_token(oid: str, auth_epoch: int, key: str, nonce: str, ttl_s: float = DEFAULT_TTL_S) -> str:
+    payload = f"{oid}.{int(auth_epoch)}.{int(time.time() + ttl_s)}.{nonce}"
+    return f"{payload}.{_sign(key, payload)}"
+
+
+def verify_token(token: str, key: str) -> Optional[Tuple[str, int, str]]:
+    """Return (oid, auth_epoch, nonce) for a valid, unexpired token — otherwise None."""
+    try:
+        payload, sig = token.rsplit(".", 1)
+        oid, epoch, expiry, nonce = payload.rsplit(".", 3)
+        if not hmac.compare_digest(sig, _sign(key, payload)):
+            return None
+        if int(expiry) < time.time():
+            return None
+        return oid, int(epoch), nonce
+    except (ValueError, AttributeError):
+        return None
@@ -0,0 +1,223 @@
+"""
+sessions.py — Session Memory Accounting & Idle Eviction
+========================================================
+Streamlit keeps every session's state in process memory for as long as the
+session exists. This module keeps a registry of signed-in sessions so that:
+
+  - each session's state size is measured (see SessionRegistry.stats)
+  - sessions idle longer than `idle_timeout_s` get their heavy keys and
+    progress checkboxes dropped; the app rebuilds them from the DB on the
+    user's next rerun (db_loaded is reset to False). Every click is already
+    saved, so eviction writes nothing itself: `flush(state, session_id)`
+    retries what failed saves left behind and says whether anything would
+    be lost. A session with unsaved progress is kept
+  - sessions active in the last `BUSY_GRACE_S` are never evicted, so the
+    sweeper can't pull state out from under a rerun that is still running
+  - when the accounted total exceeds `memory_budget_bytes`, the least
+    recently active sessions are evicted first until it fits again
+
+Configured from .streamlit/secrets.toml (all optional):
+
+    [sessions]
+    idle_timeout_min = 30
+    memory_budget_mb = 512
+    sweep_interval_s = 60
+
+Progress checkbox keys (chk_{task}, nav_{key}) are dropped with the maps they
+mirror, so no stale box outlives its reload. The page re-sends their values
+on the next rerun, which looks like fresh changes: the app's toggle
+callbacks ignore them while `evicted_at` is set.
+"""
+
+import logging
+import sys
+import threading
+import time
+import weakref
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional
+
+from streamlit.runtime.state.safe_session_state import SafeSessionState
+
+logger = logging.getLogger(__name__)
+
+# Keys rebuilt by restore_from_db() when the user comes back, and an admin's
+# prepared HR export (bytes until downloaded; prepared again on demand)
+HEAVY_KEYS = ("task_status", "navigator_status", "quiz_state", "admin_export")
+# Widget keys mirroring them, re-rendered from the reloaded maps
+WIDGET_PREFIXES = ("chk_", "nav_")
+
+DEFAULT_IDLE_TIMEOUT_S    = 30 * 60
+DEFAULT_MEMORY_BUDGET     = 512 * 1024 * 1024
+DEFAULT_SWEEP_INTERVAL_S  = 60
+BUSY_GRACE_S              = 30     # longer than any rerun
+
+
+def estimate_size(obj: Any, _seen: Optional[set] = None) -> int:
+    """
+    Deep sys.getsizeof over dicts, lists, tuples and sets.
+    An upper bound: strings shared with content/ are counted per session.
+    """
+    seen = set() if _seen is None else _seen
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+    size = sys.getsizeof(obj, 0)
+    if isinstance(obj, dict):
+        size += sum(estimate_size(k, seen) + estimate_size(v, seen) for k, v in obj.items())
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        size += sum(estimate_size(v, seen) for v in obj)
+    return size
+
+
+@dataclass
+class SessionRecord:
+    session_id:  str
+    state_ref:   "weakref.ref"        # → the session's SessionState
+    oid:         str
+    last_active: float
+    bytes:       int  = 0
+    evicted:     bool = False
+
+
+class SessionRegistry:
+    """Process-wide registry of signed-in sessions. One instance per process."""
+
+    def __init__(
+        self,
+        flush: Callable[[Any, str], bool],
+        idle_timeout_s: float = DEFAULT_IDLE_TIMEOUT_S,
+        memory_budget_bytes: int = DEFAULT_MEMORY_BUDGET,
+        sweep_interval_s: float = DEFAULT_SWEEP_INTERVAL_S,
+    ):
+        self._flush          = flush
+        self.idle_timeout_s  = idle_timeout_s
+        self.memory_budget   = memory_budget_bytes
+        self.sweep_interval  = sweep_interval_s
+        self._records: Dict[str, SessionRecord] = {}
+        self._lock   = threading.RLock()
+        self._thread: Optional[threading.Thread] = None
+        self.evictions = 0
+
+    # ── Called from the script thread at the top of every rerun ─────────────
+    def touch(self, session_id: str, session_state: Any, oid: str) -> None:
+        """
+        Mark a session active. Holding the registry lock here means a rerun
+        never starts while the sweeper is halfway through evicting it; the
+        sweeper in turn skips sessions touched within BUSY_GRACE_S, so it
+        never evicts one whose rerun is still running.
+        """
+        state = getattr(session_state, "_state", session_state)   # unwrap SafeSessionState
+        with self._lock:
+            rec = self._records.get(session_id)
+            if rec is None or rec.state_ref() is not state:
+                rec = SessionRecord(session_id, weakref.ref(state), oid, time.monotonic())
+                self._records[session_id] = rec
+            rec.oid         = oid
+            rec.last_active = time.monotonic()
+            rec.evicted     = False
+
+    # ── Accounting ───────────────────────────────────────────────────────────
+    def _live_records(self) -> List[SessionRecord]:
+        """Drop records whose session Streamlit has already garbage-collected."""
+        dead = [sid for sid, rec in self._records.items() if rec.state_ref() is None]
+        for sid in dead:
+            del self._records[sid]
+        return list(self._records.values())
+
+    def measure(self) -> int:
+        total = 0
+        with self._lock:
+            for rec in self._live_records():
+                state = rec.state_ref()
+                if state is None:
+                    continue
+                rec.bytes = estimate_size(SafeSessionState(state, lambda: None).filtered_state)
+                total += rec.bytes
+        return total
+
+    def stats(self) -> Dict[str, Any]:
+        now = time.monotonic()
+        with self._lock:
+            records = self._live_records()
+            return {
+                "sessions":      len(records),
+                "evicted":       sum(r.evicted for r in records),
+                "total_bytes":   sum(r.bytes for r in records),
+                "budget_bytes":  self.memory_budget,
+                "evictions":     self.evictions,
+                "per_session": [
+                    {
+                        "oid":     r.oid,
+                        "bytes":   r.bytes,
+                        "idle_s":  round(now - r.last_active),
+                        "evicted": r.evicted,
+                    }
+                    for r in sorted(records, key=lambda r: r.last_active)
+                ],
+            }
+
+    # ── Eviction ─────────────────────────────────────────────────────────────
+    def _evict(self, rec: SessionRecord) -> bool:
+        state = rec.state_ref()
+        if state is None or rec.evicted:
+            return False
+        safe = SafeSessionState(state, lambda: None)
+        if "task_status" not in safe:
+            return False
+        # Never drop state that only lives here ("⚠️ Local" mode, failed saves)
+        if not self._flush(safe, rec.session_id):
+            return False
+        widgets = [k for k in safe.filtered_state if k.startswith(WIDGET_PREFIXES)]
+        for key in (*HEAVY_KEYS, *widgets):
+            if key in safe:
+                del safe[key]
+        safe["db_loaded"]  = False
+        safe["evicted_at"] = time.time()
+        rec.evicted = True
+        rec.bytes   = estimate_size(safe.filtered_state)
+        self.evictions += 1
+        return True
+
+    def sweep(self) -> List[str]:
+        """Evict idle sessions, then LRU sessions while over budget."""
+        evicted = []
+        now     = time.monotonic()
+        total   = self.measure()
+        with self._lock:
+            lru = sorted(
+                (r for r in self._live_records() if not r.evicted),
+                key=lambda r: r.last_active,
+            )
+            for rec in lru:
+                if now - rec.last_active < BUSY_GRACE_S:
+                    continue
+                idle = now - rec.last_active >= self.idle_timeout_s
+                over = total > self.memory_budget
+                if not (idle or over):
+                    continue
+                before = rec.bytes
+                if self._evict(rec):
+                    total -= before - rec.bytes
+                    evicted.append(rec.session_id)
+        if evicted:
+            logger.info(
+                "Evicted %d session(s); %d sessions, %.1f MB accounted",
+                len(evicted), len(self._records), total / 1024 / 1024,
+            )
+        return evicted
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+
+        def loop() -> None:
+            while True:
+                time.sleep(self.sweep_interval)
+                try:
+                    self.sweep()
+                except Exception:
+                    logger.exception("Session sweep failed")
+
+        self._thread = threading.Thread(target=loop, name="spae-session-sweeper", daemon=True)
+        self._thread.start()
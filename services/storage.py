@@ -0,0 +1,992 @@
+"""
+storage.py — Pluggable Document Storage: MongoDB or SQLite
+===========================================================
+Everything that persists data — the app, the background jobs, the tools —
+talks to a *database* object and the *collections* it hands out, using the
+part of pymongo's API listed in `Collection` below. `open_database` returns
+either a real pymongo Database or a SQLiteDatabase that implements the same
+calls, so no caller knows which one it has.
+
+SQLite is for small satellite sites that can't run MongoDB (and for local
+runs and tests): one file, nothing to operate, and progress survives
+restarts instead of living only in the session.
+
+  • WAL journal, so readers never wait for the writer; a busy timeout
+    instead of "database is locked" errors under concurrent clicks;
+  • connections are pooled and statements are parameterised constants, so
+    sqlite3's statement cache reuses the prepared statements;
+  • every write is one transaction (BEGIN IMMEDIATE, so read-modify-write
+    updates are atomic); update_many, insert_many and bulk_write run a whole
+    batch in a single transaction.
+
+Documents are stored as JSON, one table per collection, keyed by _id.
+Lookups by _id use the primary key; other filters are evaluated in Python
+over the collection — fine for the few thousand users of a small site, not
+a replacement for MongoDB's indexes at scale. Query operators: $eq $ne $gt
+$gte $lt $lte $in $nin $exists $type $not $and $or $nor, dotted paths;
+updates: $set $unset $inc $setOnInsert. TTL indexes and time-series
+collections are MongoDB-only (the event log falls back to a plain
+collection whose old events are never expired).
+
+    [storage]              # optional — MongoDB from [mongo] unless set
+    backend      = "sqlite"                # "mongo" | "sqlite"
+    path         = "data/spae.db"
+    busy_timeout = 5                       # seconds to wait for the writer lock
+
+MongoDB connections are pooled by the driver; the pool, its timeouts and
+the write/read behaviour are set under [mongo] (MONGO_OPTIONS maps each
+key to the MongoClient option). `op_timeout_ms` is the deadline the app
+puts on each request-path operation with `deadline()`, so a slow secondary
+or an exhausted pool fails that one read or save instead of hanging the
+rerun. PoolMetrics counts checkouts, waits and timeouts for the admin
+"Runtime stats" view.
+
+    [mongo]
+    max_pool_size               = 50       # connections per replica process
+    min_pool_size               = 0
+    max_idle_time_ms            = 300000
+    wait_queue_timeout_ms       = 2000     # waiting for a free pooled connection
+    connect_timeout_ms          = 5000
+    socket_timeout_ms           = 60000    # default none: index builds and tools can run long
+    server_selection_timeout_ms = 5000
+    retry_writes                = true
+    retry_reads                 = true
+    write_concern               = "majority"          # or 1
+    journal                     = true
+    read_preference             = "primaryPreferred"  # sign-in must see the user's own writes
+    op_timeout_ms               = 3000
+
+`python -m tools.storage_check` runs the same conformance and throughput
+checks against both backends.
+"""
+
+import copy
+import json
+import os
+import queue
+import re
+import sqlite3
+import threading
+import uuid
+from contextlib import contextmanager, nullcontext
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from functools import cmp_to_key
+from typing import Any, Dict, Iterator, List, Mapping, Optional, Protocol, Sequence, Tuple, Union
+
+try:
+    from pymongo.errors import BulkWriteError, CollectionInvalid, DuplicateKeyError, OperationFailure
+except ImportError:                                  # SQLite-only installs
+    class OperationFailure(Exception):
+        def __init__(self, error: Any, code: Optional[int] = None, details: Optional[Dict] = None):
+            super().__init__(error)
+            self.code, self.details = code, details or {}
+
+    class DuplicateKeyError(OperationFailure):
+        pass
+
+    class BulkWriteError(OperationFailure):
+        def __init__(self, results: Dict[str, Any]):
+            super().__init__("batch op errors occurred", 65, results)
+
+    class CollectionInvalid(Exception):
+        pass
+
+BACKENDS             = ("mongo", "sqlite")
+DEFAULT_DB           = "spae_hub"
+DEFAULT_SQLITE_PATH  = os.path.join("data", "spae.db")
+DEFAULT_BUSY_TIMEOUT = 5.0
+POOL_SIZE            = 8
+SQLITE_URI_PREFIX    = "sqlite:///"
+DEFAULT_OP_TIMEOUT_S = 3.0
+
+# [mongo] key → MongoClient option. Unset keys keep the defaults below, then the driver's.
+MONGO_OPTIONS = {
+    "max_pool_size":               "maxPoolSize",
+    "min_pool_size":               "minPoolSize",
+    "max_idle_time_ms":            "maxIdleTimeMS",
+    "wait_queue_timeout_ms":       "waitQueueTimeoutMS",
+    "connect_timeout_ms":          "connectTimeoutMS",
+    "socket_timeout_ms":           "socketTimeoutMS",
+    "server_selection_timeout_ms": "serverSelectionTimeoutMS",
+    "retry_writes":                "retryWrites",
+    "retry_reads":                 "retryReads",
+    "write_concern":               "w",
+    "journal":                     "journal",
+    "read_preference":             "readPreference",
+    "app_name":                    "appname",
+}
+MONGO_DEFAULTS = {
+    "waitQueueTimeoutMS":       2000,
+    "connectTimeoutMS":         5000,
+    "serverSelectionTimeoutMS": 5000,
+    "retryWrites":              True,
+    "retryReads":               True,
+    "appname":                  "spae-onboarding-hub",
+}
+
+_NAME = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*$")
+
+
+class Collection(Protocol):
+    """What callers may use. pymongo's Collection has all of it; SQLiteCollection implements it."""
+    name: str
+    full_name: str
+    database: Any
+
+    def find_one(self, filter: Optional[Mapping] = None, projection: Any = None) -> Optional[Dict]: ...
+    def find(self, filter: Optional[Mapping] = None, projection: Any = None, batch_size: int = 0) -> Any: ...
+    def count_documents(self, filter: Mapping) -> int: ...
+    def insert_one(self, doc: Dict) -> Any: ...
+    def insert_many(self, docs: Sequence[Dict], ordered: bool = True) -> Any: ...
+    def update_one(self, filter: Mapping, update: Mapping, upsert: bool = False) -> Any: ...
+    def update_many(self, filter: Mapping, update: Mapping, upsert: bool = False) -> Any: ...
+    def replace_one(self, filter: Mapping, doc: Dict, upsert: bool = False) -> Any: ...
+    def delete_one(self, filter: Mapping) -> Any: ...
+    def find_one_and_update(self, filter: Mapping, update: Mapping, upsert: bool = False) -> Optional[Dict]: ...
+    def bulk_write(self, requests: Sequence[Any], ordered: bool = True) -> Any: ...
+    def create_index(self, keys: Any, **kwargs: Any) -> str: ...
+    def index_information(self) -> Dict[str, Dict]: ...
+
+
+def open_database(cfg: Mapping[str, Any], mongo: Mapping[str, Any], listeners: Sequence[Any] = ()):
+    """
+    The database `[storage]` selects: MongoDB (default) from `[mongo]`, or
+    SQLite at `path`. `listeners` are pymongo event listeners (PoolMetrics).
+    Raises (ImportError, connection errors, ValueError) if the backend can't
+    be opened — callers decide whether to run without one.
+    """
+    backend = str(cfg.get("backend", "mongo")).lower()
+    if backend not in BACKENDS:
+        raise ValueError(f"[storage] backend must be one of {', '.join(BACKENDS)}, got {backend!r}")
+    if backend == "sqlite":
+        return SQLiteDatabase(cfg.get("path", DEFAULT_SQLITE_PATH),
+                              busy_timeout=float(cfg.get("busy_timeout", DEFAULT_BUSY_TIMEOUT)))
+    from pymongo import MongoClient
+    client = MongoClient(mongo["uri"], event_listeners=list(listeners), **mongo_client_options(mongo))
+    client.admin.command("ping")
+    return client[mongo.get("db", DEFAULT_DB)]
+
+
+def open_uri(uri: str, db: Optional[str] = None):
+    """Tools: "sqlite:///path/to/file.db" or any MongoDB connection string."""
+    if uri.startswith(SQLITE_URI_PREFIX):
+        return open_database({"backend": "sqlite", "path": uri[len(SQLITE_URI_PREFIX):]}, {})
+    return open_database({"backend": "mongo"}, {"uri": uri, "db": db or DEFAULT_DB})
+
+
+# =============================================================================
+# MONGODB — pool, timeouts, per-operation deadlines, pool metrics
+# =============================================================================
+
+def mongo_client_options(mongo: Mapping[str, Any]) -> Dict[str, Any]:
+    """MongoClient keyword arguments from the [mongo] section."""
+    options = dict(MONGO_DEFAULTS)
+    options.update({opt: mongo[key] for key, opt in MONGO_OPTIONS.items() if key in mongo})
+    return options
+
+
+def op_timeout_s(mongo: Mapping[str, Any]) -> float:
+    """[mongo] op_timeout_ms in seconds; 0 disables the request-path deadline."""
+    return float(mongo.get("op_timeout_ms", DEFAULT_OP_TIMEOUT_S * 1000)) / 1000
+
+
+@contextmanager
+def deadline(seconds: float, metrics: Optional["PoolMetrics"] = None) -> Iterator[None]:
+    """
+    Every MongoDB operation in the block — server selection, pool wait,
+    retries and all — must finish within `seconds` in total, or raises a
+    PyMongoError whose `.timeout` is true (counted in `metrics`). SQLite
+    operations are bounded by its busy_timeout instead.
+    """
+    try:
+        import pymongo
+        from pymongo.errors import PyMongoError
+    except ImportError:
+        yield
+        return
+    try:
+        with pymongo.timeout(seconds) if seconds else nullcontext():
+            yield
+    except PyMongoError as e:
+        if metrics is not None and e.timeout:
+            metrics.operation_timed_out()
+        raise
+
+
+try:
+    from pymongo.monitoring import ConnectionPoolListener
+except ImportError:
+    ConnectionPoolListener = object
+
+
+class PoolMetrics(ConnectionPoolListener):
+    """Process-wide MongoDB pool counters, fed by the driver's connection-pool events."""
+
+    def __init__(self):
+        self._lock  = threading.Lock()
+        self.counts = {
+            "checkouts": 0, "waits": 0, "checkout_failures": 0, "pool_timeouts": 0,
+            "operation_timeouts": 0, "created": 0, "closed": 0, "pool_clears": 0,
+        }
+        self.in_use       = 0
+        self.peak_in_use  = 0
+        self.waiting      = 0
+        self.peak_waiting = 0
+        self.wait_s_total = 0.0
+        self.wait_s_max   = 0.0
+
+    def _add(self, key: str, n: int = 1) -> None:
+        with self._lock:
+            self.counts[key] += n
+
+    # ── pymongo ConnectionPoolListener ───────────────────────────────────────
+    def connection_check_out_started(self, event: Any) -> None:
+        with self._lock:
+            self.waiting     += 1
+            self.peak_waiting = max(self.peak_waiting, self.waiting)
+
+    def connection_checked_out(self, event: Any) -> None:
+        duration = getattr(event, "duration", 0.0) or 0.0
+        with self._lock:
+            self.waiting     -= 1
+            self.in_use      += 1
+            self.peak_in_use  = max(self.peak_in_use, self.in_use)
+            self.counts["checkouts"] += 1
+            if duration > 0.001:                        # had to wait for (or open) a connection
+                self.counts["waits"] += 1
+                self.wait_s_total += duration
+                self.wait_s_max    = max(self.wait_s_max, duration)
+
+    def connection_check_out_failed(self, event: Any) -> None:
+        with self._lock:
+            self.waiting -= 1
+            self.counts["checkout_failures"] += 1
+            if event.reason == "timeout":
+                self.counts["pool_timeouts"] += 1
+
+    def connection_checked_in(self, event: Any) -> None:
+        with self._lock:
+            self.in_use -= 1
+
+    def connection_created(self, event: Any) -> None:
+        self._add("created")
+
+    def connection_closed(self, event: Any) -> None:
+        self._add("closed")
+
+    def pool_cleared(self, event: Any) -> None:
+        self._add("pool_clears")
+
+    def pool_created(self, event: Any) -> None:
+        pass
+
+    def pool_ready(self, event: Any) -> None:
+        pass
+
+    def pool_closed(self, event: Any) -> None:
+        pass
+
+    def connection_ready(self, event: Any) -> None:
+        pass
+
+    def operation_timed_out(self) -> None:
+        self._add("operation_timeouts")
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            waits = self.counts["waits"]
+            return {
+                **self.counts,
+                "in_use":       self.in_use,
+                "peak_in_use":  self.peak_in_use,
+                "waiting":      self.waiting,
+                "peak_waiting": self.peak_waiting,
+                "wait_ms_avg":  round(1000 * self.wait_s_total / waits, 1) if waits else 0.0,
+                "wait_ms_max":  round(1000 * self.wait_s_max, 1),
+            }
+
+
+# =============================================================================
+# DOCUMENTS — JSON encoding, dotted paths, MongoDB's ordering
+# =============================================================================
+
+_MISSING = object()
+
+
+def _naive_utc(value: Any) -> Any:
+    """MongoDB keeps datetimes in UTC and returns them naive; aware ones are converted."""
+    if isinstance(value, datetime) and value.tzinfo is not None:
+        return value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+def _json_default(obj: Any) -> Any:
+    if isinstance(obj, datetime):
+        return {"$date": _naive_utc(obj).isoformat()}
+    raise TypeError(f"cannot store {type(obj).__name__} (MongoDB can't either)")
+
+
+def _json_hook(obj: Dict[str, Any]) -> Any:
+    if len(obj) == 1 and "$date" in obj:
+        return datetime.fromisoformat(obj["$date"])
+    return obj
+
+
+def encode(doc: Any) -> str:
+    return json.dumps(doc, default=_json_default, ensure_ascii=False, separators=(",", ":"))
+
+
+def decode(text: str) -> Any:
+    return json.loads(text, object_hook=_json_hook)
+
+
+def _values(doc: Any, path: str) -> List[Any]:
+    """Every value at a dotted path, descending into arrays like MongoDB does."""
+    current = [doc]
+    for part in path.split("."):
+        nxt = []
+        for value in current:
+            if isinstance(value, dict):
+                if part in value:
+                    nxt.append(value[part])
+            elif isinstance(value, list):
+                if part.isdigit() and int(part) < len(value):
+                    nxt.append(value[int(part)])
+                else:
+                    nxt.extend(v[part] for v in value if isinstance(v, dict) and part in v)
+        current = nxt
+    return current
+
+
+def _set_path(doc: Dict, path: str, value: Any) -> None:
+    *parents, last = path.split(".")
+    for part in parents:
+        doc = doc.setdefault(part, {})
+        if not isinstance(doc, dict):
+            raise OperationFailure(f"cannot create field {part!r} in element of {path!r}")
+    doc[last] = value
+
+
+def _unset_path(doc: Dict, path: str) -> None:
+    *parents, last = path.split(".")
+    for part in parents:
+        doc = doc.get(part)
+        if not isinstance(doc, dict):
+            return
+    doc.pop(last, None)
+
+
+def _bracket(value: Any) -> int:
+    """MongoDB's cross-type sort order; values only compare within a bracket."""
+    if value is None or value is _MISSING:
+        return 1
+    if isinstance(value, bool):
+        return 8
+    if isinstance(value, (int, float)):
+        return 2
+    if isinstance(value, str):
+        return 3
+    if isinstance(value, dict):
+        return 4
+    if isinstance(value, list):
+        return 5
+    if isinstance(value, datetime):
+        return 9
+    return 10
+
+
+def _compare(a: Any, b: Any) -> int:
+    ra, rb = _bracket(a), _bracket(b)
+    if ra != rb:
+        return -1 if ra < rb else 1
+    if ra in (4, 5):
+        a, b = encode(a), encode(b)
+    elif ra == 1:
+        return 0
+    elif ra == 9:
+        a, b = _naive_utc(a), _naive_utc(b)
+    return (a > b) - (a < b)
+
+
+def _equal(a: Any, b: Any) -> bool:
+    return _bracket(a) == _bracket(b) and _naive_utc(a) == _naive_utc(b)
+
+
+# =============================================================================
+# MATCHING
+# =============================================================================
+
+_TYPES = {
+    "double": (float,), "int": (int,), "long": (int,), "number": (int, float), "decimal": (float,),
+    "string": (str,), "object": (dict,), "array": (list,), "bool": (bool,), "date": (datetime,),
+}
+
+
+def _is_type(value: Any, name: Union[str, int]) -> bool:
+    if name == "null":
+        return value is None
+    kinds = _TYPES.get(name)
+    if kinds is None:
+        raise OperationFailure(f"unsupported $type {name!r}")
+    if isinstance(value, bool):
+        return name == "bool"
+    return isinstance(value, kinds)
+
+
+def _candidates(values: List[Any]) -> List[Any]:
+    """A field that holds an array matches on the array and on each element."""
+    out = []
+    for v in values:
+        out.append(v)
+        if isinstance(v, list):
+            out.extend(v)
+    return out
+
+
+def _op(values: List[Any], op: str, arg: Any) -> bool:
+    cands = _candidates(values)
+    if op == "$eq":
+        if arg is None:
+            return not values or any(v is None for v in cands)
+        return any(_equal(v, arg) for v in cands)
+    if op == "$ne":
+        return not _op(values, "$eq", arg)
+    if op in ("$gt", "$gte", "$lt", "$lte"):
+        want = {"$gt": (1,), "$gte": (0, 1), "$lt": (-1,), "$lte": (-1, 0)}[op]
+        return any(_bracket(v) == _bracket(arg) and _compare(v, arg) in want for v in cands)
+    if op == "$in":
+        return any(_op(values, "$eq", a) for a in arg)
+    if op == "$nin":
+        return not _op(values, "$in", arg)
+    if op == "$exists":
+        return bool(values) == bool(arg)
+    if op == "$type":
+        names = arg if isinstance(arg, list) else [arg]
+        return any(_is_type(v, n) for v in cands for n in names)
+    if op == "$not":
+        return not _match_field(values, arg)
+    raise OperationFailure(f"unsupported query operator {op}")
+
+
+def _is_operator_doc(cond: Any) -> bool:
+    return isinstance(cond, dict) and bool(cond) and all(k.startswith("$") for k in cond)
+
+
+def _match_field(values: List[Any], cond: Any) -> bool:
+    if _is_operator_doc(cond):
+        return all(_op(values, op, arg) for op, arg in cond.items())
+    return _op(values, "$eq", cond)
+
+
+def matches(doc: Mapping[str, Any], filter: Optional[Mapping[str, Any]]) -> bool:
+    for key, cond in (filter or {}).items():
+        if key == "$and":
+            ok = all(matches(doc, f) for f in cond)
+        elif key == "$or":
+            ok = any(matches(doc, f) for f in cond)
+        elif key == "$nor":
+            ok = not any(matches(doc, f) for f in cond)
+        elif key.startswith("$"):
+            raise OperationFailure(f"unsupported query operator {key}")
+        else:
+            ok = _match_field(_values(doc, key), cond)
+        if not ok:
+            return False
+    return True
+
+
+# =============================================================================
+# UPDATES & PROJECTIONS
+# =============================================================================
+
+def apply_update(doc: Dict[str, Any], update: Mapping[str, Any], inserting: bool = False) -> Dict[str, Any]:
+    """A new document with `update` applied (operators only — use replace_one to replace)."""
+    if not update or not all(k.startswith("$") for k in update):
+        raise ValueError("update only works with $ operators")
+    out = copy.deepcopy(doc)
+    for op, fields in update.items():
+        if op == "$setOnInsert" and not inserting:
+            continue
+        for path, value in fields.items():
+            if path == "_id" and op != "$setOnInsert" and value != out.get("_id"):
+                raise OperationFailure("the _id field cannot be changed")
+            if op in ("$set", "$setOnInsert"):
+                _set_path(out, path, copy.deepcopy(value))
+            elif op == "$unset":
+                _unset_path(out, path)
+            elif op == "$inc":
+                found = _values(out, path)
+                _set_path(out, path, (found[0] if found else 0) + value)
+            else:
+                raise OperationFailure(f"unsupported update operator {op}")
+    return out
+
+
+def _upsert_base(filter: Mapping[str, Any]) -> Dict[str, Any]:
+    """The document an upsert starts from: the filter's plain equality fields."""
+    base: Dict[str, Any] = {}
+    for key, cond in filter.items():
+        if key.startswith("$"):
+            continue
+        if _is_operator_doc(cond):
+            if "$eq" in cond:
+                _set_path(base, key, cond["$eq"])
+            continue
+        _set_path(base, key, copy.deepcopy(cond))
+    return base
+
+
+def project(doc: Dict[str, Any], projection: Any) -> Dict[str, Any]:
+    if not projection:
+        return doc
+    if isinstance(projection, (list, tuple)):
+        projection = {f: 1 for f in projection}
+    keep_id = projection.get("_id", 1)
+    fields  = {k: v for k, v in projection.items() if k != "_id"}
+    if any(fields.values()):
+        out: Dict[str, Any] = {}
+        for path in (k for k, v in fields.items() if v):
+            found = _values(doc, path)
+            if found and "." not in path:
+                out[path] = found[0]
+            elif found:
+                _set_path(out, path, found[0])
+    else:
+        out = copy.deepcopy(doc)
+        for path in fields:
+            _unset_path(out, path)
+    if keep_id and "_id" in doc:
+        out = {"_id": doc["_id"], **out}
+    else:
+        out.pop("_id", None)
+    return out
+
+
+def _sort_docs(docs: List[Dict], keys: List[Tuple[str, int]]) -> List[Dict]:
+    def cmp(a: Dict, b: Dict) -> int:
+        for path, direction in keys:
+            va, vb = _values(a, path), _values(b, path)
+            c = _compare(va[0] if va else None, vb[0] if vb else None)
+            if c:
+                return c if direction >= 0 else -c
+        return 0
+    return sorted(docs, key=cmp_to_key(cmp))
+
+
+# =============================================================================
+# SQLITE
+# =============================================================================
+
+@dataclass
+class Result:
+    """Covers pymongo's Insert/Update/Delete/BulkWrite results (the counts callers read)."""
+    matched_count:  int = 0
+    modified_count: int = 0
+    inserted_count: int = 0
+    deleted_count:  int = 0
+    upserted_count: int = 0
+    upserted_id:    Any = None
+    inserted_id:    Any = None
+    inserted_ids:   List[Any] = field(default_factory=list)
+    acknowledged:   bool = True
+
+
+def _normalise_keys(keys: Any, direction: int = 1) -> List[Tuple[str, int]]:
+    if isinstance(keys, str):
+        return [(keys, direction)]
+    return [(k, d) for k, d in keys]
+
+
+class _BatchErrors:
+    """Per-request failures inside one batch, in the shape of pymongo's BulkWriteError.details."""
+
+    def __init__(self, conn: sqlite3.Connection, ordered: bool):
+        self.conn    = conn
+        self.ordered = ordered
+        self.stop    = False
+        self.write_errors: List[Dict[str, Any]] = []
+        self.totals: Dict[str, int] = {}
+
+    @contextmanager
+    def at(self, index: int) -> Iterator[None]:
+        self.conn.execute("SAVEPOINT request")
+        try:
+            yield
+        except OperationFailure as e:
+            self.conn.execute("ROLLBACK TO request")
+            self.write_errors.append({"index": index, "code": getattr(e, "code", None) or 2, "errmsg": str(e)})
+            self.stop = self.ordered
+        self.conn.execute("RELEASE request")
+
+
+class SQLiteCursor:
+    """Lazy result of find(): rows stream in `batch_size` chunks unless a sort needs them all."""
+
+    def __init__(self, collection: "SQLiteCollection", filter: Optional[Mapping], projection: Any, batch_size: int):
+        self._col        = collection
+        self._filter     = dict(filter or {})
+        self._projection = projection
+        self._batch_size = batch_size or 500
+        self._sort: List[Tuple[str, int]] = []
+        self._limit      = 0
+        self._skip       = 0
+        self._iter: Optional[Iterator[Dict]] = None
+
+    def sort(self, key: Any, direction: int = 1) -> "SQLiteCursor":
+        self._sort = _normalise_keys(key, direction)
+        return self
+
+    def limit(self, n: int) -> "SQLiteCursor":
+        self._limit = n
+        return self
+
+    def skip(self, n: int) -> "SQLiteCursor":
+        self._skip = n
+        return self
+
+    def batch_size(self, n: int) -> "SQLiteCursor":
+        self._batch_size = n
+        return self
+
+    def _generate(self) -> Iterator[Dict]:
+        order_by_id = self._sort in ([("_id", 1)], [("_id", -1)])
+        rows = self._col._scan(self._filter, self._batch_size,
+                               order=("DESC" if self._sort[0][1] < 0 else "ASC") if order_by_id else None)
+        if self._sort and not order_by_id:
+            rows = iter(_sort_docs(list(rows), self._sort))
+        served = skipped = 0
+        for doc in rows:
+            if skipped < self._skip:
+                skipped += 1
+                continue
+            if self._limit and served >= self._limit:
+                break
+            served += 1
+            yield project(doc, self._projection)
+
+    def __iter__(self) -> Iterator[Dict]:
+        if self._iter is None:
+            self._iter = self._generate()
+        return self._iter
+
+    def __next__(self) -> Dict:
+        return next(iter(self))
+
+    def close(self) -> None:
+        if self._iter is not None:
+            self._iter.close()
+
+
+class SQLiteCollection:
+    def __init__(self, database: "SQLiteDatabase", name: str):
+        if not _NAME.match(name):
+            raise ValueError(f"invalid collection name {name!r}")
+        self.database  = database
+        self.name      = name
+        self.full_name = f"{database.name}.{name}"
+        self._table    = f'"c_{name}"'
+        database._ensure_table(self._table)
+
+    # ── Reads ────────────────────────────────────────────────────────────────
+    def _id_clause(self, filter: Mapping[str, Any]) -> Tuple[str, List[Any]]:
+        """Push _id conditions down to the primary key; everything is re-checked in Python."""
+        cond = filter.get("_id", _MISSING)
+        if cond is _MISSING:
+            return "", []
+        if not _is_operator_doc(cond):
+            return " WHERE _id = ?", [encode(cond)]
+        if "$in" in cond and len(cond) == 1:
+            ids = list(cond["$in"])
+            return f" WHERE _id IN ({','.join('?' * len(ids))})", [encode(i) for i in ids] if ids else ["\0"]
+        for op, sql in (("$gt", ">"), ("$gte", ">=")):
+            if op in cond and isinstance(cond[op], str):
+                return f" WHERE _id {sql} ?", [encode(cond[op])]
+        return "", []
+
+    def _scan(self, filter: Mapping[str, Any], batch_size: int = 500, order: Optional[str] = None) -> Iterator[Dict]:
+        where, params = self._id_clause(filter)
+        sql = f"SELECT doc FROM {self._table}{where}" + (f" ORDER BY _id {order}" if order else "")
+        with self.database._connection() as conn:
+            cur = conn.execute(sql, params)
+            try:
+                while True:
+                    rows = cur.fetchmany(batch_size)
+                    if not rows:
+                        return
+                    for (text,) in rows:
+                        doc = decode(text)
+                        if matches(doc, filter):
+                            yield doc
+            finally:
+                cur.close()
+
+    def find(self, filter: Optional[Mapping] = None, projection: Any = None, batch_size: int = 0, **_: Any) -> SQLiteCursor:
+        return SQLiteCursor(self, filter, projection, batch_size)
+
+    def find_one(self, filter: Optional[Mapping] = None, projection: Any = None, **_: Any) -> Optional[Dict]:
+        if filter is not None and not isinstance(filter, Mapping):
+            filter = {"_id": filter}
+        for doc in self._scan(filter or {}, batch_size=50):
+            return project(doc, projection)
+        return None
+
+    def count_documents(self, filter: Mapping) -> int:
+        return sum(1 for _ in self._scan(filter))
+
+    # ── Writes (each public call is one transaction) ─────────────────────────
+    def _insert(self, conn: sqlite3.Connection, doc: Dict) -> Any:
+        doc = dict(doc)
+        doc.setdefault("_id", uuid.uuid4().hex)
+        try:
+            conn.execute(f"INSERT INTO {self._table} (_id, doc) VALUES (?, ?)", (encode(doc["_id"]), encode(doc)))
+        except sqlite3.IntegrityError:
+            raise DuplicateKeyError(f"E11000 duplicate key error collection: {self.full_name} _id: {doc['_id']!r}", 11000)
+        return doc["_id"]
+
+    def _write(self, conn: sqlite3.Connection, doc: Dict) -> None:
+        conn.execute(f"UPDATE {self._table} SET doc = ? WHERE _id = ?", (encode(doc), encode(doc["_id"])))
+
+    def _candidates(self, conn: sqlite3.Connection, filter: Mapping, many: bool) -> List[Dict]:
+        where, params = self._id_clause(filter)
+        out = []
+        for (text,) in conn.execute(f"SELECT doc FROM {self._table}{where}", params):
+            doc = decode(text)
+            if matches(doc, filter):
+                out.append(doc)
+                if not many:
+                    break
+        return out
+
+    def _update(self, conn: sqlite3.Connection, filter: Mapping, update: Mapping, upsert: bool, many: bool,
+                replace: bool = False) -> Result:
+        result = Result()
+        for doc in self._candidates(conn, filter, many):
+            if replace:
+                new = {"_id": doc["_id"], **{k: v for k, v in update.items() if k != "_id"}}
+            else:
+                new = apply_update(doc, update)
+            result.matched_count += 1
+            if new != doc:
+                self._write(conn, new)
+                result.modified_count += 1
+        if not result.matched_count and upsert:
+            base = _upsert_base(filter)
+            new  = {**base, **update} if replace else apply_update(base, update, inserting=True)
+            result.upserted_id    = self._insert(conn, new)
+            result.upserted_count = 1
+        return result
+
+    def insert_one(self, doc: Dict) -> Result:
+        with self.database._transaction() as conn:
+            return Result(inserted_id=self._insert(conn, doc), inserted_count=1)
+
+    def insert_many(self, docs: Sequence[Dict], ordered: bool = True) -> Result:
+        result = Result()
+        with self._batch(ordered) as errors:
+            for i, doc in enumerate(docs):
+                with errors.at(i):
+                    result.inserted_ids.append(self._insert(errors.conn, doc))
+                if errors.stop:
+                    break
+            errors.totals = {"nInserted": len(result.inserted_ids)}
+        result.inserted_count = len(result.inserted_ids)
+        return result
+
+    def update_one(self, filter: Mapping, update: Mapping, upsert: bool = False) -> Result:
+        with self.database._transaction() as conn:
+            return self._update(conn, filter, update, upsert, many=False)
+
+    def update_many(self, filter: Mapping, update: Mapping, upsert: bool = False) -> Result:
+        with self.database._transaction() as conn:
+            return self._update(conn, filter, update, upsert, many=True)
+
+    def replace_one(self, filter: Mapping, doc: Dict, upsert: bool = False) -> Result:
+        with self.database._transaction() as conn:
+            return self._update(conn, filter, doc, upsert, many=False, replace=True)
+
+    def _delete(self, conn: sqlite3.Connection, filter: Mapping, many: bool) -> int:
+        docs = self._candidates(conn, filter, many)
+        conn.executemany(f"DELETE FROM {self._table} WHERE _id = ?", [(encode(d["_id"]),) for d in docs])
+        return len(docs)
+
+    def delete_one(self, filter: Mapping) -> Result:
+        with self.database._transaction() as conn:
+            return Result(deleted_count=self._delete(conn, filter, many=False))
+
+    def delete_many(self, filter: Mapping) -> Result:
+        with self.database._transaction() as conn:
+            return Result(deleted_count=self._delete(conn, filter, many=True))
+
+    def find_one_and_update(self, filter: Mapping, update: Mapping, upsert: bool = False,
+                            projection: Any = None, **_: Any) -> Optional[Dict]:
+        """Returns the document as it was before the update, like pymongo's default."""
+        with self.database._transaction() as conn:
+            found = self._candidates(conn, filter, many=False)
+            self._update(conn, filter, update, upsert, many=False)
+        return project(found[0], projection) if found else None
+
+    def bulk_write(self, requests: Sequence[Any], ordered: bool = True) -> Result:
+        """pymongo request objects (UpdateOne, InsertOne, …), all in one transaction."""
+        total = Result()
+        with self._batch(ordered) as errors:
+            conn = errors.conn
+            for i, req in enumerate(requests):
+                kind = type(req).__name__
+                with errors.at(i):
+                    if kind == "InsertOne":
+                        self._insert(conn, req._doc)
+                        total.inserted_count += 1
+                    elif kind in ("DeleteOne", "DeleteMany"):
+                        total.deleted_count += self._delete(conn, req._filter, many=(kind == "DeleteMany"))
+                    elif kind in ("UpdateOne", "UpdateMany", "ReplaceOne"):
+                        r = self._update(conn, req._filter, req._doc, bool(req._upsert),
+                                         many=(kind == "UpdateMany"), replace=(kind == "ReplaceOne"))
+                        total.matched_count  += r.matched_count
+                        total.modified_count += r.modified_count
+                        total.upserted_count += r.upserted_count
+                    else:
+                        raise OperationFailure(f"unsupported bulk request {kind}")
+                if errors.stop:
+                    break
+            errors.totals = {
+                "nInserted": total.inserted_count, "nUpserted": total.upserted_count,
+                "nMatched":  total.matched_count,  "nModified": total.modified_count,
+                "nRemoved":  total.deleted_count,
+            }
+        return total
+
+    @contextmanager
+    def _batch(self, ordered: bool) -> Iterator["_BatchErrors"]:
+        """
+        One transaction for a whole batch. As with MongoDB, the requests that
+        succeed are kept and the failures raise BulkWriteError afterwards
+        (an ordered batch stops at the first one).
+        """
+        with self.database._transaction() as conn:
+            errors = _BatchErrors(conn, ordered)
+            yield errors
+        if errors.write_errors:
+            raise BulkWriteError({"writeErrors": errors.write_errors, **errors.totals})
+
+    # ── Indexes ──────────────────────────────────────────────────────────────
+    def create_index(self, keys: Any, **kwargs: Any) -> str:
+        """Recorded so index_information() matches MongoDB's; only _id is an actual SQLite index."""
+        keys = _normalise_keys(keys)
+        name = kwargs.pop("name", None) or "_".join(f"{k}_{d}" for k, d in keys)
+        spec = {"key": keys, **{k: v for k, v in kwargs.items() if k != "background"}}
+        with self.database._transaction() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO _indexes (collection, name, spec) VALUES (?, ?, ?)",
+                (self.name, name, encode(spec)),
+            )
+        return name
+
+    def index_information(self) -> Dict[str, Dict]:
+        info = {"_id_": {"key": [("_id", 1)]}}
+        with self.database._connection() as conn:
+            for name, spec in conn.execute("SELECT name, spec FROM _indexes WHERE collection = ?", (self.name,)):
+                spec = decode(spec)
+                spec["key"] = [tuple(k) for k in spec["key"]]
+                info[name] = spec
+        return info
+
+    def drop(self) -> None:
+        self.database.drop_collection(self.name)
+
+
+class SQLiteDatabase:
+    """A SQLite file standing in for a MongoDB database: collection name → table."""
+
+    def __init__(self, path: str, busy_timeout: float = DEFAULT_BUSY_TIMEOUT, pool_size: int = POOL_SIZE):
+        self.path         = path
+        self.name         = os.path.splitext(os.path.basename(path))[0] or DEFAULT_DB
+        self.busy_timeout = busy_timeout
+        self._pool: "queue.LifoQueue[sqlite3.Connection]" = queue.LifoQueue(maxsize=pool_size)
+        self._tables: set = set()
+        self._lock        = threading.Lock()
+        if path != ":memory:" and os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        with self._transaction() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS _indexes "
+                "(collection TEXT NOT NULL, name TEXT NOT NULL, spec TEXT NOT NULL, PRIMARY KEY (collection, name))"
+            )
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=self.busy_timeout, isolation_level=None,
+                               check_same_thread=False, cached_statements=256)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    @contextmanager
+    def _connection(self) -> Iterator[sqlite3.Connection]:
+        """A pooled connection for this block; one per thread at a time, never shared."""
+        try:
+            conn = self._pool.get_nowait()
+        except queue.Empty:
+            conn = self._connect()
+        try:
+            yield conn
+        finally:
+            if conn.in_transaction:
+                conn.rollback()
+            try:
+                self._pool.put_nowait(conn)
+            except queue.Full:
+                conn.close()
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        with self._connection() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield conn
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            conn.execute("COMMIT")
+
+    def _ensure_table(self, table: str) -> None:
+        if table in self._tables:
+            return
+        with self._lock, self._transaction() as conn:
+            conn.execute(f"CREATE TABLE IF NOT EXISTS {table} (_id TEXT PRIMARY KEY, doc TEXT NOT NULL) WITHOUT ROWID")
+            self._tables.add(table)
+
+    def __getitem__(self, name: str) -> SQLiteCollection:
+        return SQLiteCollection(self, name)
+
+    def __getattr__(self, name: str) -> SQLiteCollection:
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return self[name]
+
+    def get_collection(self, name: str) -> SQLiteCollection:
+        return self[name]
+
+    def list_collection_names(self) -> List[str]:
+        with self._connection() as conn:
+            rows = conn.execute("SELECT name FROM sqlite_master WHERE type = 'table' AND name LIKE 'c\\_%' ESCAPE '\\'")
+            return [r[0][2:] for r in rows]
+
+    def create_collection(self, name: str, **kwargs: Any) -> SQLiteCollection:
+        if kwargs.get("timeseries"):
+            raise OperationFailure("time-series collections need MongoDB")
+        if name in self.list_collection_names():
+            raise CollectionInvalid(f"collection {name} already exists")
+        return self[name]
+
+    def drop_collection(self, name: str) -> None:
+        with self._transaction() as conn:
+            conn.execute(f'DROP TABLE IF EXISTS "c_{name}"')
+            conn.execute("DELETE FROM _indexes WHERE collection = ?", (name,))
+        self._tables.discard(f'"c_{name}"')
+
+    def command(self, name: str, *args: Any, **kwargs: Any) -> Dict[str, Any]:
+        if name != "ping":
+            raise OperationFailure(f"unsupported command {name!r}")
+        with self._connection() as conn:
+            conn.execute("SELECT 1")
+        return {"ok": 1.0}
@@ -0,0 +1,66 @@
+"""
+templates.py — Compiled, Auto-Escaped HTML Fragments
+=====================================================
+The HTML the app draws with st.markdown(unsafe_allow_html=True) — hero card,
+sidebar profile, days counter, badge cards, checklist tips, the certificate —
+lives in templates/*.html as Jinja2 templates:
+
+  • every template is compiled once per process, when this module is first
+    used, so a typo fails at startup rather than on the page that uses it;
+  • autoescaping is on, so names, emails and content text can't inject
+    markup; values that are already HTML (font CSS) are wrapped in Markup;
+  • rendered fragments are memoised by template and inputs, so a rerun that
+    draws the same card again gets the same string back without rendering.
+
+Identical fragments also mean identical messages to the browser, which
+Streamlit's forward-message cache (`[global] minCachedMessageSize` in
+config.toml) then sends as a short reference instead of the markup.
+
+    from services import templates
+    st.markdown(templates.render("hero.html", user_name=name, ...), unsafe_allow_html=True)
+"""
+
+import os
+from functools import lru_cache
+from typing import Any, Dict, Tuple
+
+from jinja2 import Environment, FileSystemLoader, StrictUndefined, Template, select_autoescape
+
+REPO_ROOT          = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+TEMPLATE_DIR       = os.path.join(REPO_ROOT, "templates")
+DEFAULT_CACHE_SIZE = 2048
+
+
+class TemplateSet:
+    """Every template in `directory`, compiled up front, with a memo of rendered fragments."""
+
+    def __init__(self, directory: str = TEMPLATE_DIR, cache_size: int = DEFAULT_CACHE_SIZE):
+        env = Environment(
+            loader=FileSystemLoader(directory),
+            autoescape=select_autoescape(["html"]),
+            undefined=StrictUndefined,
+            trim_blocks=True,
+            lstrip_blocks=True,
+            auto_reload=False,
+        )
+        self._templates: Dict[str, Template] = {name: env.get_template(name) for name in env.list_templates()}
+        self._render = lru_cache(maxsize=cache_size)(self._render_uncached)
+
+    def _render_uncached(self, name: str, items: Tuple[Tuple[str, Any], ...]) -> str:
+        return self._templates[name].render(dict(items))
+
+    def render(self, template: str, /, **context: Any) -> str:
+        """Render `template` with `context` (hashable values only), or return the memoised result."""
+        return self._render(template, tuple(sorted(context.items())))
+
+    def cache_info(self):
+        return self._render.cache_info()
+
+
+@lru_cache(maxsize=1)
+def default() -> TemplateSet:
+    return TemplateSet()
+
+
+def render(template: str, /, **context: Any) -> str:
+    return default().render(template, **context)
@@ -0,0 +1,96 @@
+"""
+theme.py — Global Stylesheet, Precompiled from the Theme
+=========================================================
+templates/global.css is filled in with the colours from config.toml's
+[theme] (as Streamlit loaded it) and minified once per process. Only the
+configured base (light or dark) is built: the server can't see a theme the
+user picks in the browser's settings menu, so that is the one every
+session gets; colours config.toml leaves unset come from Streamlit's own
+palette for that base.
+
+The stylesheet reaches the browser once per session rather than once per
+rerun. `loader_html` is a zero-height component whose script copies the CSS
+into the page's <head> under STYLE_ID; reruns never touch <head>, so the app
+only sends it again for a new session (a refresh), and a second copy is
+never added. A <link> to a static .css file would be nicer, but Streamlit's
+static handler serves .css as text/plain with nosniff, which browsers refuse.
+"""
+
+import json
+import re
+from dataclasses import dataclass
+from typing import Dict, Mapping, Optional
+
+from services import templates
+
+STYLE_ID   = "spae-global-css"
+THEME_KEYS = ("base", "primaryColor", "backgroundColor", "secondaryBackgroundColor", "textColor")
+
+# Streamlit's built-in palettes, used for whatever config.toml leaves unset
+STREAMLIT_THEMES: Dict[str, Dict[str, str]] = {
+    "light": {"primaryColor": "#ff4b4b", "backgroundColor": "#ffffff",
+              "secondaryBackgroundColor": "#f0f2f6", "textColor": "#31333f"},
+    "dark":  {"primaryColor": "#ff4b4b", "backgroundColor": "#0e1117",
+              "secondaryBackgroundColor": "#262730", "textColor": "#fafafa"},
+}
+
+_COMMENT = re.compile(r"/\*.*?\*/", re.S)
+_SPACE   = re.compile(r"\s+")
+_PUNCT   = re.compile(r"\s*([{};,])\s*")
+
+
+def minify_css(css: str) -> str:
+    css = _SPACE.sub(" ", _COMMENT.sub("", css))
+    return _PUNCT.sub(r"\1", css).replace(";}", "}").strip()
+
+
+def _is_dark(colour: Optional[str]) -> bool:
+    if not colour or not re.fullmatch(r"#[0-9a-fA-F]{6}", colour):
+        return False
+    r, g, b = (int(colour[i:i + 2], 16) for i in (1, 3, 5))
+    return 0.299 * r + 0.587 * g + 0.114 * b < 128
+
+
+def configured_base(theme: Mapping[str, Optional[str]]) -> str:
+    """The base of the config.toml theme: `base` if set, else judged from backgroundColor."""
+    if theme.get("base") in STREAMLIT_THEMES:
+        return theme["base"]
+    return "dark" if _is_dark(theme.get("backgroundColor")) else "light"
+
+
+def palette(theme: Mapping[str, Optional[str]], base: str) -> Dict[str, str]:
+    colours = dict(STREAMLIT_THEMES[base])
+    colours.update({k: v for k, v in theme.items() if k in colours and v})
+    return colours
+
+
+@dataclass(frozen=True)
+class ThemeCSS:
+    css:  str                                # minified stylesheet
+    base: str
+
+
+def compile_theme(theme: Mapping[str, Optional[str]], font_css: str = "") -> ThemeCSS:
+    base    = configured_base(theme)
+    colours = palette(theme, base)
+    return ThemeCSS(
+        css=minify_css(templates.render(
+            "global.css",
+            font_css=font_css,
+            primary=colours["primaryColor"],
+            secondary_background=colours["secondaryBackgroundColor"],
+        )),
+        base=base,
+    )
+
+
+def loader_html(css: str) -> str:
+    """A component body that puts `css` into the parent page's <head>, once."""
+    payload = json.dumps(css).replace("</", "<\\/")
+    return (
+        "<script>(function(){"
+        "var d=window.parent.document,s=d.getElementById('" + STYLE_ID + "');"
+        "if(!s){s=d.createElement('style');s.id='" + STYLE_ID + "';d.head.appendChild(s);}"
+        "s.textContent=" + payload + ";"
+        "})();</script>"
+    )
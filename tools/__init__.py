@@ -0,0 +1,8 @@
+"""
+SPAE Onboarding Hub — Operational Tools
+========================================
+Command-line tools that run alongside the app, never inside it.
+Run each one as a module from the repository root, e.g.:
+
+    python -m tools.loadtest --help
+"""
@@ -0,0 +1,53 @@
+"""
+analytics.py — Refresh Time-to-Complete Statistics
+===================================================
+Folds new completion events into the per-task, per-course and per-phase day
+histograms the app reads for "ahead of X% of peers" (see
+services/analytics.py). Each run picks up where the last one stopped, so it
+is safe to run from cron or keep running with --loop.
+
+    python -m tools.analytics
+    python -m tools.analytics --loop 900
+"""
+
+import argparse
+import sys
+import time
+from typing import List, Optional
+
+from services.analytics import DEFAULT_LAG_S, STATS_COLLECTION, update_stats
+from services.content_bundle import ContentSources, compile_bundle
+from tools.common import read_secrets, users_collection
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    p = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    p.add_argument("--loop",      type=float, metavar="SECONDS", help="keep running, one pass every SECONDS")
+    p.add_argument("--lag",       type=float, default=DEFAULT_LAG_S,
+                   help="leave events younger than this many seconds for the next pass")
+    p.add_argument("--events",    help="events collection (defaults to [events] collection or 'events')")
+    p.add_argument("--stats",     default=STATS_COLLECTION, help="statistics collection")
+    p.add_argument("--mongo-uri", help="defaults to MONGO_URI or [mongo] uri in secrets.toml")
+    p.add_argument("--db",        help="defaults to [mongo] db in secrets.toml")
+    args = p.parse_args(argv)
+
+    secrets = read_secrets()
+    events  = args.events or secrets.get("events", {}).get("collection", "events")
+    db      = users_collection(args.mongo_uri, args.db).database
+
+    while True:
+        bundle = compile_bundle(version=0, sources=ContentSources.from_config(secrets.get("content", {})))
+        start  = time.perf_counter()
+        result = update_stats(db, bundle, events=events, stats=args.stats, lag_s=args.lag)
+        print(
+            f"✓ {result['events']:,} new completion event(s) → {result['items']} distribution(s) "
+            f"updated in {time.perf_counter() - start:.2f} s",
+            file=sys.stderr,
+        )
+        if not args.loop:
+            return 0
+        time.sleep(args.loop)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,202 @@
+"""
+assets.py — Build the Self-Hosted Fonts & Images
+=================================================
+Fetches the web fonts and every THEME_IMAGES source once, resizes and
+compresses the images into WebP variants, and writes everything to `static/`
+under content-hashed names with a manifest the app reads
+(services/assets.py). Run it wherever there is internet — a laptop, or the
+build stage in azure-pipelines.yml — and the running app never has to.
+
+    python -m tools.assets
+    python -m tools.assets --offline        # rebuild from .cache/assets only
+    python -m tools.assets --subsets latin,latin-ext
+
+Downloads are kept in .cache/assets, so a rebuild only fetches what's new.
+A THEME_IMAGES entry can also be a path relative to the repo
+("content/images/spe.jpg") for images that never lived on the web.
+Files in static/fonts and static/img the new manifest doesn't use are removed.
+"""
+
+import argparse
+import hashlib
+import io
+import os
+import re
+import sys
+import urllib.request
+from typing import Any, Dict, List, Optional, Tuple
+
+from services.assets import FONTS, IMAGE_QUALITY, IMAGE_WIDTHS, STATIC_DIR, google_fonts_url, write_manifest
+from services.content_bundle import ContentSources, compile_bundle
+from tools.common import REPO_ROOT, read_secrets
+
+CACHE_DIR = os.path.join(REPO_ROOT, ".cache", "assets")
+
+# Google Fonts serves woff2 only to browsers it recognises
+USER_AGENT = (
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+    "(KHTML, like Gecko) Chrome/126.0 Safari/537.36"
+)
+
+_FACE = re.compile(r"/\*\s*([\w-]+)\s*\*/\s*@font-face\s*\{([^}]*)\}")
+_PROP = re.compile(r"([\w-]+)\s*:\s*([^;]+);")
+_URL  = re.compile(r"url\(([^)]+)\)")
+
+
+def fetch(url: str, offline: bool) -> bytes:
+    """Remote URL or repo-relative path → bytes, through the download cache."""
+    if not url.startswith(("http://", "https://")):
+        with open(os.path.join(REPO_ROOT, url), "rb") as fh:
+            return fh.read()
+    path = os.path.join(CACHE_DIR, hashlib.sha256(url.encode("utf-8")).hexdigest()[:24])
+    if os.path.exists(path):
+        with open(path, "rb") as fh:
+            return fh.read()
+    if offline:
+        raise SystemExit(f"✗ {url} is not in {CACHE_DIR} (drop --offline to download it)")
+    req = urllib.request.Request(url, headers={"User-Agent": USER_AGENT})
+    with urllib.request.urlopen(req, timeout=30) as resp:
+        data = resp.read()
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    with open(path, "wb") as fh:
+        fh.write(data)
+    return data
+
+
+def write_hashed(static_dir: str, subdir: str, stem: str, ext: str, data: bytes) -> Tuple[str, str]:
+    """Write `data` as <subdir>/<stem>.<hash>.<ext> (unless already there). Returns (file, hash)."""
+    digest = hashlib.sha256(data).hexdigest()[:12]
+    file   = f"{subdir}/{stem}.{digest}.{ext}"
+    path   = os.path.join(static_dir, file)
+    if not os.path.exists(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "wb") as fh:
+            fh.write(data)
+    return file, digest
+
+
+def slug(text: str) -> str:
+    return re.sub(r"[^a-z0-9]+", "-", text.lower()).strip("-")
+
+
+# =============================================================================
+# FONTS
+# =============================================================================
+
+def parse_font_css(css: str, subsets: List[str]) -> List[Dict[str, str]]:
+    """Google's css2 response → one entry per @font-face in the wanted unicode subsets."""
+    faces = []
+    for subset, body in _FACE.findall(css):
+        if subset not in subsets:
+            continue
+        props = {k: v.strip() for k, v in _PROP.findall(body)}
+        url   = _URL.search(props.get("src", ""))
+        if not url:
+            continue
+        faces.append({
+            "family":        props.get("font-family", "").strip("'\""),
+            "style":         props.get("font-style", "normal"),
+            "weight":        props.get("font-weight", "400"),
+            "unicode_range": props.get("unicode-range", ""),
+            "subset":        subset,
+            "url":           url.group(1).strip("'\""),
+        })
+    return faces
+
+
+def build_fonts(static_dir: str, subsets: List[str], offline: bool) -> Tuple[List[Dict[str, str]], int]:
+    fonts, total = [], 0
+    written: Dict[str, Tuple[str, str]] = {}          # variable fonts: several weights share one file
+    for family in FONTS:
+        css = fetch(google_fonts_url([family]), offline).decode("utf-8")
+        for face in parse_font_css(css, subsets):
+            url, subset = face.pop("url"), face.pop("subset")
+            if url not in written:
+                data = fetch(url, offline)
+                stem = f"{slug(face['family'])}-{face['weight']}-{face['style']}-{subset}"
+                written[url] = write_hashed(static_dir, "fonts", stem, "woff2", data)
+                total += len(data)
+            face["file"], face["hash"] = written[url]
+            fonts.append(face)
+    return fonts, total
+
+
+# =============================================================================
+# IMAGES
+# =============================================================================
+
+def image_variants(data: bytes, widths=IMAGE_WIDTHS, quality: int = IMAGE_QUALITY) -> List[Tuple[int, bytes]]:
+    """(width, WebP bytes) per target width, never upscaling past the source."""
+    try:
+        from PIL import Image
+    except ImportError:
+        raise SystemExit("Resizing images needs Pillow. Run: pip install pillow")
+    with Image.open(io.BytesIO(data)) as img:
+        img = img.convert("RGB")
+        out = []
+        for w in sorted({min(w, img.width) for w in widths}):
+            h   = round(img.height * w / img.width)
+            buf = io.BytesIO()
+            img.resize((w, h), Image.LANCZOS).save(buf, "WEBP", quality=quality, method=6)
+            out.append((w, buf.getvalue()))
+        return out
+
+
+def build_images(static_dir: str, sources: Dict[str, str], offline: bool) -> Tuple[Dict[str, List[Dict[str, Any]]], int, int]:
+    """THEME_IMAGES (role key → source) → manifest entries keyed by source."""
+    images: Dict[str, List[Dict[str, Any]]] = {}
+    before = after = 0
+    for key, source in sorted(sources.items()):
+        if source in images:
+            continue
+        data    = fetch(source, offline)
+        before += len(data)
+        images[source] = []
+        for w, webp in image_variants(data):
+            file, digest = write_hashed(static_dir, "img", f"{slug(key)}-{w}", "webp", webp)
+            images[source].append({"w": w, "file": file, "hash": digest})
+            after += len(webp)
+    return images, before, after
+
+
+def prune(static_dir: str, keep: set) -> int:
+    removed = 0
+    for subdir in ("fonts", "img"):
+        folder = os.path.join(static_dir, subdir)
+        if not os.path.isdir(folder):
+            continue
+        for name in os.listdir(folder):
+            if f"{subdir}/{name}" not in keep:
+                os.remove(os.path.join(folder, name))
+                removed += 1
+    return removed
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    p = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    p.add_argument("--static-dir", default=STATIC_DIR, help="default: static/ next to app.py")
+    p.add_argument("--subsets",    default="latin", help="comma-separated unicode subsets to keep (default: latin)")
+    p.add_argument("--offline",    action="store_true", help="use only what's already in .cache/assets")
+    args = p.parse_args(argv)
+
+    bundle  = compile_bundle(version=0, sources=ContentSources.from_config(read_secrets().get("content", {})))
+    subsets = [s.strip() for s in args.subsets.split(",") if s.strip()]
+    os.makedirs(args.static_dir, exist_ok=True)
+
+    fonts, font_bytes = build_fonts(args.static_dir, subsets, args.offline)
+    images, before, after = build_images(args.static_dir, dict(bundle.theme_images), args.offline)
+    path = write_manifest(fonts, images, args.static_dir)
+    keep = {f["file"] for f in fonts} | {v["file"] for vs in images.values() for v in vs}
+    removed = prune(args.static_dir, keep)
+
+    print(f"✓ {len(fonts)} font file(s), {font_bytes / 1024:,.0f} KiB")
+    print(
+        f"✓ {len(images)} image(s) → {sum(len(v) for v in images.values())} WebP variant(s): "
+        f"{before / 1024:,.0f} KiB of sources, {after / 1024:,.0f} KiB served"
+    )
+    print(f"✓ manifest {os.path.relpath(path, REPO_ROOT)}" + (f", {removed} stale file(s) removed" if removed else ""))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,83 @@
+"""
+certificates.py — Batch Completion Certificates for a Cohort
+=============================================================
+Renders a PDF certificate for everyone who has completed onboarding, in
+parallel across a process pool (services/certificates.py). Certificates
+already in the cache are reused, so re-running after new completions only
+renders the new ones.
+
+    python -m tools.certificates out/
+    python -m tools.certificates out/ --cohort 2026-09:SE --workers 8
+
+Only users whose stored summary says 100% are selected (see derived_fields
+in app.py); the query never loads progress maps it doesn't need.
+"""
+
+import argparse
+import sys
+import time
+from datetime import date, timedelta
+from typing import List, Optional
+
+from services.certificates import DEFAULT_CACHE_DIR, HAS_REPORTLAB, CertificateData, CertificateService
+from services.nudges import parse_start
+from tools.common import read_secrets, users_collection
+
+PROJECTION = {"profile": 1, "completion_days": 1, "last_updated": 1}
+
+
+def to_certificate(doc) -> CertificateData:
+    profile = doc.get("profile", {})
+    start   = parse_start(profile.get("start_date"))
+    days    = doc.get("completion_days", {})
+    if start and days:
+        completed = start + timedelta(days=max(days.values()))
+    else:
+        completed = parse_start(str(doc.get("last_updated", ""))[:10]) or date.today()
+    return CertificateData(
+        name=profile.get("name") or "Team Member",
+        role=profile.get("role", ""),
+        manager=profile.get("manager") or "Line Manager",
+        completed_on=completed,
+    )
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    p = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    p.add_argument("out_dir",     help="where to write the PDFs")
+    p.add_argument("--cohort",    help='only this cohort, e.g. "2026-09:SE" (start month:role key)')
+    p.add_argument("--workers",   type=int, help="render processes (default: [certificates] workers or 2)")
+    p.add_argument("--mongo-uri", help="defaults to MONGO_URI or [mongo] uri in secrets.toml")
+    p.add_argument("--db",        help="defaults to [mongo] db in secrets.toml")
+    args = p.parse_args(argv)
+
+    if not HAS_REPORTLAB:
+        print("✗ PDF certificates need reportlab. Run: pip install reportlab", file=sys.stderr)
+        return 1
+
+    cfg     = read_secrets().get("certificates", {})
+    service = CertificateService(
+        cache_dir=cfg.get("cache_dir", DEFAULT_CACHE_DIR),
+        workers=args.workers or int(cfg.get("workers", 2)),
+    )
+    query = {"summary.overall_pct": {"$gte": 1}}
+    if args.cohort:
+        query["cohort"] = args.cohort
+    col   = users_collection(args.mongo_uri, args.db)
+    items = [to_certificate(doc) for doc in col.find(query, PROJECTION)]
+
+    start = time.perf_counter()
+    try:
+        written = service.batch(items, args.out_dir)
+    finally:
+        service.shutdown()
+    elapsed = time.perf_counter() - start
+    print(
+        f"✓ {len(written)} certificate(s) → {args.out_dir} in {elapsed:.1f} s "
+        f"({len(written) / elapsed if elapsed else 0:,.1f}/s with {service.workers} worker(s))"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
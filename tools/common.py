@@ -0,0 +1,46 @@
+"""
+common.py — Shared Helpers for the Command-Line Tools
+======================================================
+Tools read the same .streamlit/secrets.toml as the app, so an operator only
+configures the database once. Every value can be overridden on the command line.
+"""
+
+import os
+import tomllib
+from typing import Any, Dict, Optional
+
+REPO_ROOT    = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SECRETS_PATH = os.path.join(REPO_ROOT, ".streamlit", "secrets.toml")
+DEFAULT_DB   = "spae_hub"
+
+
+def read_secrets(path: str = SECRETS_PATH) -> Dict[str, Any]:
+    try:
+        with open(path, "rb") as fh:
+            return tomllib.load(fh)
+    except FileNotFoundError:
+        return {}
+
+
+def users_collection(uri: Optional[str] = None, db: Optional[str] = None):
+    """
+    The app's `users` collection on the configured backend. `uri` may be a
+    MongoDB connection string or sqlite:///path. Raises SystemExit with a
+    readable message if unavailable.
+    """
+    from services import storage
+    secrets = read_secrets()
+    mongo   = secrets.get("mongo", {})
+    uri     = uri or os.environ.get("MONGO_URI")
+    try:
+        if uri:
+            database = storage.open_uri(uri, db or mongo.get("db", DEFAULT_DB))
+        elif secrets.get("storage", {}).get("backend") == "sqlite":
+            database = storage.open_database(secrets["storage"], mongo)
+        elif mongo.get("uri"):
+            database = storage.open_database({}, {**mongo, "db": db or mongo.get("db", DEFAULT_DB)})
+        else:
+            raise SystemExit("No database: pass --mongo-uri, set MONGO_URI, or configure [mongo] / [storage] in secrets.toml")
+    except ImportError:
+        raise SystemExit("pymongo not installed. Run: pip install pymongo")
+    return database["users"]
@@ -0,0 +1,152 @@
+"""
+content_files.py — Export, Check and Pre-compile Content Data Files
+====================================================================
+Companion CLI for services/content_files.py.
+
+    # one-off: write today's Python content out as data files
+    python -m tools.content_files export content/data
+
+    # validate a data folder (exit 1 and list every problem if invalid)
+    python -m tools.content_files check content/data
+
+    # build the compiled cache ahead of a deploy so the first start is instant
+    python -m tools.content_files compile --sources python files --cache-dir .cache/content
+
+Exported layout: tasks/glossary/faqs/badges/acronyms/aliases as CSV (spreadsheet
+friendly), courses and systems as YAML (or JSON with --format json).
+After exporting, switch the app over with `sources = ["files"]` in the
+[content] section of secrets.toml.
+"""
+
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+from typing import Any, Dict, List, Optional
+
+from services.content_bundle import ContentSources, compile_bundle
+from services.content_files import BADGE_KEYS, HAS_YAML, TASK_KEYS, ContentFileError, load_data_dir
+
+
+def write_csv(path: str, columns: List[str], rows: List[Dict[str, Any]]) -> None:
+    with open(path, "w", newline="", encoding="utf-8") as fh:
+        writer = csv.DictWriter(fh, fieldnames=columns)
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+def write_mapping(path: str, data: Dict[str, Any], fmt: str) -> str:
+    path = f"{path}.{fmt}"
+    with open(path, "w", encoding="utf-8") as fh:
+        if fmt == "json":
+            json.dump(data, fh, indent=2, ensure_ascii=False)
+        else:
+            import yaml
+            yaml.safe_dump(data, fh, allow_unicode=True, sort_keys=False, width=120)
+    return path
+
+
+def thaw(obj: Any) -> Any:
+    """Bundle values are read-only mappings and tuples; serialisers want dicts and lists."""
+    if hasattr(obj, "items"):
+        return {k: thaw(v) for k, v in obj.items()}
+    if isinstance(obj, tuple):
+        return [thaw(v) for v in obj]
+    return obj
+
+
+def export(out_dir: str, fmt: str) -> List[str]:
+    bundle = compile_bundle(version=0, sources=ContentSources(python=True))
+    from content import COURSE_ALIASES, ROLES, TASK_ALIASES, TECH_STACKS   # as written, not as resolved
+    os.makedirs(out_dir, exist_ok=True)
+    written = []
+
+    tasks, seen = [], set()
+    for role in bundle.roles.values():
+        for t in role.tasks:
+            if t["ID"] not in seen:
+                seen.add(t["ID"])
+                tasks.append(dict(t))
+    written.append(os.path.join(out_dir, "tasks.csv"))
+    write_csv(written[-1], list(TASK_KEYS), tasks)
+
+    written.append(os.path.join(out_dir, "glossary.csv"))
+    write_csv(written[-1], ["role", "term", "definition"], [
+        {"role": role, "term": term, "definition": definition}
+        for role, terms in bundle.glossary.items() for term, definition in terms.items()
+    ])
+    written.append(os.path.join(out_dir, "faqs.csv"))
+    write_csv(written[-1], ["role", "q", "a"], [
+        {"role": role, **item} for role, items in bundle.faqs.items() for item in items
+    ])
+    written.append(os.path.join(out_dir, "badges.csv"))
+    extra = sorted({k for b in bundle.badges for k in b} - set(BADGE_KEYS))
+    write_csv(written[-1], list(BADGE_KEYS) + extra, [dict(b) for b in bundle.badges])
+    written.append(os.path.join(out_dir, "acronyms.csv"))
+    write_csv(written[-1], ["acronym", "meaning"], [
+        {"acronym": a, "meaning": m} for a, m in bundle.acronyms.items()
+    ])
+    written.append(os.path.join(out_dir, "aliases.csv"))
+    write_csv(written[-1], ["kind", "old", "new"], [
+        {"kind": kind, "old": old, "new": new}
+        for kind, aliases in (("task", TASK_ALIASES), ("course", COURSE_ALIASES)) for old, new in aliases.items()
+    ])
+
+    written.append(write_mapping(os.path.join(out_dir, "roles"), thaw(ROLES), fmt))
+    written.append(write_mapping(os.path.join(out_dir, "courses"), {
+        "phases":    list(bundle.phase_order),
+        "navigator": thaw(bundle.navigator_courses),
+    }, fmt))
+    written.append(write_mapping(os.path.join(out_dir, "systems"), {
+        "faros":        thaw(bundle.faros_catalog),
+        "toolkit":      thaw(bundle.toolkit),
+        "quick_links":  thaw(bundle.quick_links),
+        "theme_images": thaw(bundle.theme_images),
+        "tech_stacks":  thaw(TECH_STACKS),
+        "key_contacts": thaw(bundle.key_contacts),
+    }, fmt))
+    return written
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    p = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = p.add_subparsers(dest="command", required=True)
+
+    ex = sub.add_parser("export", help="write the Python content out as data files")
+    ex.add_argument("out_dir", nargs="?", default=os.path.join("content", "data"))
+    ex.add_argument("--format", choices=("yaml", "json"), default="yaml" if HAS_YAML else "json")
+
+    ck = sub.add_parser("check", help="schema-check a data folder")
+    ck.add_argument("data_dir", nargs="?", default=os.path.join("content", "data"))
+
+    cp = sub.add_parser("compile", help="validate all sources and write the compiled cache")
+    cp.add_argument("--sources",   nargs="+", choices=("python", "files"), default=["python"])
+    cp.add_argument("--data-dir",  default=os.path.join("content", "data"))
+    cp.add_argument("--cache-dir", default=os.path.join(".cache", "content"))
+    args = p.parse_args(argv)
+
+    try:
+        if args.command == "export":
+            for path in export(args.out_dir, args.format):
+                print(f"wrote {path}")
+        elif args.command == "check":
+            fragments = load_data_dir(args.data_dir)
+            print(f"✓ {len(fragments)} data file(s) in {args.data_dir} are valid")
+        else:
+            sources = ContentSources.from_config({
+                "sources": args.sources, "data_dir": args.data_dir, "cache_dir": args.cache_dir,
+            })
+            start  = time.perf_counter()
+            bundle = compile_bundle(version=0, sources=sources)
+            print(f"✓ compiled {bundle.digest[:16]} in {(time.perf_counter() - start) * 1000:.1f} ms "
+                  f"→ {sources.cache_dir}")
+    except (ContentFileError, ValueError) as e:
+        print(f"✗ {e}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,149 @@
+"""
+failover_check.py — Kill a Replica Mid-Session, Prove No Progress Is Lost
+==========================================================================
+End-to-end check for the multi-replica setup in deploy/local/:
+
+  1. signs in through the proxy (dev auth bypass) as a fresh user
+  2. completes the wizard, opens the Checklist and ticks a few tasks
+  3. finds which replica served the websocket (nginx X-Upstream header)
+     and kills that container
+  4. reconnects through the proxy with the same URL and widget values,
+     exactly like the browser's automatic reconnect
+  5. asserts it landed on another replica, is still signed in, is still on
+     the Checklist page, and every ticked task is still ticked
+
+    docker compose -f deploy/local/docker-compose.yml up --build -d
+    python -m tools.failover_check
+    docker compose -f deploy/local/docker-compose.yml up -d     # revive the replica
+
+Exits non-zero if any assertion fails.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import time
+from typing import Dict, List, Optional
+
+from tools.loadtest import NAV_LABEL, WIZARD_NAME_LABEL, WIZARD_SUBMIT_LABEL, SimSession, wait_for_health
+
+REPO_ROOT    = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+COMPOSE_FILE = os.path.join(REPO_ROOT, "deploy", "local", "docker-compose.yml")
+REPLICAS     = ("app1", "app2", "app3")
+
+
+def compose(*args: str) -> str:
+    return subprocess.run(
+        ["docker", "compose", "-f", COMPOSE_FILE, *args],
+        check=True, capture_output=True, text=True,
+    ).stdout
+
+
+def replica_addresses() -> Dict[str, str]:
+    """Container IP → compose service name for every running replica."""
+    addresses = {}
+    for service in REPLICAS:
+        cid = compose("ps", "-q", service).strip()
+        if not cid:
+            continue
+        ip = subprocess.run(
+            ["docker", "inspect", "-f", "{{range .NetworkSettings.Networks}}{{.IPAddress}}{{end}}", cid],
+            check=True, capture_output=True, text=True,
+        ).stdout.strip()
+        addresses[ip] = service
+    return addresses
+
+
+def serving_replica(session: SimSession) -> Optional[str]:
+    upstream = session.response_headers.get("X-Upstream", "")
+    ip = upstream.split(",")[-1].strip().rsplit(":", 1)[0]
+    return replica_addresses().get(ip)
+
+
+async def run(proxy_url: str, toggles: int) -> List[str]:
+    ws_url   = proxy_url.replace("http", "ws", 1) + "/_stcore/stream"
+    failures = []
+
+    # ── 1–2: sign in, wizard, tick tasks ─────────────────────────────────────
+    before = SimSession(ws_url, f"failover-{int(time.time())}")
+    await before.connect()
+    await before.load()
+    if before.find("button", label=WIZARD_SUBMIT_LABEL) is not None:
+        await before.type_text(WIZARD_NAME_LABEL, "Failover Tester")
+        await before.click(WIZARD_SUBMIT_LABEL)
+    await before.select_radio(NAV_LABEL, "Checklist")
+    ticked = []
+    for box in before.checkboxes("chk_")[:toggles]:
+        await before.toggle(box)
+        ticked.append(box.id)
+    if "s=" not in before.query_string:
+        failures.append("app did not issue a ?s= resume token — is [sessions] signing_key set?")
+
+    # ── 3: kill the replica that served us ──────────────────────────────────
+    victim = serving_replica(before)
+    if victim is None:
+        return failures + ["could not tell which replica served the session (X-Upstream)"]
+    print(f"→ session served by {victim}; ticked {len(ticked)} task(s); killing {victim}…")
+    compose("kill", victim)
+    before.close()
+
+    # ── 4: reconnect like the browser does ──────────────────────────────────
+    after = SimSession(ws_url, query_string=before.query_string)
+    after.values = dict(before.values)
+    for attempt in range(20):
+        try:
+            await after.connect()
+            await after.load()
+            break
+        except (ConnectionError, OSError, asyncio.TimeoutError):
+            after.close()
+            await asyncio.sleep(1)
+    else:
+        return failures + ["could not reconnect through the proxy"]
+
+    # ── 5: assertions ────────────────────────────────────────────────────────
+    survivor = serving_replica(after)
+    print(f"→ reconnected to {survivor}")
+    if survivor in (None, victim):
+        failures.append(f"reconnected to {survivor!r}, expected a different live replica")
+    if after.find("button", label=WIZARD_SUBMIT_LABEL) is not None:
+        failures.append("session lost its identity/profile — wizard shown again")
+    nav = after.find("radio", label=NAV_LABEL)
+    if nav is None:
+        failures.append("not signed in after failover — navigation missing")
+    elif list(nav.options)[after.values[nav.id].int_value if nav.id in after.values else nav.default] != "Checklist":
+        failures.append("page selection lost — not on Checklist")
+    # The browser re-sends its own checkbox values, so judge by what the new
+    # replica rendered as the default — that comes from the reloaded user document
+    for wid in ticked:
+        box = next((p for p in after.checkboxes("chk_") if p.id == wid), None)
+        if box is None or not box.default:
+            failures.append(f"ticked task lost after failover: {wid.rsplit('-', 1)[-1]}")
+    after.close()
+    return failures
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    p = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    p.add_argument("--proxy-url", default="http://localhost:8080")
+    p.add_argument("--toggles",   type=int, default=3)
+    p.add_argument("--json",      help="write the result to this JSON file")
+    args = p.parse_args(argv)
+
+    wait_for_health(args.proxy_url.rstrip("/"))
+    failures = asyncio.run(run(args.proxy_url.rstrip("/"), args.toggles))
+    for f in failures:
+        print(f"✗ {f}")
+    if not failures:
+        print("✓ replica killed mid-session — identity, page and all progress survived")
+    if args.json:
+        with open(args.json, "w") as fh:
+            json.dump({"passed": not failures, "failures": failures}, fh, indent=2)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
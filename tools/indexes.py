@@ -0,0 +1,66 @@
+"""
+indexes.py — Ensure and Verify the users Indexes
+=================================================
+Creates every index declared in services/indexes.py and, with --check,
+explains each query the app runs on `users` and fails if any of them scans
+the whole collection. Plans don't depend on data, so a throwaway local
+MongoDB is enough — run it in CI or before shipping a new query:
+
+    docker run -d -p 27017:27017 mongo:7
+    python -m tools.indexes --mongo-uri mongodb://localhost:27017 --db index_check --check
+
+    python -m tools.indexes                 # ensure indexes on the configured database
+    python -m tools.indexes --list          # what is declared vs what exists
+
+Exits 1 if an index could not be created or (with --check) a query is unindexed.
+"""
+
+import argparse
+import sys
+from typing import List, Optional
+
+from services import indexes
+from tools.common import users_collection
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    p = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    p.add_argument("--check",     action="store_true", help="explain every app query and fail on collection scans")
+    p.add_argument("--list",      action="store_true", help="show declared and existing indexes, change nothing")
+    p.add_argument("--mongo-uri", help="defaults to MONGO_URI or [mongo] uri in secrets.toml")
+    p.add_argument("--db",        help="defaults to [mongo] db in secrets.toml")
+    args = p.parse_args(argv)
+
+    col = users_collection(args.mongo_uri, args.db)
+
+    if args.list:
+        existing = col.index_information()
+        declared = {s.name: s for s in indexes.USERS_INDEXES}
+        for name, spec in declared.items():
+            print(f"{'✓' if name in existing else '✗'} {name:<45} {spec.serves}")
+        for name in sorted(set(existing) - set(declared) - {"_id_"}):
+            print(f"? {name:<45} not declared in services/indexes.py")
+        return 0
+
+    failed = 0
+    for name, result in indexes.ensure_indexes(col).items():
+        if result != "ok":
+            failed += 1
+            print(f"✗ {name}: {result}")
+    print(f"✓ {len(indexes.USERS_INDEXES) - failed}/{len(indexes.USERS_INDEXES)} index(es) present on {col.full_name}")
+
+    if args.check:
+        for shape in indexes.app_queries():
+            try:
+                result = indexes.assert_indexed(col, shape)
+            except AssertionError as e:
+                failed += 1
+                print(f"✗ {e}")
+                continue
+            note = "  (sorts in memory)" if result["in_memory_sort"] else ""
+            print(f"✓ {shape.name:<24} {' → '.join(result['stages'])}{note}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,500 @@
+"""
+loadtest.py — Concurrent-Session Load Generator
+================================================
+Finds how many simultaneous new hires one Streamlit process can serve before
+reruns degrade. Each simulated user opens its own websocket session and
+clicks through a realistic sequence, exactly as the browser would:
+
+    wizard → Checklist page → N checklist toggles → Dashboard  (repeated)
+
+Every click is one script rerun. The tool records how long each rerun takes
+(BackMsg sent → script_finished received), samples the server's RSS, and
+sweeps the session count to find the throughput knee — the last level where
+adding sessions still bought meaningfully more reruns per second.
+
+By default it starts its own server on a free port with a throwaway
+.streamlit/secrets.toml that enables the [dev] auth bypass (see
+handle_auth_callback in app.py), so no Azure login is needed. Point it at a
+local Mongo stand-in to include the synchronous DB writes in the numbers:
+
+    docker run --rm -p 27017:27017 mongo:7
+    python -m tools.loadtest --mongo-uri mongodb://localhost:27017
+    python -m tools.loadtest --sessions 1,10,25,50,100 --iterations 5 --json out.json
+
+If `mongod` is on PATH and no --mongo-uri is given, a temporary instance is
+started automatically. Without either, the app runs in "⚠️ Local" mode and
+the results exclude DB latency.
+
+Use --url to target an already running server instead (it must have
+[dev] auth_bypass = true in its secrets, and --rss-pid to sample memory).
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+from dataclasses import asdict, dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+from tornado.websocket import websocket_connect
+from streamlit.proto.BackMsg_pb2 import BackMsg
+from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+from streamlit.proto.WidgetStates_pb2 import WidgetState
+
+REPO_ROOT      = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP_PATH       = os.path.join(REPO_ROOT, "app.py")
+STARTUP_TIMEOUT = 60.0
+RERUN_TIMEOUT   = 30.0
+
+# Widget labels the scenario clicks — keep in sync with app.py
+WIZARD_NAME_LABEL   = "Preferred First Name"
+WIZARD_SUBMIT_LABEL = "🚀 Start My Onboarding"
+NAV_LABEL           = "Navigation"
+
+WIDGET_TYPES = ("button", "checkbox", "radio", "selectbox", "text_input", "date_input")
+
+
+# =============================================================================
+# PROCESS HELPERS
+# =============================================================================
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def read_rss_bytes(pid: int) -> int:
+    """Resident set size of a process, read from /proc (Linux only)."""
+    try:
+        with open(f"/proc/{pid}/status") as fh:
+            for line in fh:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return 0
+
+
+def wait_for_health(base_url: str, timeout: float = STARTUP_TIMEOUT) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            with urllib.request.urlopen(f"{base_url}/_stcore/health", timeout=2) as r:
+                if r.status == 200:
+                    return
+        except OSError:
+            pass
+        time.sleep(0.5)
+    raise RuntimeError(f"Server at {base_url} did not become healthy within {timeout:.0f}s")
+
+
+def start_mongod(workdir: str) -> Tuple[Optional[subprocess.Popen], Optional[str]]:
+    """Start a throwaway mongod if one is on PATH. Returns (process, uri)."""
+    binary = shutil.which("mongod")
+    if binary is None:
+        return None, None
+    port   = free_port()
+    dbpath = os.path.join(workdir, "mongo")
+    os.makedirs(dbpath, exist_ok=True)
+    proc = subprocess.Popen(
+        [binary, "--dbpath", dbpath, "--port", str(port), "--bind_ip", "127.0.0.1", "--quiet"],
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    deadline = time.monotonic() + STARTUP_TIMEOUT
+    while time.monotonic() < deadline:
+        with socket.socket() as s:
+            if s.connect_ex(("127.0.0.1", port)) == 0:
+                return proc, f"mongodb://127.0.0.1:{port}"
+        time.sleep(0.2)
+    proc.terminate()
+    raise RuntimeError("mongod did not start")
+
+
+def start_server(workdir: str, port: int, mongo_uri: Optional[str]) -> subprocess.Popen:
+    """Launch `streamlit run app.py` with a throwaway secrets file in workdir."""
+    secrets_dir = os.path.join(workdir, ".streamlit")
+    os.makedirs(secrets_dir, exist_ok=True)
+    with open(os.path.join(secrets_dir, "secrets.toml"), "w") as fh:
+        fh.write("[dev]\nauth_bypass = true\n")
+        if mongo_uri:
+            fh.write(f'\n[mongo]\nuri = "{mongo_uri}"\ndb  = "spae_loadtest"\n')
+    return subprocess.Popen(
+        [
+            sys.executable, "-m", "streamlit", "run", APP_PATH,
+            "--server.port", str(port),
+            "--server.headless", "true",
+            "--server.fileWatcherType", "none",
+            "--browser.gatherUsageStats", "false",
+        ],
+        cwd=workdir,
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+
+
+# =============================================================================
+# SIMULATED BROWSER SESSION
+# =============================================================================
+
+class SimSession:
+    """
+    One simulated browser tab speaking Streamlit's websocket protocol.
+
+    Widgets are discovered from the deltas of the last run; values set by the
+    session are re-sent on every rerun, exactly like the frontend does, so
+    widgets keep their state between clicks.
+    """
+
+    def __init__(self, ws_url: str, oid: str = "", query_string: Optional[str] = None):
+        self.ws_url       = ws_url
+        self.query_string = f"dev_oid={oid}" if query_string is None else query_string
+        self.conn         = None
+        self.widgets: Dict[str, Tuple[str, object]] = {}   # id → (type, proto)
+        self.values:  Dict[str, WidgetState]        = {}   # id → last value we sent
+        self.msg_cache: Dict[str, ForwardMsg]        = {}   # hash → cacheable ForwardMsg
+        self.errors = 0
+
+    async def connect(self) -> None:
+        self.conn = await websocket_connect(self.ws_url, subprotocols=["streamlit"])
+
+    @property
+    def response_headers(self) -> Dict[str, str]:
+        return dict(self.conn.headers) if self.conn is not None else {}
+
+    def close(self) -> None:
+        if self.conn is not None:
+            self.conn.close()
+            self.conn = None
+
+    # ── Widget lookup ────────────────────────────────────────────────────────
+    def find(self, kind: str, label: Optional[str] = None,
+             key_suffix: Optional[str] = None) -> Optional[object]:
+        for wid, (wkind, proto) in self.widgets.items():
+            if wkind != kind:
+                continue
+            if label is not None and proto.label != label:
+                continue
+            if key_suffix is not None and not wid.endswith(key_suffix):
+                continue
+            return proto
+        return None
+
+    def checkboxes(self, key_prefix: str) -> List[object]:
+        return [
+            proto for wid, (kind, proto) in self.widgets.items()
+            if kind == "checkbox" and f"-{key_prefix}" in wid
+        ]
+
+    def checkbox_value(self, proto) -> bool:
+        if proto.id in self.values:
+            return self.values[proto.id].bool_value
+        return proto.value if proto.set_value else proto.default
+
+    # ── Actions (one rerun each) ─────────────────────────────────────────────
+    async def load(self) -> float:
+        return await self._rerun()
+
+    async def click(self, label: str) -> float:
+        proto = self.find("button", label=label)
+        if proto is None:
+            raise LookupError(f"button {label!r} not rendered")
+        return await self._rerun(triggers=[proto.id])
+
+    async def type_text(self, label: str, text: str) -> None:
+        """Set a text input without a rerun — the next click submits it."""
+        proto = self.find("text_input", label=label)
+        if proto is not None:
+            self.values[proto.id] = WidgetState(id=proto.id, string_value=text)
+
+    async def select_radio(self, label: str, option: str) -> float:
+        proto = self.find("radio", label=label)
+        if proto is None:
+            raise LookupError(f"radio {label!r} not rendered")
+        self.values[proto.id] = WidgetState(id=proto.id, int_value=list(proto.options).index(option))
+        return await self._rerun()
+
+    async def toggle(self, proto) -> float:
+        self.values[proto.id] = WidgetState(id=proto.id, bool_value=not self.checkbox_value(proto))
+        return await self._rerun()
+
+    # ── Protocol ─────────────────────────────────────────────────────────────
+    async def _rerun(self, triggers: Optional[List[str]] = None) -> float:
+        msg = BackMsg()
+        msg.rerun_script.query_string = self.query_string
+        states = msg.rerun_script.widget_states.widgets
+        for state in self.values.values():
+            states.append(state)
+        for wid in triggers or []:
+            states.append(WidgetState(id=wid, trigger_value=True))
+
+        started = time.perf_counter()
+        await self.conn.write_message(msg.SerializeToString(), binary=True)
+        await asyncio.wait_for(self._read_until_finished(), RERUN_TIMEOUT)
+        elapsed = time.perf_counter() - started
+
+        # Forget values for widgets that are no longer on screen
+        self.values = {wid: v for wid, v in self.values.items() if wid in self.widgets}
+        return elapsed
+
+    async def _read_until_finished(self) -> None:
+        while True:
+            raw = await self.conn.read_message()
+            if raw is None:
+                raise ConnectionError("websocket closed by server")
+            fmsg = ForwardMsg.FromString(raw)
+            kind = fmsg.WhichOneof("type")
+            if kind == "ref_hash":
+                fmsg = self.msg_cache.get(fmsg.ref_hash, fmsg)
+                kind = fmsg.WhichOneof("type")
+            elif fmsg.hash and fmsg.metadata.cacheable:
+                self.msg_cache[fmsg.hash] = fmsg
+
+            if kind == "new_session":
+                self.widgets = {}
+            elif kind == "page_info_changed":
+                # The app rewrote the URL (e.g. ?s= resume token) — a browser would keep it
+                self.query_string = fmsg.page_info_changed.query_string
+            elif kind == "delta" and fmsg.delta.WhichOneof("type") == "new_element":
+                element = fmsg.delta.new_element
+                etype   = element.WhichOneof("type")
+                if etype in WIDGET_TYPES:
+                    proto = getattr(element, etype)
+                    self.widgets[proto.id] = (etype, proto)
+                elif etype == "exception":
+                    self.errors += 1
+            elif kind == "script_finished":
+                if fmsg.script_finished == ForwardMsg.FINISHED_EARLY_FOR_RERUN:
+                    continue   # st.rerun() — the follow-up run belongs to this click
+                if fmsg.script_finished == ForwardMsg.FINISHED_WITH_COMPILE_ERROR:
+                    self.errors += 1
+                return
+
+
+# =============================================================================
+# SCENARIO
+# =============================================================================
+
+@dataclass
+class LevelResult:
+    sessions:        int
+    reruns:          int
+    errors:          int
+    wall_s:          float
+    throughput:      float           # reruns per second across all sessions
+    p50_ms:          float
+    p90_ms:          float
+    p99_ms:          float
+    max_ms:          float
+    rss_idle_mb:     float
+    rss_peak_mb:     float
+    rss_per_session_mb: float
+    by_action:       Dict[str, float] = field(default_factory=dict)   # action → p90 ms
+
+
+async def run_user(session: SimSession, iterations: int, toggles: int,
+                   think_time: float, samples: List[Tuple[str, float]]) -> None:
+    async def record(action: str, coro) -> None:
+        samples.append((action, await coro))
+        if think_time:
+            await asyncio.sleep(think_time)
+
+    await record("load", session.load())
+
+    if session.find("button", label=WIZARD_SUBMIT_LABEL) is not None:
+        await session.type_text(WIZARD_NAME_LABEL, "Load Tester")
+        await record("wizard", session.click(WIZARD_SUBMIT_LABEL))
+
+    for _ in range(iterations):
+        await record("nav_checklist", session.select_radio(NAV_LABEL, "Checklist"))
+        for box in session.checkboxes("chk_")[:toggles]:
+            await record("toggle", session.toggle(box))
+        await record("nav_dashboard", session.select_radio(NAV_LABEL, "Dashboard"))
+
+
+def percentile(values: List[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    k = (len(ordered) - 1) * pct / 100
+    lo, hi = int(k), min(int(k) + 1, len(ordered) - 1)
+    return ordered[lo] + (ordered[hi] - ordered[lo]) * (k - lo)
+
+
+async def run_level(ws_url: str, n: int, args, rss_pid: Optional[int]) -> LevelResult:
+    rss_idle = read_rss_bytes(rss_pid) if rss_pid else 0
+    rss_peak = rss_idle
+    stop     = asyncio.Event()
+
+    async def sample_rss() -> None:
+        nonlocal rss_peak
+        while not stop.is_set():
+            rss_peak = max(rss_peak, read_rss_bytes(rss_pid))
+            await asyncio.sleep(0.25)
+
+    run_id   = f"{int(time.time())}-{n}"
+    sessions = [SimSession(ws_url, f"loadtest-{run_id}-{i}") for i in range(n)]
+    await asyncio.gather(*(s.connect() for s in sessions))
+    sampler = asyncio.ensure_future(sample_rss()) if rss_pid else None
+
+    samples: List[Tuple[str, float]] = []
+    started = time.perf_counter()
+    outcomes = await asyncio.gather(
+        *(run_user(s, args.iterations, args.toggles, args.think_time, samples) for s in sessions),
+        return_exceptions=True,
+    )
+    wall = time.perf_counter() - started
+
+    stop.set()
+    if sampler is not None:
+        await sampler
+    # Sessions are still connected here, so RSS reflects their live session_state
+    rss_live = read_rss_bytes(rss_pid) if rss_pid else 0
+    for s in sessions:
+        s.close()
+
+    errors    = sum(s.errors for s in sessions) + sum(isinstance(o, Exception) for o in outcomes)
+    latencies = [t * 1000 for _, t in samples]
+    by_action: Dict[str, List[float]] = {}
+    for action, t in samples:
+        by_action.setdefault(action, []).append(t * 1000)
+
+    mb = 1024 * 1024
+    return LevelResult(
+        sessions=n,
+        reruns=len(samples),
+        errors=errors,
+        wall_s=round(wall, 2),
+        throughput=round(len(samples) / wall, 2) if wall > 0 else 0.0,
+        p50_ms=round(percentile(latencies, 50), 1),
+        p90_ms=round(percentile(latencies, 90), 1),
+        p99_ms=round(percentile(latencies, 99), 1),
+        max_ms=round(max(latencies, default=0.0), 1),
+        rss_idle_mb=round(rss_idle / mb, 1),
+        rss_peak_mb=round(rss_peak / mb, 1),
+        rss_per_session_mb=round(max(0, rss_live - rss_idle) / mb / n, 2),
+        by_action={a: round(percentile(v, 90), 1) for a, v in sorted(by_action.items())},
+    )
+
+
+def find_knee(results: List[LevelResult], min_gain: float) -> Optional[LevelResult]:
+    """
+    Last level whose throughput gain over the previous level is still at least
+    `min_gain` of the ideal (linear) gain. Beyond it, extra sessions mostly add
+    latency rather than throughput.
+    """
+    knee = results[0] if results else None
+    for prev, cur in zip(results, results[1:]):
+        if prev.throughput <= 0:
+            break
+        ideal  = cur.sessions / prev.sessions - 1
+        actual = cur.throughput / prev.throughput - 1
+        if ideal <= 0 or actual < ideal * min_gain:
+            break
+        knee = cur
+    return knee
+
+
+def print_report(results: List[LevelResult], knee: Optional[LevelResult]) -> None:
+    header = (f"{'sessions':>8} {'reruns':>7} {'err':>4} {'rr/s':>7} {'p50ms':>8} "
+              f"{'p90ms':>8} {'p99ms':>8} {'RSS MB':>8} {'MB/sess':>8}")
+    print(header)
+    print("─" * len(header))
+    for r in results:
+        print(f"{r.sessions:>8} {r.reruns:>7} {r.errors:>4} {r.throughput:>7.1f} {r.p50_ms:>8.1f} "
+              f"{r.p90_ms:>8.1f} {r.p99_ms:>8.1f} {r.rss_peak_mb:>8.1f} {r.rss_per_session_mb:>8.2f}")
+    print()
+    for r in results:
+        actions = ", ".join(f"{a} {ms:.0f}" for a, ms in r.by_action.items())
+        print(f"  p90 by action @ {r.sessions:>3} sessions (ms): {actions}")
+    print()
+    if knee is not None:
+        print(f"Throughput knee: {knee.sessions} concurrent sessions "
+              f"({knee.throughput:.1f} reruns/s, p90 {knee.p90_ms:.0f} ms)")
+
+
+# =============================================================================
+# ENTRY POINT
+# =============================================================================
+
+async def sweep(ws_url: str, levels: List[int], args, rss_pid: Optional[int]) -> List[LevelResult]:
+    # One unmeasured user first, so lazy imports and st.cache_resource warm-up
+    # don't get billed to the first level's latency and RSS-per-session.
+    warmup = SimSession(ws_url, f"loadtest-warmup-{int(time.time())}")
+    await warmup.connect()
+    await run_user(warmup, 1, args.toggles, 0.0, [])
+    warmup.close()
+
+    results = []
+    for n in levels:
+        print(f"→ {n} concurrent session(s)…", file=sys.stderr)
+        results.append(await run_level(ws_url, n, args, rss_pid))
+        await asyncio.sleep(args.cooldown)
+    return results
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    p = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    p.add_argument("--sessions",   default="1,5,10,25,50",
+                   help="comma-separated concurrency levels to sweep (default: 1,5,10,25,50)")
+    p.add_argument("--iterations", type=int,   default=3,   help="click sequences per session")
+    p.add_argument("--toggles",    type=int,   default=4,   help="checklist toggles per sequence")
+    p.add_argument("--think-time", type=float, default=0.0, help="pause between clicks in seconds")
+    p.add_argument("--cooldown",   type=float, default=2.0, help="pause between levels in seconds")
+    p.add_argument("--knee-gain",  type=float, default=0.25,
+                   help="fraction of ideal linear throughput gain that still counts as scaling")
+    p.add_argument("--mongo-uri",  help="Mongo stand-in for the spawned server")
+    p.add_argument("--url",        help="target an already running server instead of spawning one")
+    p.add_argument("--rss-pid",    type=int, help="server PID to sample RSS from when using --url")
+    p.add_argument("--json",       help="also write results to this JSON file")
+    args = p.parse_args(argv)
+
+    levels  = sorted({int(x) for x in args.sessions.split(",") if x.strip()})
+    workdir = tempfile.mkdtemp(prefix="spae-loadtest-")
+    mongod = server = None
+    try:
+        if args.url:
+            base_url, rss_pid = args.url.rstrip("/"), args.rss_pid
+        else:
+            mongo_uri = args.mongo_uri
+            if mongo_uri is None:
+                mongod, mongo_uri = start_mongod(workdir)
+            if mongo_uri is None:
+                print("! No Mongo stand-in — running in Local mode (no DB writes measured)",
+                      file=sys.stderr)
+            port     = free_port()
+            server   = start_server(workdir, port, mongo_uri)
+            base_url = f"http://127.0.0.1:{port}"
+            rss_pid  = server.pid
+        wait_for_health(base_url)
+
+        ws_url  = base_url.replace("http", "ws", 1) + "/_stcore/stream"
+        results = asyncio.run(sweep(ws_url, levels, args, rss_pid))
+        knee    = find_knee(results, args.knee_gain)
+        print_report(results, knee)
+
+        if args.json:
+            with open(args.json, "w") as fh:
+                json.dump({
+                    "levels": [asdict(r) for r in results],
+                    "knee_sessions": knee.sessions if knee else None,
+                    "iterations": args.iterations,
+                    "toggles": args.toggles,
+                }, fh, indent=2)
+        return 0 if all(r.errors == 0 for r in results) else 1
+    finally:
+        for proc in (server, mongod):
+            if proc is not None:
+                proc.terminate()
+                proc.wait(timeout=15)
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,198 @@
+"""
+migrate_ids.py — Rewrite Stored Progress onto Task & Course IDs
+================================================================
+Users' checklist / navigator_status / completion_days maps used to be keyed
+by task title and "section::course title". The app translates old keys when
+a user signs in (services/content_ids.py); this tool rewrites every document
+once, so exports, nudges and the analytics don't have to, and old entries
+can eventually leave content/aliases.py.
+
+    python -m tools.migrate_ids --dry-run        # count what would change
+    python -m tools.migrate_ids                  # migrate (resumes where it stopped)
+    python -m tools.migrate_ids --restart        # start over from the first document
+    python -m tools.migrate_ids --stats          # also merge completion_stats under old keys
+
+Documents are streamed in _id order, `--batch-size` at a time, with only the
+three maps projected, and rewritten with one bulk_write per batch. Every
+update is conditional on the document's `last_updated` being what was read,
+so a click that lands in between is never overwritten — the document is
+simply read again and retried. After each batch the last _id is saved in the
+`migrations` collection, so an interrupted run continues from there. Running
+it again is harmless: documents already on IDs are left untouched.
+"""
+
+import argparse
+import sys
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from services import analytics
+from services.content_bundle import ContentSources, compile_bundle
+from tools.common import read_secrets, users_collection
+
+MIGRATION_ID       = "content_ids"
+MIGRATIONS         = "migrations"
+DEFAULT_BATCH_SIZE = 500
+MAX_RETRIES        = 5
+
+PROJECTION = {"checklist": 1, "navigator_status": 1, "completion_days": 1, "last_updated": 1}
+
+
+def remapped(doc: Dict[str, Any], bundle) -> Dict[str, Dict]:
+    """The maps of `doc` that hold old keys, translated — empty when it's already on IDs."""
+    fields = {}
+    for field, remap in (
+        ("checklist",        bundle.remap_tasks),
+        ("navigator_status", bundle.remap_courses),
+        ("completion_days",  bundle.remap_days),
+    ):
+        stored = doc.get(field) or {}
+        moved  = remap(stored)
+        if moved != stored:
+            fields[field] = moved
+    return fields
+
+
+def migrate_batch(col, bundle, docs: List[Dict], dry_run: bool = False) -> Tuple[int, int]:
+    """Rewrite one batch. Returns (documents rewritten, write races retried)."""
+    from pymongo import UpdateOne
+
+    rewritten = retried = 0
+    for _ in range(MAX_RETRIES + 1):
+        ops, ids = [], []
+        for doc in docs:
+            fields = remapped(doc, bundle)
+            if fields:
+                # Unchanged since we read it, or the update doesn't apply
+                ops.append(UpdateOne({"_id": doc["_id"], "last_updated": doc.get("last_updated")}, {"$set": fields}))
+                ids.append(doc["_id"])
+        if not ops or dry_run:
+            return rewritten + len(ops), retried
+        result     = col.bulk_write(ops, ordered=False)
+        rewritten += result.modified_count
+        if result.matched_count == len(ops):
+            return rewritten, retried
+        # Someone saved in between: read those again and redo only what still needs it
+        docs     = [d for d in col.find({"_id": {"$in": ids}}, PROJECTION) if remapped(d, bundle)]
+        retried += len(docs)
+        if not docs:
+            return rewritten, retried
+    raise SystemExit(f"✗ {len(docs)} document(s) kept changing during {MAX_RETRIES} retries — run again later")
+
+
+def migrate_users(
+    col, bundle, batch_size: int = DEFAULT_BATCH_SIZE, restart: bool = False, dry_run: bool = False,
+) -> Dict[str, Any]:
+    """Stream every user document through migrate_batch, checkpointing after each batch."""
+    checkpoints = col.database[MIGRATIONS]
+    if restart and not dry_run:
+        checkpoints.delete_one({"_id": MIGRATION_ID})
+    state = {} if dry_run else (checkpoints.find_one({"_id": MIGRATION_ID}) or {})
+    if state.get("finished_at") and not restart:
+        state = {"scanned": 0, "rewritten": 0}          # finished before: check everything again
+    query = {"_id": {"$gt": state["last_id"]}} if state.get("last_id") is not None else {}
+    counts = {"scanned": int(state.get("scanned", 0)), "rewritten": int(state.get("rewritten", 0)), "retried": 0}
+    if query:
+        print(f"↻ resuming after _id {state['last_id']} ({counts['scanned']:,} document(s) already scanned)")
+
+    start  = time.perf_counter()
+    cursor = col.find(query, PROJECTION, batch_size=batch_size).sort("_id", 1)
+    batch: List[Dict] = []
+
+    def flush() -> None:
+        n, r = migrate_batch(col, bundle, batch, dry_run)
+        counts["scanned"]   += len(batch)
+        counts["rewritten"] += n
+        counts["retried"]   += r
+        if not dry_run:
+            checkpoints.update_one({"_id": MIGRATION_ID}, {"$set": {
+                "last_id":     batch[-1]["_id"],
+                "scanned":     counts["scanned"],
+                "rewritten":   counts["rewritten"],
+                "updated_at":  datetime.utcnow(),
+                "finished_at": None,
+            }}, upsert=True)
+        rate = counts["scanned"] / max(time.perf_counter() - start, 1e-9)
+        print(f"  {counts['scanned']:>9,} scanned · {counts['rewritten']:,} rewritten · {rate:,.0f} docs/s", end="\r")
+        batch.clear()
+
+    try:
+        for doc in cursor:
+            batch.append(doc)
+            if len(batch) >= batch_size:
+                flush()
+        if batch:
+            flush()
+    finally:
+        cursor.close()
+    print()
+    if not dry_run:
+        checkpoints.update_one({"_id": MIGRATION_ID}, {"$set": {"finished_at": datetime.utcnow()}}, upsert=True)
+    counts["seconds"] = time.perf_counter() - start
+    return counts
+
+
+def merge_stats(db, bundle, dry_run: bool = False) -> int:
+    """
+    Fold completion_stats documents kept under an old key into the current
+    ID's, then drop them. Not atomic per document: interrupting between the
+    two writes can count that item's events twice, so run it with the
+    analytics job paused.
+    """
+    from pymongo import UpdateOne
+
+    stats  = db[analytics.STATS_COLLECTION]
+    merged = []
+    for doc in stats.find({"kind": {"$in": ["task", "course"]}}, {"kind": 1, "item": 1, "bins": 1, "count": 1}):
+        new = bundle.resolve(doc["kind"], doc["item"])
+        if new == doc["item"]:
+            continue
+        target = analytics.stat_id(doc["kind"], new)
+        merged.append(target)
+        if dry_run:
+            continue
+        stats.update_one({"_id": target}, {
+            "$inc": {**{f"bins.{d}": c for d, c in doc.get("bins", {}).items()}, "count": doc.get("count", 0)},
+            "$set": {"kind": doc["kind"], "item": new},
+        }, upsert=True)
+        stats.delete_one({"_id": doc["_id"]})
+    if merged and not dry_run:
+        stats.bulk_write([
+            UpdateOne({"_id": d["_id"]}, {"$set": {
+                "p50": analytics.quantile(d["bins"], 0.5),
+                "p90": analytics.quantile(d["bins"], 0.9),
+            }})
+            for d in stats.find({"_id": {"$in": merged}}, {"bins": 1})
+        ], ordered=False)
+    return len(merged)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    p = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    p.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    p.add_argument("--restart",    action="store_true", help="ignore the checkpoint and scan from the start")
+    p.add_argument("--dry-run",    action="store_true", help="count what would change, write nothing")
+    p.add_argument("--stats",      action="store_true", help="also merge completion_stats kept under old keys")
+    p.add_argument("--mongo-uri",  help="defaults to MONGO_URI or [mongo] uri in secrets.toml")
+    p.add_argument("--db",         help="defaults to [mongo] db in secrets.toml")
+    args = p.parse_args(argv)
+
+    bundle = compile_bundle(version=0, sources=ContentSources.from_config(read_secrets().get("content", {})))
+    col    = users_collection(args.mongo_uri, args.db)
+
+    counts = migrate_users(col, bundle, args.batch_size, args.restart, args.dry_run)
+    verb   = "would be rewritten" if args.dry_run else "rewritten"
+    print(
+        f"✓ {counts['scanned']:,} document(s) scanned, {counts['rewritten']:,} {verb}"
+        + (f", {counts['retried']:,} retried after concurrent saves" if counts["retried"] else "")
+        + f" — {counts['scanned'] / max(counts['seconds'], 1e-9):,.0f} docs/s"
+    )
+    if args.stats:
+        n = merge_stats(col.database, bundle, args.dry_run)
+        print(f"✓ {n:,} completion_stats document(s) {'would be merged' if args.dry_run else 'merged'} onto IDs")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,91 @@
+"""
+nudges.py — Send Overdue-Task Digests to Managers and Buddies
+==============================================================
+Runs one delivery pass of services/nudges.py — the same one the app's
+background scheduler runs daily when [nudges] enabled = true. Safe to run
+again: digests already sent today are skipped, so this also resumes a pass
+that was interrupted.
+
+    python -m tools.nudges --dry-run                 # who would be nudged
+    python -m tools.nudges --sink file --outbox out/  # .eml files instead of SMTP
+    python -m tools.nudges --backfill                # set next_due on older documents
+
+Sink settings default to [nudges] in secrets.toml.
+"""
+
+import argparse
+import sys
+import time
+from datetime import date
+from typing import List, Optional
+
+from services import indexes, nudges
+from services.content_bundle import ContentSources, compile_bundle
+from tools.common import read_secrets, users_collection
+
+
+def backfill(col, bundle, batch_size: int = 1000) -> int:
+    """One-off full pass: compute next_due for documents written before it existed."""
+    from pymongo import UpdateOne
+    ops, n = [], 0
+    cursor = col.find({"next_due": {"$exists": False}}, {"profile": 1, "checklist": 1}, batch_size=batch_size)
+    for doc in cursor:
+        profile = doc.get("profile", {})
+        due     = nudges.next_due(profile.get("start_date"), bundle.checklist(profile.get("role", "")),
+                                  bundle.remap_tasks(doc.get("checklist", {})))
+        ops.append(UpdateOne({"_id": doc["_id"], "next_due": {"$exists": False}}, {"$set": {"next_due": due}}))
+        if len(ops) >= batch_size:
+            n += col.bulk_write(ops, ordered=False).modified_count
+            ops = []
+    if ops:
+        n += col.bulk_write(ops, ordered=False).modified_count
+    return n
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    p = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    p.add_argument("--dry-run",        action="store_true", help="print the digests, send nothing")
+    p.add_argument("--date",           type=date.fromisoformat, help="pretend today is YYYY-MM-DD")
+    p.add_argument("--sink",           choices=("file", "smtp"))
+    p.add_argument("--outbox",         help="directory for --sink file")
+    p.add_argument("--max-per-minute", type=int)
+    p.add_argument("--backfill",       action="store_true", help="set next_due on documents missing it first")
+    p.add_argument("--mongo-uri",      help="defaults to MONGO_URI or [mongo] uri in secrets.toml")
+    p.add_argument("--db",             help="defaults to [mongo] db in secrets.toml")
+    args = p.parse_args(argv)
+
+    secrets = read_secrets()
+    cfg     = dict(secrets.get("nudges", {}))
+    if args.sink:
+        cfg["sink"] = args.sink
+    if args.outbox:
+        cfg["outbox_dir"] = args.outbox
+    bundle = compile_bundle(version=0, sources=ContentSources.from_config(secrets.get("content", {})))
+    col    = users_collection(args.mongo_uri, args.db)
+    indexes.ensure_indexes(col)
+
+    if args.backfill:
+        print(f"✓ next_due set on {backfill(col, bundle):,} document(s)")
+
+    if args.dry_run:
+        today = args.date or date.today()
+        for recipient, digest in sorted(nudges.build_digests(col, bundle, today).items()):
+            print(f"── To: {recipient}\n   Subject: {digest.subject()}\n")
+            print(digest.body(cfg.get("app_url", "")))
+        return 0
+
+    start  = time.perf_counter()
+    counts = nudges.send_digests(
+        col.database, bundle, nudges.sink_from_config(cfg), today=args.date,
+        per_minute=args.max_per_minute or int(cfg.get("max_per_minute", nudges.DEFAULT_PER_MINUTE)),
+        app_url=cfg.get("app_url", ""), users=col.name,
+    )
+    print(
+        f"✓ {counts['recipients']} recipient(s): {counts['sent']} sent, {counts['skipped']} already sent, "
+        f"{counts['failed']} failed in {time.perf_counter() - start:.1f} s"
+    )
+    return 1 if counts["failed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,176 @@
+"""
+provision.py — Bulk New-Hire Provisioning from an HR Export
+============================================================
+Streams an HR CSV or Excel export, validates every row, resolves roles
+through the live content's ROLE_KEY_MAP and upserts pre-provisioned user
+documents with bulk_write in batches. Nothing is held in memory beyond one
+batch, so a 200-person cohort and a 20 000-row backfill run the same way.
+
+    python -m tools.provision cohort.csv
+    python -m tools.provision cohort.xlsx --sheet "New Hires" --batch-size 1000
+    python -m tools.provision cohort.csv --dry-run --errors-csv rejected.csv
+
+Recognised columns (any order, case and spacing ignored — see
+services/provisioning.py for every accepted spelling): email (required),
+oid, preferred name, role, start date, buddy, buddy email, manager,
+manager email.
+
+Outdated user documents are upgraded to the current schema first
+(services/schema.py), so hires who already signed in are matched by their
+lower-cased azure_email and updated rather than provisioned again.
+
+Rows that fail validation are reported with their line number and skipped;
+the rest are still written. Exit status is 1 if any row was rejected.
+Excel input needs openpyxl (pip install openpyxl).
+"""
+
+import argparse
+import csv
+import os
+import sys
+import time
+import uuid
+from datetime import datetime
+from typing import Any, Iterator, List, Optional, Tuple
+
+from services.content_bundle import ContentSources, compile_bundle
+from services.provisioning import ProvisionedUser, RowError, existing_documents, map_columns, parse_row, role_resolver
+from services.schema import derived_fields, sweep_all
+from tools.common import read_secrets, users_collection
+
+DEFAULT_BATCH_SIZE = 500
+
+
+def read_rows(path: str, sheet: Optional[str] = None) -> Iterator[List[Any]]:
+    """Yield the header, then every row, without loading the file."""
+    if path.lower().endswith((".xlsx", ".xlsm")):
+        try:
+            from openpyxl import load_workbook
+        except ImportError:
+            raise SystemExit("Excel input needs openpyxl. Run: pip install openpyxl")
+        wb = load_workbook(path, read_only=True, data_only=True)
+        try:
+            ws = wb[sheet] if sheet else wb.active
+            for row in ws.iter_rows(values_only=True):
+                yield list(row)
+        finally:
+            wb.close()
+    else:
+        with open(path, newline="", encoding="utf-8-sig") as fh:
+            yield from csv.reader(fh)
+
+
+def flush(col, bundle, users: List[ProvisionedUser], lines: List[int], batch_id: str, now: str,
+          errors: List[Tuple[int, str, str]]) -> Tuple[int, int]:
+    """
+    Write one batch: one read for the hires' existing documents, one
+    bulk_write. Returns (upserted, modified); write errors go to `errors`.
+    """
+    from pymongo import UpdateOne
+    from pymongo.errors import BulkWriteError
+    existing = existing_documents(col, users)
+    ops      = []
+    for user in users:
+        doc     = existing.get(user.key)
+        profile = user.merged_profile(doc)
+        derived = derived_fields(bundle, profile.get("role", ""), profile.get("start_date"),
+                                 (doc or {}).get("checklist", {}), (doc or {}).get("navigator_status", {}))
+        ops.append(UpdateOne(*user.update(batch_id, now, derived, doc), upsert=True))
+    try:
+        result = col.bulk_write(ops, ordered=False)
+        return result.upserted_count, result.modified_count
+    except BulkWriteError as e:
+        for err in e.details.get("writeErrors", []):
+            errors.append((lines[err["index"]], "", f"write failed: {err.get('errmsg', '')}"))
+        return e.details.get("nUpserted", 0), e.details.get("nModified", 0)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    p = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    p.add_argument("path",         help="HR export (.csv or .xlsx)")
+    p.add_argument("--sheet",      help="worksheet name for Excel input (default: first)")
+    p.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    p.add_argument("--dry-run",    action="store_true", help="validate only, write nothing")
+    p.add_argument("--errors-csv", help="write rejected rows (line, email, reason) to this file")
+    p.add_argument("--mongo-uri",  help="defaults to MONGO_URI or [mongo] uri in secrets.toml")
+    p.add_argument("--db",         help="defaults to [mongo] db in secrets.toml")
+    args = p.parse_args(argv)
+
+    if not os.path.exists(args.path):
+        print(f"✗ {args.path} not found")
+        return 1
+
+    bundle  = compile_bundle(version=0, sources=ContentSources.from_config(read_secrets().get("content", {})))
+    resolve = role_resolver(bundle.role_key_map)
+    col     = None if args.dry_run else users_collection(args.mongo_uri, args.db)
+    if col is not None:
+        # Existing hires are matched by azure_email, which older documents store as Azure spelled it
+        swept = sweep_all(col, bundle)
+        if swept["upgraded"] or swept["remaining"]:
+            print(f"  upgraded {swept['upgraded']:,} document(s) to the current schema"
+                  + (f", {swept['remaining']:,} still outdated" if swept["remaining"] else ""))
+
+    batch_id = f"{datetime.utcnow():%Y%m%dT%H%M%S}-{uuid.uuid4().hex[:6]}"
+    now      = datetime.utcnow().isoformat()
+    errors: List[Tuple[int, str, str]] = []
+    users, lines, seen = [], [], set()
+    read = valid = upserted = modified = 0
+    start = time.perf_counter()
+
+    rows = read_rows(args.path, args.sheet)
+    try:
+        columns = map_columns(next(rows))
+    except (StopIteration, RowError) as e:
+        print(f"✗ {args.path}: {e or 'empty file'}")
+        return 1
+
+    for line, row in enumerate(rows, start=2):
+        if not any(c not in (None, "") for c in row):
+            continue
+        read += 1
+        try:
+            user = parse_row(row, columns, resolve)
+            if user.key in seen:
+                raise RowError(f"{user.email} appears more than once in this file")
+        except RowError as e:
+            idx = columns["email"]
+            errors.append((line, str(row[idx]) if idx < len(row) and row[idx] else "", str(e)))
+            continue
+        seen.add(user.key)
+        valid += 1
+        if col is None:
+            continue
+        users.append(user)
+        lines.append(line)
+        if len(users) >= args.batch_size:
+            u, m = flush(col, bundle, users, lines, batch_id, now, errors)
+            upserted, modified = upserted + u, modified + m
+            users, lines = [], []
+            elapsed = time.perf_counter() - start
+            print(f"  … {read} rows, {valid / elapsed:,.0f} rows/s", flush=True)
+    if users:
+        u, m = flush(col, bundle, users, lines, batch_id, now, errors)
+        upserted, modified = upserted + u, modified + m
+
+    elapsed = time.perf_counter() - start
+    for line, email, reason in errors:
+        print(f"✗ line {line} {email}: {reason}")
+    if args.errors_csv and errors:
+        with open(args.errors_csv, "w", newline="", encoding="utf-8") as fh:
+            writer = csv.writer(fh)
+            writer.writerow(["line", "email", "reason"])
+            writer.writerows(errors)
+
+    print(f"{'Validated' if args.dry_run else 'Provisioned'} {args.path} (batch {batch_id})")
+    print(f"  rows read   {read:>8,}")
+    print(f"  valid       {valid:>8,}")
+    print(f"  rejected    {len(errors):>8,}")
+    if not args.dry_run:
+        print(f"  new users   {upserted:>8,}")
+        print(f"  updated     {modified:>8,}")
+    print(f"  throughput  {read / elapsed if elapsed else 0:>8,.0f} rows/s  ({elapsed:.2f} s)")
+    return 1 if errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,280 @@
+"""
+storage_check.py — Storage Backend Conformance & Throughput
+============================================================
+Runs the same checks against every storage backend (services/storage.py):
+each conformance case exercises one behaviour the app or its jobs rely on —
+upserts on dotted paths, modified_count on no-op writes, guarded bulk
+writes, $type / $exists / $or filters, datetime ranges, sort + limit, projections — and the
+throughput pass times the app's hot paths on `--docs` documents: bulk
+insert, sign-in reads by _id, single-field $set saves and bulk_write
+batches.
+
+    python -m tools.storage_check                          # SQLite in a temp dir
+    python -m tools.storage_check --sqlite data/check.db   # SQLite file of your choice
+    python -m tools.storage_check --mongo-uri mongodb://localhost:27017
+
+With --mongo-uri, MongoDB is checked too, in a scratch database (`--db`,
+dropped afterwards). Exits 1 if any conformance case fails on any backend.
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from services import storage
+
+SCRATCH_DB    = "spae_storage_check"
+DEFAULT_DOCS  = 2_000
+BULK_BATCH    = 200
+
+CASES: List[Tuple[str, Callable[[Any], None]]] = []
+
+
+def case(fn: Callable[[Any], None]) -> Callable[[Any], None]:
+    CASES.append((fn.__name__, fn))
+    return fn
+
+
+def _user(i: int) -> Dict[str, Any]:
+    return {
+        "_id":          f"u{i:06d}",
+        "profile":      {"role": "SPE" if i % 2 else "SPA", "start_date": f"2026-{i % 12 + 1:02d}-01"},
+        "checklist":    {f"t{j}": j < i % 5 for j in range(10)},
+        "next_due":     f"2026-01-{i % 28 + 1:02d}" if i % 3 else None,
+        "xp":           i % 97,
+        "last_updated": f"2026-10-{i % 28 + 1:02d}T00:00:00",
+    }
+
+
+# =============================================================================
+# CONFORMANCE
+# =============================================================================
+
+@case
+def insert_and_find_one(col) -> None:
+    col.insert_one({"_id": "a", "profile": {"name": "A"}, "tags": ["x", "y"]})
+    assert col.find_one({"_id": "a"})["profile"] == {"name": "A"}
+    assert col.find_one({"tags": "y"})["_id"] == "a"
+    assert col.find_one({"_id": "missing"}) is None
+
+
+@case
+def duplicate_id_rejected(col) -> None:
+    col.insert_one({"_id": "a"})
+    try:
+        col.insert_one({"_id": "a"})
+    except storage.DuplicateKeyError:
+        return
+    raise AssertionError("second insert with the same _id succeeded")
+
+
+@case
+def upsert_dotted_set(col) -> None:
+    r = col.update_one({"_id": "a"}, {"$set": {"profile.role": "SPE", "checklist.t1": True}}, upsert=True)
+    assert r.upserted_id == "a" and r.matched_count == 0
+    assert col.find_one({"_id": "a"}) == {"_id": "a", "profile": {"role": "SPE"}, "checklist": {"t1": True}}
+
+
+@case
+def noop_update_not_modified(col) -> None:
+    col.insert_one({"_id": "a", "xp": 5})
+    r = col.update_one({"_id": "a"}, {"$set": {"xp": 5}})
+    assert (r.matched_count, r.modified_count) == (1, 0)
+    r = col.update_one({"_id": "a"}, {"$inc": {"xp": 2}, "$unset": {"gone": ""}})
+    assert (r.matched_count, r.modified_count) == (1, 1)
+    assert col.find_one({"_id": "a"})["xp"] == 7
+
+
+@case
+def set_on_insert_only_on_insert(col) -> None:
+    col.update_one({"_id": "a"}, {"$set": {"n": 1}, "$setOnInsert": {"created": "x"}}, upsert=True)
+    col.update_one({"_id": "a"}, {"$set": {"n": 2}, "$setOnInsert": {"created": "y"}}, upsert=True)
+    assert col.find_one({"_id": "a"}) == {"_id": "a", "n": 2, "created": "x"}
+
+
+@case
+def filters(col) -> None:
+    col.insert_many([_user(i) for i in range(30)])
+    assert col.count_documents({"next_due": {"$type": "string", "$lt": "2026-01-10"}}) == \
+        sum(1 for i in range(30) if i % 3 and i % 28 + 1 < 10)
+    assert col.count_documents({"next_due": None}) == 10
+    assert col.count_documents({"gone": {"$exists": False}}) == 30
+    assert col.count_documents({"$or": [{"xp": {"$gte": 28}}, {"profile.role": "SPA"}]}) == \
+        sum(1 for i in range(30) if i % 97 >= 28 or i % 2 == 0)
+    assert col.count_documents({"_id": {"$in": ["u000001", "u000002", "nope"]}}) == 2
+    assert col.count_documents({"profile.role": {"$ne": "SPE"}}) == 15
+    assert col.count_documents({"_id": {"$gt": "u000025"}}) == 4
+
+
+@case
+def sort_limit_projection(col) -> None:
+    col.insert_many([_user(i) for i in range(30)])
+    top = list(col.find({}, {"xp": 1}).sort("xp", -1).limit(3))
+    assert [d["xp"] for d in top] == [29, 28, 27] and set(top[0]) == {"_id", "xp"}
+    first = list(col.find({}, {"_id": 0, "profile.role": 1}).sort([("profile.role", 1), ("_id", -1)]).limit(2))
+    assert first == [{"profile": {"role": "SPA"}}] * 2
+    ids = [d["_id"] for d in col.find({}, {"checklist": 0}, batch_size=7).sort("_id", 1)]
+    assert ids == sorted(ids) and len(ids) == 30
+
+
+@case
+def guarded_bulk_write(col) -> None:
+    from pymongo import UpdateOne
+    col.insert_many([{"_id": "a", "v": 1, "last_updated": "t1"}, {"_id": "b", "v": 1, "last_updated": "t1"}])
+    col.update_one({"_id": "b"}, {"$set": {"last_updated": "t2"}})         # a save lands in between
+    r = col.bulk_write([
+        UpdateOne({"_id": "a", "last_updated": "t1"}, {"$set": {"v": 2}}),
+        UpdateOne({"_id": "b", "last_updated": "t1"}, {"$set": {"v": 2}}),
+        UpdateOne({"_id": "c"}, {"$set": {"v": 2}}, upsert=True),
+    ], ordered=False)
+    assert (r.matched_count, r.modified_count, r.upserted_count) == (1, 1, 1)
+    assert [d["v"] for d in col.find({}).sort("_id", 1)] == [2, 1, 2]
+
+
+@case
+def bulk_write_errors_keep_the_rest(col) -> None:
+    from pymongo import InsertOne
+    from pymongo.errors import BulkWriteError
+    col.insert_one({"_id": "a"})
+    try:
+        col.bulk_write([InsertOne({"_id": "b"}), InsertOne({"_id": "a"}), InsertOne({"_id": "c"})], ordered=False)
+    except BulkWriteError as e:
+        assert [err["index"] for err in e.details["writeErrors"]] == [1]
+        assert e.details["nInserted"] == 2
+    else:
+        raise AssertionError("duplicate insert in bulk_write succeeded")
+    assert col.count_documents({}) == 3
+
+
+@case
+def replace_delete_find_and_update(col) -> None:
+    col.replace_one({"_id": "a"}, {"v": 1}, upsert=True)
+    col.replace_one({"_id": "a"}, {"w": 2})
+    assert col.find_one({"_id": "a"}) == {"_id": "a", "w": 2}
+    before = col.find_one_and_update({"_id": "a"}, {"$inc": {"w": 1}})
+    assert before["w"] == 2 and col.find_one({"_id": "a"})["w"] == 3
+    assert col.delete_one({"_id": "a"}).deleted_count == 1
+    assert col.find_one({"_id": "a"}) is None
+
+
+@case
+def datetimes_round_trip(col) -> None:
+    when = datetime(2026, 10, 19, 8, 30, 15, 123000, tzinfo=timezone.utc)
+    col.insert_one({"_id": "a", "at": when})
+    got = col.find_one({"_id": "a"})["at"]
+    assert got.replace(tzinfo=timezone.utc) == when, got
+    assert col.count_documents({"at": {"$gte": datetime(2026, 10, 19)}}) == 1
+    assert col.count_documents({"at": when}) == 1
+
+
+@case
+def datetime_ranges(col) -> None:
+    col.insert_many([{"_id": f"d{h}", "at": datetime(2026, 10, 19, h)} for h in range(24)])
+    cest = timezone(timedelta(hours=2))                  # aware bounds compare as UTC
+    since, until = datetime(2026, 10, 19, 8, tzinfo=cest), datetime(2026, 10, 19, 12, tzinfo=timezone.utc)
+    assert col.count_documents({"at": {"$gte": since, "$lt": until}}) == 6
+    assert col.count_documents({"at": {"$gte": datetime(2026, 10, 19, 6), "$lt": until}}) == 6
+    latest = list(col.find({"at": {"$lte": since}}).sort("at", -1).limit(1))
+    assert latest[0]["_id"] == "d6", latest
+
+
+@case
+def index_information(col) -> None:
+    name = col.create_index([("next_due", 1)], partialFilterExpression={"next_due": {"$type": "string"}})
+    info = col.index_information()
+    assert name == "next_due_1" and info[name]["key"] == [("next_due", 1)] and "_id_" in info
+
+
+def conformance(db) -> List[str]:
+    """Run every case on a fresh collection. Returns the failures."""
+    failures = []
+    for name, fn in CASES:
+        col = db[f"check_{name}"]
+        col.drop()
+        col = db[f"check_{name}"]
+        try:
+            fn(col)
+        except Exception as e:
+            failures.append(f"{name}: {type(e).__name__}: {e}")
+        finally:
+            col.drop()
+    return failures
+
+
+# =============================================================================
+# THROUGHPUT
+# =============================================================================
+
+def throughput(db, docs: int) -> Dict[str, float]:
+    """Operations per second on the app's hot paths."""
+    from pymongo import UpdateOne
+    col = db["check_throughput"]
+    col.drop()
+    col   = db["check_throughput"]
+    users = [_user(i) for i in range(docs)]
+    rates = {}
+
+    def timed(label: str, n: int, fn: Callable[[], None]) -> None:
+        start = time.perf_counter()
+        fn()
+        rates[label] = n / max(time.perf_counter() - start, 1e-9)
+
+    def bulk_insert() -> None:
+        for i in range(0, docs, BULK_BATCH):
+            col.insert_many(users[i:i + BULK_BATCH], ordered=False)
+
+    def reads() -> None:
+        for u in users:
+            col.find_one({"_id": u["_id"]})
+
+    def saves() -> None:
+        for i, u in enumerate(users):
+            col.update_one({"_id": u["_id"]}, {"$set": {"checklist.t3": bool(i % 2), "last_updated": "now"}})
+
+    def bulk_saves() -> None:
+        for i in range(0, docs, BULK_BATCH):
+            col.bulk_write([UpdateOne({"_id": u["_id"]}, {"$inc": {"xp": 1}}) for u in users[i:i + BULK_BATCH]],
+                           ordered=False)
+
+    timed("insert (batched)", docs, bulk_insert)
+    timed("find_one by _id",  docs, reads)
+    timed("update_one $set",  docs, saves)
+    timed("bulk_write",       docs, bulk_saves)
+    col.drop()
+    return rates
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    p = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    p.add_argument("--sqlite",    help="SQLite file to check (default: a temporary one)")
+    p.add_argument("--mongo-uri", help="also check this MongoDB")
+    p.add_argument("--db",        default=SCRATCH_DB, help=f"scratch MongoDB database (default {SCRATCH_DB})")
+    p.add_argument("--docs",      type=int, default=DEFAULT_DOCS, help="documents for the throughput pass")
+    args = p.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        backends = [("sqlite", lambda: storage.open_uri(storage.SQLITE_URI_PREFIX + (args.sqlite or os.path.join(tmp, "check.db"))))]
+        if args.mongo_uri:
+            backends.append(("mongo", lambda: storage.open_uri(args.mongo_uri, args.db)))
+
+        failed = 0
+        for label, open_db in backends:
+            db       = open_db()
+            failures = conformance(db)
+            failed  += len(failures)
+            print(f"{'✓' if not failures else '✗'} {label}: {len(CASES) - len(failures)}/{len(CASES)} conformance cases")
+            for f in failures:
+                print(f"    ✗ {f}")
+            for op, rate in throughput(db, args.docs).items():
+                print(f"    {op:<18} {rate:>10,.0f} docs/s")
+            if label == "mongo":
+                db.client.drop_database(args.db)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())